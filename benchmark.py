@@ -0,0 +1,758 @@
+# benchmark.py
+# Mediciones offline sobre las páginas guardadas en fixtures/. No necesita Discord ni red.
+# Uso: python benchmark.py [extractor] [parser] [champions] [singleflight] [search] [diff] [commands] [routing] [shared]
+#      python benchmark.py diff commands --actualizar-golden   (regenera los corpus dorados de fixtures/)
+#      python benchmark.py commands --actualizar-linea-base    (guarda los tiempos de esta máquina)
+#      python benchmark.py commands --tolerancia=2             (falla si algo tarda más del doble)
+
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+# Los benchmarks usan su propio archivo de parches (se borra al terminar), nunca el del bot.
+BENCH_DIR = Path(tempfile.mkdtemp(prefix="poro-bench-"))
+os.environ['PATCH_ARCHIVE_PATH'] = str(BENCH_DIR / "patch_archive.sqlite3")
+
+import patch_parser
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+PATCH_FIXTURES = sorted(FIXTURES_DIR.glob("patch-*-notes.html"))
+PATCH_LIST_FIXTURE = FIXTURES_DIR / "patch-notes-list.html"
+
+
+def measure(fn, repeat=20):
+    """Ejecuta fn varias veces y devuelve (mejor tiempo en ms, último resultado)."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+# --- Extractor de una sola pasada vs. extractores por comando ---
+def bench_extractor():
+    for fixture in PATCH_FIXTURES:
+        content = fixture.read_bytes()
+        soup = patch_parser.make_soup(content)
+        model = patch_parser.build_patch_model(soup)
+        champion_names = model.champion_list
+
+        # Lo que costaba antes: cada comando parseaba la página y buscaba lo suyo.
+        def per_command():
+            results = [patch_parser.extract_summary_image(patch_parser.make_soup(content)),
+                       patch_parser.extract_champion_list(patch_parser.make_soup(content)),
+                       patch_parser.extract_section_details(patch_parser.make_soup(content), "patch-items"),
+                       patch_parser.extract_section_details(patch_parser.make_soup(content), "patch-runes")]
+            for name in champion_names:
+                results.append(patch_parser.extract_champion_details(patch_parser.make_soup(content), name))
+            return results
+
+        # Ahora: un parseo, un recorrido, y búsquedas en diccionarios.
+        def single_pass():
+            built = patch_parser.parse_patch_article(content)
+            results = [built.summary_image, built.champion_list, built.items, built.runes]
+            for name in champion_names:
+                results.append(built.champion_details(name))
+            return results
+
+        # Solo la extracción, sobre un árbol ya construido.
+        def extract_only_per_command():
+            return [patch_parser.extract_champion_details(soup, name) for name in champion_names] + [
+                patch_parser.extract_section_details(soup, "patch-items"),
+                patch_parser.extract_section_details(soup, "patch-runes")]
+
+        def extract_only_single_pass():
+            return patch_parser.build_patch_model(soup)
+
+        old_ms, old_results = measure(per_command, repeat=5)
+        new_ms, new_results = measure(single_pass, repeat=5)
+        old_extract_ms, _ = measure(extract_only_per_command)
+        new_extract_ms, _ = measure(extract_only_single_pass)
+        lookup_ms, _ = measure(lambda: [model.champion_details(name) for name in champion_names], repeat=200)
+
+        status = "OK" if old_results == new_results else "DIFERENTE"
+        print(f"{fixture.name} ({len(content) / 1024:.0f} KB, {len(champion_names)} campeones) - resultados: {status}")
+        print(f"  {len(champion_names) + 4} comandos, por comando:  {old_ms:8.2f} ms")
+        print(f"  {len(champion_names) + 4} comandos, una pasada:   {new_ms:8.2f} ms  (x{old_ms / new_ms:.1f})")
+        print(f"  solo extracción, por comando: {old_extract_ms:8.2f} ms")
+        print(f"  solo extracción, una pasada:  {new_extract_ms:8.2f} ms")
+        print(f"  {len(champion_names)} búsquedas de p!ver en el modelo: {lookup_ms * 1000:8.1f} µs")
+        if status != "OK":
+            return 1
+    return 0
+
+
+# --- Backends de parseo: paridad y tiempos ---
+def reference_output(content):
+    """Salida de los extractores por comando con html.parser sobre la página completa (la referencia)."""
+    soup = patch_parser.make_soup(content, backend="html.parser")
+    champion_names = patch_parser.extract_champion_list(soup)
+    return {
+        "summary_image": patch_parser.extract_summary_image(soup),
+        "champion_list": champion_names,
+        "champions": {name: patch_parser.extract_champion_details(soup, name) for name in champion_names},
+        "items": patch_parser.extract_section_details(soup, "patch-items"),
+        "runes": patch_parser.extract_section_details(soup, "patch-runes"),
+    }
+
+
+def model_output(model, champion_names):
+    return {
+        "summary_image": model.summary_image,
+        "champion_list": model.champion_list,
+        "champions": {name: model.champion_details(name) for name in champion_names},
+        "items": model.items,
+        "runes": model.runes,
+    }
+
+
+def bench_parser():
+    if not patch_parser.LXML_AVAILABLE:
+        print("Aviso: lxml no está instalado; solo se comparará html.parser.")
+    exit_code = 0
+    for fixture in PATCH_FIXTURES:
+        content = fixture.read_bytes()
+        expected = reference_output(content)
+        print(f"{fixture.name}")
+        for backend in patch_parser.PARSER_BACKENDS:
+            for restrict in (False, True):
+                label = f"{patch_parser.resolve_backend(backend)}{' + strainer' if restrict else ''}"
+                elapsed_ms, model = measure(lambda: patch_parser.parse_patch_article(content, backend=backend, restrict=restrict), repeat=10)
+                same = model_output(model, expected["champion_list"]) == expected
+                if not same:
+                    exit_code = 1
+                print(f"  {label:24} {elapsed_ms:8.2f} ms  paridad: {'OK' if same else 'DIFERENTE'}")
+    return exit_code
+
+
+# --- Índice de campeones para p!ver ---
+CHAMPION_QUERIES = ["Ahri", "kaisa", "Kai'Sa", "wukong", "Monkey King", "Ézreal", "mf", "nunu",
+                    "Ahry", "jinxx", "yasou", "kha zix", "leblanc", "aurelion", "xyzzy"]
+# El encabezado del artículo no siempre coincide con champions.txt: "Nunu y Willump" (patch-nunuywillump).
+ANCHOR_QUERIES = ["nunu", "willump", "Nunu & Willump", "nunu y willump", "Kai'Sa", "Ahri"]
+
+
+def bench_champions():
+    import champion_index
+    names = [line.strip() for line in (Path(__file__).parent / "champions.txt").read_text(encoding="utf-8").splitlines() if line.strip()]
+    build_ms, index = measure(lambda: champion_index.ChampionIndex(names))
+    legacy_set = {name.lower() for name in names}
+
+    print(f"Índice de {len(index)} campeones construido en {build_ms:.2f} ms")
+    for query in CHAMPION_QUERIES:
+        elapsed_ms, result = measure(lambda: index.lookup(query), repeat=200)
+        legacy_hit = query.lower().strip() in legacy_set
+        found = result.match.name if result.match else "-"
+        kind = "exacta" if result.exact else ("aproximada" if result.match else "sin coincidencia")
+        print(f"  {query!r:16} -> {found:16} {kind:16} {elapsed_ms * 1000:7.1f} µs  (antes: {'sí' if legacy_hit else 'no'})")
+
+    # Del nombre resuelto al ancla real del artículo (la del último fixture).
+    model = patch_parser.parse_patch_article(PATCH_FIXTURES[-1].read_bytes(), PATCH_FIXTURES[-1].name)
+    missing = 0
+    for query in ANCHOR_QUERIES:
+        match = index.lookup(query).match
+        anchor = model.champion_anchors.get(match.key) if match else None
+        found = match is not None and model.champion_details(match.name, match.key) is not None
+        missing += not found
+        print(f"  {query!r:16} -> {anchor or '-':24} {'OK' if found else 'SIN CAMBIOS'} ({PATCH_FIXTURES[-1].name})")
+    return 1 if missing else 0
+
+
+# --- Servidor local que hace de la página de Riot ---
+LIST_PATH = "/es-mx/news/tags/patch-notes/"
+ARTICLE_PATH = "/es-mx/news/game-updates/{slug}/"
+
+
+@contextlib.asynccontextmanager
+async def stand_in_server(delay=0.0):
+    """
+    Sirve la lista de parches y los artículos de fixtures/ con las mismas rutas que la página real.
+    Devuelve (url de la lista, contador de descargas por tipo).
+    """
+    from aiohttp import web
+
+    pages = {LIST_PATH: PATCH_LIST_FIXTURE.read_bytes()}
+    pages.update({ARTICLE_PATH.format(slug=fixture.stem): fixture.read_bytes() for fixture in PATCH_FIXTURES})
+    served = {"list": 0, "article": 0}
+
+    async def serve(request):
+        body = pages.get(request.path)
+        if body is None:
+            return web.Response(status=404)
+        served["list" if request.path == LIST_PATH else "article"] += 1
+        if delay:
+            await asyncio.sleep(delay)
+        return web.Response(body=body, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", serve)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}{LIST_PATH}", served
+    finally:
+        await runner.cleanup()
+
+
+# --- Peticiones simultáneas (single-flight) contra un servidor local ---
+async def _concurrent_commands(users=10, delay=0.2):
+    """Simula a varios usuarios pidiendo p!ver al mismo tiempo justo cuando sale un parche."""
+    import http_client
+    import patch_cache
+    import patch_watcher
+    import singleflight
+
+    async with stand_in_server(delay) as (list_url, served):
+        try:
+            watcher = patch_watcher.PatchListWatcher(list_url)
+
+            async def command():
+                title, url, date = await watcher.latest()
+                model = await patch_cache.get_patch_model(url)
+                return model.champion_details(model.champion_list[0])
+
+            start = time.perf_counter()
+            # La revisión periódica (forzada) llega al mismo tiempo que los comandos.
+            results = await asyncio.gather(watcher.latest(force=True), *(command() for _ in range(users)))
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        finally:
+            await http_client.close_session()
+
+    same = all(result == results[1] for result in results[1:])
+    print(f"{users} comandos + 1 revisión periódica en {elapsed_ms:.0f} ms (servidor con {delay * 1000:.0f} ms de latencia)")
+    print(f"  descargas al servidor: lista {served['list']}, artículo {served['article']}  (sin combinar: {users + 1} y {users})")
+    for name, group_stats in singleflight.stats().items():
+        print(f"  {name:12} llamadas {group_stats['calls']:3}  ejecutadas {group_stats['executions']:3}  deduplicadas {group_stats['deduplicated']:3}")
+    return 0 if same and served["list"] == 1 and served["article"] == 1 else 1
+
+
+def bench_singleflight():
+    return asyncio.run(_concurrent_commands())
+
+
+# --- Caché compartida entre procesos (réplicas) contra un servidor local ---
+# Cada réplica es un proceso aparte que arranca, consulta la lista y pide el último artículo.
+REPLICA_SCRIPT = """
+import asyncio, json, sys
+import http_client, patch_cache, patch_watcher, shared_cache
+
+async def main(list_url):
+    watcher = patch_watcher.PatchListWatcher(list_url)
+    title, url, date = await watcher.latest(force=True)
+    model = await patch_cache.get_patch_model(url)
+    await http_client.close_session()
+    stats = shared_cache.SHARED.stats if shared_cache.SHARED else {}
+    print(json.dumps({"url": url, "champions": model.champion_list, **stats}))
+
+asyncio.run(main(sys.argv[1]))
+"""
+
+
+async def _run_replicas(list_url, replicas, shared_url):
+    async def replica(index):
+        env = dict(os.environ, SHARED_CACHE_URL=shared_url,
+                   PATCH_ARCHIVE_PATH=str(BENCH_DIR / f"replica-{next(_channel_ids)}.sqlite3"))
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", REPLICA_SCRIPT, list_url, cwd=Path(__file__).parent, env=env,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"la réplica {index} falló:\n{stderr.decode()}")
+        return json.loads(stdout.decode().strip().splitlines()[-1])
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(replica(index) for index in range(replicas)))
+    return results, (time.perf_counter() - start) * 1000
+
+
+async def _shared_replicas(replicas=4, delay=0.2):
+    exit_code = 0
+    for label, shared_url in (("sin caché compartida", ""), ("SQLite compartido", f"sqlite:///{BENCH_DIR / 'shared.sqlite3'}")):
+        async with stand_in_server(delay) as (list_url, served):
+            results, elapsed_ms = await _run_replicas(list_url, replicas, shared_url)
+        same = all(result["url"] == results[0]["url"] and result["champions"] == results[0]["champions"] for result in results)
+        print(f"{replicas} réplicas, {label}: {elapsed_ms:.0f} ms (servidor con {delay * 1000:.0f} ms de latencia)")
+        print(f"  descargas al servidor: lista {served['list']}, artículo {served['article']}  resultados iguales: {'sí' if same else 'NO'}")
+        if shared_url:
+            built = sum(result["built"] for result in results)
+            hits = sum(result["hits"] for result in results)
+            print(f"  consultas y extracciones hechas por un líder: {built}  leídas de la caché compartida: {hits}")
+            exit_code |= 0 if same and served["list"] == 1 and served["article"] == 1 else 1
+        else:
+            exit_code |= 0 if same else 1
+    return exit_code
+
+
+def bench_shared():
+    return asyncio.run(_shared_replicas())
+
+
+# --- Búsqueda de texto (p!buscar) ---
+SEARCH_QUERIES = ["curación", "costo de maná", "enfriamiento", "armadura base", "Ahri daño", "velocidad de ataque"]
+
+
+def bench_search():
+    import patch_archive
+    import patch_search
+    models = [patch_parser.parse_patch_article(fixture.read_bytes(), fixture.name) for fixture in PATCH_FIXTURES]
+    index = patch_search.SearchIndex()
+    build_ms, _ = measure(lambda: [index.add_model(model, patch_archive.patch_version(model.url)[0]) for model in models], repeat=5)
+    print(f"Índice de {len(index)} líneas de {len(models)} parches construido en {build_ms:.2f} ms (reindexar es igual de caro)")
+
+    # Lo que se hacía antes: p!ver campeón por campeón y leer cada línea.
+    def linear_scan(query):
+        terms = set(patch_search.tokenize(query))
+        return [line for model in models for data in model.champions.values()
+                for block in data['change_blocks'] for line in block['changes']
+                if terms & set(patch_search.tokenize(line))]
+
+    for query in SEARCH_QUERIES:
+        search_ms, hits = measure(lambda: index.search(query), repeat=200)
+        scan_ms, _ = measure(lambda: linear_scan(query), repeat=20)
+        best = f"{hits[0].document.entity} ({hits[0].document.version})" if hits else "-"
+        print(f"  {query!r:22} {len(hits):2} resultados  índice {search_ms * 1000:7.1f} µs  recorrido {scan_ms * 1000:8.1f} µs  mejor: {best}")
+    return 0
+
+
+# --- Buffs y nerfs (patch_diff) contra el corpus dorado ---
+DIFF_GOLDEN = FIXTURES_DIR / "patch-diff-golden.json"
+
+
+def diff_output(model):
+    """Lo que se compara con el corpus dorado: cada línea parseada y el veredicto de cada entidad."""
+    import patch_diff
+    patch = patch_diff.diff_model(model)
+    blocks = [(data['name'], block) for data in model.champions.values() for block in data['change_blocks']]
+    blocks += [(block['title'], block) for block in model.items + model.runes]
+    lines = {}
+    for name, block in blocks:
+        for line in block['changes']:
+            change = patch_diff.parse_change_line(line)
+            lines[f"{name} | {line}"] = None if change is None else [
+                change.direction,
+                [list(group.values) for group in change.before],
+                [list(group.values) for group in change.after],
+            ]
+    verdicts = {entity.name: [entity.verdict, entity.buffs, entity.nerfs] for entity in patch.entities}
+    return {"lines": lines, "verdicts": verdicts}
+
+
+def write_golden(outputs):
+    """Una entrada por renglón, para que el corpus se pueda revisar a mano en un diff."""
+    import json
+    dump = lambda value: json.dumps(value, ensure_ascii=False)
+    out = ["{"]
+    for fixture_index, (fixture_name, output) in enumerate(sorted(outputs.items())):
+        out.append(f" {dump(fixture_name)}: {{")
+        for section_index, section in enumerate(("lines", "verdicts")):
+            out.append(f"  {dump(section)}: {{")
+            entries = sorted(output[section].items())
+            out += [f"   {dump(key)}: {dump(value)}{',' if i < len(entries) - 1 else ''}" for i, (key, value) in enumerate(entries)]
+            out.append("  }" + ("," if section_index == 0 else ""))
+        out.append(" }" + ("," if fixture_index < len(outputs) - 1 else ""))
+    out.append("}")
+    DIFF_GOLDEN.write_text("\n".join(out) + "\n", encoding="utf-8")
+
+
+def bench_diff():
+    import json
+    import patch_diff
+    models = {fixture.name: patch_parser.parse_patch_article(fixture.read_bytes(), fixture.name) for fixture in PATCH_FIXTURES}
+    outputs = {name: diff_output(model) for name, model in models.items()}
+    if "--actualizar-golden" in sys.argv:
+        write_golden(outputs)
+        print(f"Corpus dorado regenerado en {DIFF_GOLDEN.name}")
+        return 0
+
+    golden = json.loads(DIFF_GOLDEN.read_text(encoding="utf-8"))
+    exit_code = 0
+    for name, model in models.items():
+        expected = golden.get(name)
+        same = expected == json.loads(json.dumps(outputs[name]))
+        if not same:
+            exit_code = 1
+        line_count = sum(len(block['changes']) for data in model.champions.values() for block in data['change_blocks'])
+        line_count += sum(len(block['changes']) for block in model.items + model.runes)
+
+        def cold():
+            patch_diff.parse_change_line.cache_clear()
+            return patch_diff.diff_model(model)
+
+        cold_ms, patch = measure(cold)
+        warm_ms, _ = measure(lambda: patch_diff.diff_model(model))
+        totals = patch.totals()
+        print(f"{name}: {line_count} líneas, {len(patch.entities)} entidades - corpus dorado: {'OK' if same else 'DIFERENTE'}")
+        print(f"  {totals['buff']} buffs, {totals['nerf']} nerfs, {totals['ajuste']} ajustes")
+        print(f"  parche completo en frío: {cold_ms:6.2f} ms   con líneas ya vistas: {warm_ms:6.2f} ms")
+    return exit_code
+
+
+# --- Enrutamiento de mensajes (on_message) ---
+CHATTER = [
+    "jajaja", "alguien para unas rankeds?", "gg", "pues yo main Ahri desde siempre", "!!!", "ya salió el parche?",
+    "p", "c", "¿quién juega hoy?", "https://www.leagueoflegends.com/es-mx/", "ok", "<@1234567890> ven", "p!", "!",
+    "pero el nerf a Yasuo estuvo raro", "a qué hora es el clash", "lol", "¡buenas noches!",
+]
+COMMAND_MESSAGES = ["p!ver Ahri", "p!resumen", "!ayuda", "c!clash", "p!buscar curación", "p!historial Ahri 3", "c!calendario"]
+LEGACY_COMMANDS = {
+    '!': ("ayuda",),
+    'p!': ("parche", "campeones", "ver", "objetos", "runas", "historial", "objeto", "runa", "resumen", "metricas",
+           "avisos", "buscar", "calendario", "siguiente"),
+    'c!': ("clash", "calendario", "horarios", "premios"),
+}
+
+
+def legacy_route(content):
+    """Lo que hacía on_message antes de la tabla: tres startswith, split y la cadena de if/elif."""
+    prefix = next((prefix for prefix in ('p!', 'c!', '!') if content.startswith(prefix)), None)
+    if prefix is None:
+        return None
+    parts = content[len(prefix):].split(maxsplit=1)
+    command = parts[0].lower()      # IndexError con un "p!" solo
+    argument = parts[1] if len(parts) > 1 else None
+    for name in LEGACY_COMMANDS[prefix]:
+        if command == name:
+            return f"{prefix}{name}", argument
+    return None
+
+
+def bench_routing():
+    import bot
+    # Un servidor con mucho movimiento: 95% plática, 5% comandos.
+    messages = (CHATTER * 60)[:950] + (COMMAND_MESSAGES * 10)[:50]
+    exit_code = 0
+    for label, sample in (("plática", [m for m in CHATTER if m not in ("p!", "!")]), ("comandos", COMMAND_MESSAGES), ("mezcla 95/5", messages)):
+        resolve = bot.COMMANDS.resolve
+        new_ms, _ = measure(lambda: [resolve(message) for message in sample], repeat=200)
+        try:
+            old_ms, _ = measure(lambda: [legacy_route(message) for message in sample], repeat=200)
+            old = f"{old_ms * 1e6 / len(sample):7.0f} ns"
+        except IndexError:
+            old = "IndexError"
+        print(f"  {label:12} tabla {new_ms * 1e6 / len(sample):7.0f} ns/mensaje   antes {old}")
+
+    for message in COMMAND_MESSAGES:
+        resolved = bot.COMMANDS.resolve(message)
+        if (resolved[0].key, resolved[1]) != legacy_route(message):
+            print(f"  DIFERENTE: {message!r} -> {resolved[0].key}, {resolved[1]!r}")
+            exit_code = 1
+    for bare in ("p!", "!", "c!", "p!   "):
+        if bot.COMMANDS.resolve(bare) is not None:
+            print(f"  {bare!r} no debería ser un comando")
+            exit_code = 1
+    print(f"  {len(bot.COMMANDS.commands)} comandos registrados; un prefijo solo ('p!', '!') se ignora sin error")
+    return exit_code
+
+
+# --- Comandos y funciones de scraping de punta a punta (regresiones de salida y de rendimiento) ---
+REGRESSION_GOLDEN = FIXTURES_DIR / "regression-golden.json"
+BASELINE = FIXTURES_DIR / "benchmark-baseline.json"
+# Un caso falla si tarda (o reserva) más de TOLERANCE veces la línea base, más un margen fijo
+# para que el ruido de las mediciones muy cortas no cuente como regresión.
+TOLERANCE = 1.5
+SLACK = {"ms": 2.0, "kb": 64.0}
+COLD_REPEAT = 5
+WARM_REPEAT = 20
+
+COMMAND_CASES = [
+    "!ayuda", "p!parche", "p!campeones", "p!ver Ahri", "p!ver ahry", "p!ver xyzzy", "p!ver nunu", "p!objetos", "p!runas",
+    "p!resumen", "p!buscar curación", "p!historial Ahri 3", "p!historial Nunu", "p!objeto Eclipse", "p!runa Conquistador",
+    "p!siguiente", "p!calendario", "c!clash", "c!calendario", "c!horarios", "c!premios", "p!metricas", "p!avisos", "p!idioma",
+]
+# Respuestas que dependen de la hora o de las mediciones: solo se revisa que haya respuesta.
+VOLATILE_COMMANDS = {"p!siguiente", "p!calendario", "c!clash", "c!calendario", "p!metricas"}
+
+SCRAPE_CASES = {
+    "get_latest_patch_info": lambda bot, url: bot.get_latest_patch_info(),
+    "scrape_summary_image": lambda bot, url: bot.scrape_summary_image(url),
+    "scrape_champion_list": lambda bot, url: bot.scrape_champion_list(url),
+    "scrape_champion_details": lambda bot, url: bot.scrape_champion_details(url, "Ahri"),
+    "scrape_section_details items": lambda bot, url: bot.scrape_section_details(url, "patch-items"),
+    "scrape_section_details runes": lambda bot, url: bot.scrape_section_details(url, "patch-runes"),
+    "scrape_patch_diff": lambda bot, url: bot.scrape_patch_diff(url),
+    "prewarm_patch": lambda bot, url: bot.prewarm_patch(url),
+}
+
+_channel_ids = itertools.count(1)
+
+
+class FakeChannel:
+    """Canal de mentira que guarda lo que el bot envía."""
+
+    def __init__(self):
+        # Un canal nuevo por comando, para no esperar al límite de mensajes por canal de delivery.py.
+        self.id = next(_channel_ids)
+        self.sent = []
+
+    def typing(self):
+        return contextlib.nullcontext()
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(dict(kwargs, content=content))
+        return SimpleNamespace(id=len(self.sent), channel=self, edit=self._edit)
+
+    async def _edit(self, **kwargs):
+        pass
+
+
+def fake_message(content):
+    author = SimpleNamespace(id=1, guild_permissions=SimpleNamespace(administrator=True))
+    return SimpleNamespace(content=content, author=author, channel=FakeChannel(), guild=SimpleNamespace(id=1))
+
+
+def sent_summary(channel):
+    """Lo que se compara con el corpus dorado: texto, títulos de los embeds, caracteres y si hay botones."""
+    summary = []
+    for sent in channel.sent:
+        embeds = sent.get('embeds') or ([sent['embed']] if sent.get('embed') else [])
+        titles = [embed.title or embed.author.name or "" for embed in embeds]
+        summary.append([sent['content'], titles, sum(len(embed) for embed in embeds), sent.get('view') is not None])
+    return summary
+
+
+def extraction_output(model):
+    """Resumen de lo extraído de un artículo: si un selector deja de coincidir, algo de aquí se vacía."""
+    return {
+        "summary_image": model.summary_image,
+        "champions": {data['name']: [block['title'] for block in data['change_blocks']] for data in model.champions.values()},
+        "items": [block['title'] for block in model.items],
+        "runes": [block['title'] for block in model.runes],
+        "changes": sum(len(block['changes']) for data in model.champions.values() for block in data['change_blocks'])
+                   + sum(len(block['changes']) for block in model.items + model.runes),
+    }
+
+
+async def fresh_patch_state(bot, list_url, empty_archive=False):
+    """
+    Deja el bot como recién arrancado: cachés vacías y lista de parches sin consultar.
+    Con empty_archive también se empieza con un archivo de parches nuevo (hay que descargar todo).
+    """
+    import calendar_model
+    import i18n
+    import patch_archive
+    import patch_cache
+    import patch_search
+    import patch_watcher
+    patch_cache.PATCH_MODELS.clear()
+    patch_cache.PATCH_DIFFS.clear()
+    patch_cache.SEARCH_INDEX = patch_search.SearchIndex()
+    if empty_archive:
+        patch_cache.ARCHIVE.close()
+        patch_cache.ARCHIVE = patch_archive.PatchArchive(str(BENCH_DIR / f"archive-{next(_channel_ids)}.sqlite3"))
+    bot.PATCH_WATCHER = patch_watcher.PatchListWatcher(list_url, name=f"patch_list:{i18n.DEFAULT_LANGUAGE}")
+    bot.CALENDAR_RENDERS = calendar_model.RenderCache()
+    # Como al arrancar: load_config carga el último parche archivado y después se construye el índice.
+    bot.apply_archived_listing(patch_cache.ARCHIVE.latest_listing())
+    await bot.load_patch_archive()
+
+
+async def time_case(run, repeat, reset=None):
+    """
+    Mejor tiempo en ms de `repeat` ejecuciones (como measure(): el mínimo es lo más estable para
+    comparar contra la línea base). reset() se llama antes de cada una, fuera del tiempo.
+    """
+    times = []
+    for _ in range(repeat):
+        if reset:
+            await reset()
+        start = time.perf_counter()
+        await run()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+async def peak_kb(run, reset=None):
+    """Pico de memoria reservada (tracemalloc) durante una ejecución, en KB."""
+    if reset:
+        await reset()
+    tracemalloc.start()
+    try:
+        await run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+async def _run_commands():
+    import bot
+    import http_client
+    import metrics
+    import patch_cache
+
+    results = {}
+    outputs = {}
+    failures = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for path in bot.CONFIG_FILES:
+            bot.reload_config_file(path)
+    async with stand_in_server() as (list_url, served):
+        try:
+            # El archivo empieza con los tres parches, como un bot que ya lleva tiempo corriendo.
+            with contextlib.redirect_stdout(io.StringIO()):
+                await fresh_patch_state(bot, list_url, empty_archive=True)
+                for fixture in PATCH_FIXTURES:
+                    await patch_cache.get_patch_model(list_url.replace(LIST_PATH, ARTICLE_PATH.format(slug=fixture.stem)))
+                title, latest_url, date = await bot.get_latest_patch_info(force=True)
+                await asyncio.to_thread(patch_cache.ARCHIVE.save_listing, title, latest_url, date)
+            outputs["list"] = [title, latest_url.replace(list_url.replace(LIST_PATH, ""), ""), date]
+            outputs["articles"] = {fixture.name: extraction_output(await patch_cache.get_patch_model(
+                list_url.replace(LIST_PATH, ARTICLE_PATH.format(slug=fixture.stem)))) for fixture in PATCH_FIXTURES}
+            archive = patch_cache.ARCHIVE
+
+            # Funciones de scraping: en frío descargan y extraen todo (archivo vacío).
+            for name, case in SCRAPE_CASES.items():
+                async def reset():
+                    await fresh_patch_state(bot, list_url, empty_archive=True)
+                    if name != "get_latest_patch_info":
+                        bot.PATCH_WATCHER.result = (title, latest_url, date)
+
+                run = lambda: case(bot, latest_url)
+                errors = sum(metrics.ERRORS.values.values())
+                log = io.StringIO()
+                with contextlib.redirect_stdout(log):
+                    cold_ms = await time_case(run, COLD_REPEAT, reset)
+                    cold_kb = await peak_kb(run, reset)
+                    await run()
+                    warm_ms = await time_case(run, WARM_REPEAT)
+                    warm_kb = await peak_kb(run)
+                if sum(metrics.ERRORS.values.values()) != errors:
+                    failures.append(f"{name}: errores durante la ejecución\n{log.getvalue()}")
+                results[name] = {"cold_ms": cold_ms, "warm_ms": warm_ms, "cold_kb": cold_kb, "warm_kb": warm_kb}
+
+            # Comandos: en frío es un bot recién reiniciado (cachés vacías, el archivo conserva los parches).
+            patch_cache.ARCHIVE.close()
+            patch_cache.ARCHIVE = archive
+            outputs["commands"] = {}
+            for content in COMMAND_CASES:
+                channels = []
+
+                async def run():
+                    message = fake_message(content)
+                    channels.append(message.channel)
+                    await bot.on_message(message)
+
+                async def reset():
+                    await fresh_patch_state(bot, list_url)
+
+                errors = sum(metrics.ERRORS.values.values())
+                log = io.StringIO()
+                with contextlib.redirect_stdout(log):
+                    cold_ms = await time_case(run, COLD_REPEAT, reset)
+                    cold_kb = await peak_kb(run, reset)
+                    await run()
+                    warm_ms = await time_case(run, WARM_REPEAT)
+                    warm_kb = await peak_kb(run)
+                if sum(metrics.ERRORS.values.values()) != errors:
+                    failures.append(f"{content}: errores durante la ejecución\n{log.getvalue()}")
+                if not all(channel.sent for channel in channels):
+                    failures.append(f"{content}: no envió ninguna respuesta")
+                elif content not in VOLATILE_COMMANDS:
+                    # En frío y en caliente la respuesta tiene que ser la misma.
+                    if any(sent_summary(channel) != sent_summary(channels[0]) for channel in channels):
+                        failures.append(f"{content}: la respuesta en caliente no coincide con la de un bot recién reiniciado")
+                    outputs["commands"][content] = sent_summary(channels[0])
+                results[content] = {"cold_ms": cold_ms, "warm_ms": warm_ms, "cold_kb": cold_kb, "warm_kb": warm_kb}
+        finally:
+            await http_client.close_session()
+    return results, json.loads(json.dumps(outputs)), failures, served
+
+
+def check_regressions(results, baseline, tolerance):
+    """Casos cuya medición pasó de tolerance × línea base (+ margen): [(caso, medida, valor, límite)]."""
+    regressions = []
+    for case, values in results.items():
+        expected = baseline.get(case)
+        if not expected:
+            continue
+        for measure_name, value in values.items():
+            if measure_name not in expected:
+                continue
+            limit = expected[measure_name] * tolerance + SLACK[measure_name.rsplit("_", 1)[1]]
+            if value > limit:
+                regressions.append((case, measure_name, value, limit))
+    return regressions
+
+
+def bench_commands():
+    tolerance = next((float(arg.split("=", 1)[1]) for arg in sys.argv if arg.startswith("--tolerancia=")), TOLERANCE)
+    results, outputs, failures, served = asyncio.run(_run_commands())
+
+    print(f"{'caso':32} {'frío':>9} {'caliente':>9} {'KB frío':>9} {'KB caliente':>11}")
+    for case, values in results.items():
+        print(f"{case:32} {values['cold_ms']:6.2f} ms {values['warm_ms']:6.2f} ms {values['cold_kb']:9.0f} {values['warm_kb']:11.0f}")
+    print(f"Descargas al servidor local: lista {served['list']}, artículos {served['article']}")
+
+    exit_code = 0
+    if "--actualizar-golden" in sys.argv:
+        REGRESSION_GOLDEN.write_text(json.dumps(outputs, ensure_ascii=False, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Corpus dorado regenerado en {REGRESSION_GOLDEN.name}")
+    else:
+        golden = json.loads(REGRESSION_GOLDEN.read_text(encoding="utf-8"))
+        for section in ("list", "articles", "commands"):
+            if section == "list":
+                same = golden[section] == outputs[section]
+                if not same:
+                    failures.append(f"lista de parches: {outputs[section]} (esperado {golden[section]})")
+                continue
+            for key in sorted(set(golden[section]) | set(outputs[section])):
+                if golden[section].get(key) != outputs[section].get(key):
+                    failures.append(f"{key}: la salida cambió respecto a {REGRESSION_GOLDEN.name}")
+        print(f"Salida comparada con {REGRESSION_GOLDEN.name}: {'OK' if not failures else 'DIFERENTE'}")
+
+    if "--actualizar-linea-base" in sys.argv:
+        rounded = {case: {name: round(value, 2) for name, value in values.items()} for case, values in results.items()}
+        BASELINE.write_text(json.dumps(rounded, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+        print(f"Línea base guardada en {BASELINE.name}")
+    elif BASELINE.exists():
+        regressions = check_regressions(results, json.loads(BASELINE.read_text(encoding="utf-8")), tolerance)
+        for case, measure_name, value, limit in regressions:
+            print(f"  REGRESIÓN {case} {measure_name}: {value:.2f} (límite {limit:.2f})")
+        print(f"Rendimiento contra {BASELINE.name} (tolerancia x{tolerance}): {'OK' if not regressions else f'{len(regressions)} regresiones'}")
+        if regressions:
+            exit_code = 1
+    else:
+        print(f"No hay línea base; guárdala con: python benchmark.py commands --actualizar-linea-base")
+
+    for failure in failures:
+        print(f"  FALLA {failure}")
+    return 1 if failures else exit_code
+
+
+BENCHMARKS = {
+    "extractor": bench_extractor,
+    "parser": bench_parser,
+    "champions": bench_champions,
+    "singleflight": bench_singleflight,
+    "search": bench_search,
+    "diff": bench_diff,
+    "commands": bench_commands,
+    "routing": bench_routing,
+    "shared": bench_shared,
+}
+
+if __name__ == "__main__":
+    selected = [arg for arg in sys.argv[1:] if not arg.startswith("--")] or list(BENCHMARKS)
+    exit_code = 0
+    try:
+        for bench_name in selected:
+            print(f"=== {bench_name} ===")
+            exit_code |= BENCHMARKS[bench_name]() or 0
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    sys.exit(exit_code)
@@ -1,19 +1,44 @@
 #bot.py (BETA v1.2.0 - Enhanced Version)
 
+import time
+PROCESS_START = time.perf_counter()   # para el reporte de arranque (cuánto tardan los imports)
+
 import discord
 import os
-import requests
+import asyncio
 import json
-import locale
+import math
 import pytz
-from bs4 import BeautifulSoup, NavigableString
 from dotenv import load_dotenv
+# Antes de los módulos del bot: varios leen su configuración del entorno al importarse.
+load_dotenv()
 from discord.ext import tasks, commands
 from datetime import datetime, timedelta
-from keep_alive import keep_alive
+from keep_alive import add_check, keep_alive, run_checks, stop_keep_alive
+import calendar_model
+import champion_index
+import command_router
+import config_watcher
+import delivery
+import http_client
+import i18n
+import metrics
+import pagination
+import patch_archive
+import patch_cache
+import patch_diff
+import patch_watcher
+import reminder_ledger
+import reminder_scheduler
+import shared_cache
+import singleflight
+import startup
+import subscriptions
+
+STARTUP = startup.StartupTimeline(PROCESS_START)
+STARTUP.record("imports", PROCESS_START, time.perf_counter())
 
 # --- Configuración y Carga ---
-load_dotenv()
 TOKEN = os.getenv('DISCORD_TOKEN')
 
 # --- Configuración de Zona Horaria ---
@@ -28,244 +53,251 @@ except pytz.exceptions.UnknownTimeZoneError:
 PATCH_DATES = []
 CLASH_EVENTS = []
 CLASH_INFO = {}
-VALID_CHAMPIONS = set()
-PATCH_REMINDERS_SENT = []
-CLASH_REMINDERS_SENT = []
-CHANNEL_ID = int(os.getenv('DISCORD_CHANNEL_ID'))
-PATCH_LIST_URL = "https://www.leagueoflegends.com/es-mx/news/tags/patch-notes/"
-
-
-def load_config():
-    """Carga toda la configuración inicial."""
-    global PATCH_DATES, VALID_CHAMPIONS, CLASH_EVENTS, CLASH_INFO, PATCH_REMINDERS_SENT, CLASH_REMINDERS_SENT
-    
-    # Carga de campeones
+PATCH_CALENDAR = calendar_model.PatchCalendar([], TIMEZONE_CDMX)
+CLASH_CALENDAR = calendar_model.ClashCalendar([], TIMEZONE_CDMX)
+CALENDAR_RENDERS = calendar_model.RenderCache()
+CHAMPION_INDEX = champion_index.ChampionIndex([])
+SENT_REMINDERS = reminder_ledger.ReminderLedger("sent_reminders.jsonl", legacy_path="sent_reminders.json")
+# Canal de anuncios por defecto (opcional): recibe todos los anuncios, como una suscripción más.
+# Cada servidor puede tener la suya en subscriptions.json (se administra con p!avisos).
+CHANNEL_ID = int(os.getenv('DISCORD_CHANNEL_ID') or 0)
+SUBSCRIPTIONS = subscriptions.SubscriptionRegistry(CHANNEL_ID)
+# Idioma de cada servidor (p!idioma): fechas y página de notas de parche. Cada idioma tiene su
+# propia lista de parches (ver patch_watcher_for); PATCH_WATCHER es la del idioma por defecto.
+GUILD_LANGUAGES = i18n.GuildLanguages()
+PATCH_WATCHER = patch_watcher.PatchListWatcher(i18n.patch_list_url(i18n.DEFAULT_LANGUAGE), name=f"patch_list:{i18n.DEFAULT_LANGUAGE}")
+PATCH_WATCHERS = {}   # idioma -> PatchListWatcher (los demás idiomas, se crean al primer uso)
+CONFIG_WATCHER = config_watcher.ConfigWatcher()
+DELIVERY = delivery.DEFAULT_DELIVERY
+CHAMPIONS_PER_PAGE = 40
+
+
+# --- Carga de Archivos de Configuración ---
+# Cada archivo tiene un "loader" que lo lee y valida sin tocar la memoria del bot,
+# y un "apply" que reemplaza las estructuras en memoria y reconstruye lo que depende de ellas.
+# Así una recarga en caliente con un archivo mal escrito no deja al bot a medias.
+def load_champions(path):
+    with open(path, "r", encoding="utf-8") as f:
+        champions = [line.strip() for line in f if line.strip()]
+    if not champions:
+        raise ValueError("la lista de campeones está vacía")
+    return champions
+
+def load_patch_dates(path):
+    with open(path, "r") as f:
+        data = json.load(f)
+    patch_dates = sorted(data.get("patch_dates", []))
+    for date_str in patch_dates:
+        datetime.strptime(date_str, "%Y-%m-%d")
+    return patch_dates
+
+def load_clash_events(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    clash_events = sorted(data.get("clash_events", []), key=lambda x: x['team_formation_start'])
+    for event in clash_events:
+        missing = {"name", "version", "team_formation_start", "tournament_days"} - event.keys()
+        if missing or not event['tournament_days']:
+            raise ValueError(f"evento de Clash incompleto: {event.get('name', event)}")
+        for date_str in [event['team_formation_start'], *event['tournament_days']]:
+            datetime.strptime(date_str, "%Y-%m-%d")
+    return clash_events
+
+def load_clash_info(path):
+    with open(path, "r", encoding="utf-8") as f:
+        clash_info = json.load(f)
+    if not isinstance(clash_info, dict):
+        raise ValueError("clash_info.json debe ser un objeto")
+    return clash_info
+
+def apply_subscriptions(registry_entries):
+    SUBSCRIPTIONS.replace(registry_entries)
+    print(f"Se cargaron {len(SUBSCRIPTIONS)} suscripciones a anuncios.")
+
+def apply_guild_languages(languages):
+    GUILD_LANGUAGES.replace(languages)
+    print(f"Se cargaron los idiomas de {len(GUILD_LANGUAGES)} servidores.")
+
+def apply_champions(champions):
+    global CHAMPION_INDEX
+    CHAMPION_INDEX = champion_index.ChampionIndex(champions)
+    print(f"Se cargaron {len(CHAMPION_INDEX)} campeones.")
+
+def apply_patch_dates(patch_dates):
+    global PATCH_DATES, PATCH_CALENDAR
+    PATCH_CALENDAR = calendar_model.PatchCalendar(patch_dates, TIMEZONE_CDMX)
+    PATCH_DATES = patch_dates
+    CALENDAR_RENDERS.clear()
+    REMINDERS.sync("patch", reminder_scheduler.build_patch_reminders(PATCH_DATES, TIMEZONE_CDMX))
+    print(f"Se cargaron {len(PATCH_DATES)} fechas de parches.")
+
+def apply_clash_events(clash_events):
+    global CLASH_EVENTS, CLASH_CALENDAR
+    CLASH_CALENDAR = calendar_model.ClashCalendar(clash_events, TIMEZONE_CDMX)
+    CLASH_EVENTS = clash_events
+    CALENDAR_RENDERS.clear()
+    REMINDERS.sync("clash", reminder_scheduler.build_clash_reminders(CLASH_EVENTS, TIMEZONE_CDMX))
+    print(f"Se cargaron {len(CLASH_EVENTS)} eventos de Clash.")
+
+def apply_clash_info(clash_info):
+    global CLASH_INFO
+    CLASH_INFO = clash_info
+    print("Se cargó la información de Clash (horarios y premios).")
+
+CONFIG_FILES = {
+    "champions.txt": (load_champions, apply_champions),
+    "patch_dates.json": (load_patch_dates, apply_patch_dates),
+    "clash_dates.json": (load_clash_events, apply_clash_events),
+    "clash_info.json": (load_clash_info, apply_clash_info),
+    subscriptions.SUBSCRIPTIONS_PATH: (subscriptions.load_subscriptions, apply_subscriptions),
+    i18n.LANGUAGES_PATH: (i18n.load_guild_languages, apply_guild_languages),
+}
+
+def reload_config_file(path):
+    """Vuelve a leer un archivo de configuración; si no es válido, se conserva la versión anterior."""
+    loader, apply = CONFIG_FILES[path]
+    value = loader(path)
+    apply(value)
+
+def apply_archived_listing(listing):
+    """Último parche conocido desde el archivo local: los comandos responden aunque no haya red."""
+    if listing and PATCH_WATCHER.result is None:
+        PATCH_WATCHER.result = listing
+
+async def load_patch_archive():
+    """Índice de p!buscar con todo el archivo local (el último parche ya lo cargó load_config)."""
     try:
-        with open("champions.txt", "r", encoding="utf-8") as f:
-            VALID_CHAMPIONS = {line.strip().lower() for line in f}
-        print(f"Se cargaron {len(VALID_CHAMPIONS)} campeones.")
-    except FileNotFoundError:
-        print("Advertencia: No se encontró champions.txt.")
-    
-    # Carga de calendarios
-    try:
-        with open("patch_dates.json", "r") as f:
-            data = json.load(f)
-            PATCH_DATES = sorted(data.get("patch_dates", []))
-        print(f"Se cargaron {len(PATCH_DATES)} fechas de parches.")
-    except FileNotFoundError:
-        print("Advertencia: No se encontró patch_dates.json.")
-        
-    try:
-        with open("clash_dates.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-            CLASH_EVENTS = sorted(data.get("clash_events", []), key=lambda x: x['team_formation_start'])
-        print(f"Se cargaron {len(CLASH_EVENTS)} eventos de Clash.")
-    except FileNotFoundError:
-        print("Advertencia: No se encontró clash_dates.json.")
+        indexed = await patch_cache.build_search_index()
+        print(f"Se cargó el archivo de parches ({len(patch_cache.ARCHIVE)} parches, {indexed} líneas indexadas para p!buscar).")
+    except Exception as e:
+        print(f"Error al abrir el archivo de parches: {e}")
 
-    try:
-        with open("clash_info.json", "r", encoding="utf-8") as f:
-            CLASH_INFO = json.load(f)
-        print("Se cargó la información de Clash (horarios y premios).")
-    except FileNotFoundError:
-        print("Advertencia: No se encontró clash_info.json.")
+async def load_config():
+    """
+    Carga toda la configuración inicial. Los archivos, la memoria de recordatorios y el último
+    parche archivado se leen en paralelo (en hilos); después se aplican en orden.
+    """
+    async def timed_read(name, fn, *args):
+        with STARTUP.phase(name):
+            return await asyncio.to_thread(fn, *args)
+
+    paths = list(CONFIG_FILES)
+    ledger, listing, *values = await asyncio.gather(
+        timed_read("memoria de recordatorios", SENT_REMINDERS.load),
+        timed_read("último parche archivado", patch_cache.ARCHIVE.latest_listing),
+        *(timed_read(f"leer {path}", CONFIG_FILES[path][0], path) for path in paths),
+        return_exceptions=True,
+    )
 
-    # Carga de memoria de recordatorios
-    try:
-        with open("sent_reminders.json", "r") as f:
-            data = json.load(f)
-            PATCH_REMINDERS_SENT = data.get("patch_reminders_sent", [])
-            CLASH_REMINDERS_SENT = data.get("clash_reminders_sent", [])
-        print("Se cargó la memoria de recordatorios.")
-    except (FileNotFoundError, json.JSONDecodeError):
-        print("Advertencia: No se encontró sent_reminders.json o está corrupto. Se creará uno nuevo.")
-        PATCH_REMINDERS_SENT = []
-        CLASH_REMINDERS_SENT = []
-    
-    # Configuración de locale en español
-    try:
-        locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
-    except locale.Error:
+    # La memoria de recordatorios va antes de programar los recordatorios (apply_patch_dates, apply_clash_events).
+    if isinstance(ledger, BaseException):
+        raise ledger
+    print(f"Se cargó la memoria de recordatorios ({len(SENT_REMINDERS)} enviados).")
+    if isinstance(listing, BaseException):
+        print(f"Error al abrir el archivo de parches: {listing}")
+    else:
+        apply_archived_listing(listing)
+
+    for path, value in zip(paths, values):
         try:
-            locale.setlocale(locale.LC_TIME, 'Spanish')
-        except locale.Error:
-            print("Advertencia: No se pudo establecer el locale a español.")
+            if isinstance(value, BaseException):
+                raise value
+            CONFIG_FILES[path][1](value)
+        except FileNotFoundError:
+            print(f"Advertencia: No se encontró {path}.")
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Error: {path} no es válido ({e}).")
+        CONFIG_WATCHER.register(path, reload_config_file)
 
 # --- Funciones de Scraping y Ayuda ---
-def get_latest_patch_info():
+def guild_language(message):
+    """Idioma del servidor donde se escribió el comando (el por defecto en mensajes directos)."""
+    return GUILD_LANGUAGES.get(message.guild.id if message.guild else None)
+
+def patch_watcher_for(language):
+    if language == i18n.DEFAULT_LANGUAGE:
+        return PATCH_WATCHER
+    watcher = PATCH_WATCHERS.get(language)
+    if watcher is None:
+        watcher = PATCH_WATCHERS[language] = patch_watcher.PatchListWatcher(i18n.patch_list_url(language), name=f"patch_list:{language}")
+    return watcher
+
+def patch_watchers():
+    """{idioma: PatchListWatcher} de todos los idiomas consultados hasta ahora."""
+    return {i18n.DEFAULT_LANGUAGE: PATCH_WATCHER, **PATCH_WATCHERS}
+
+async def get_latest_patch_info(force=False, language=i18n.DEFAULT_LANGUAGE):
+    """
+    Devuelve (título, url, fecha) del último parche en la página del idioma. Entre revisiones se
+    reutiliza el resultado en memoria; force=True obliga a consultar la página (lo usan las tareas automáticas).
+    """
+    watcher = patch_watcher_for(language)
     try:
-        response = requests.get(PATCH_LIST_URL, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        latest_article_link = soup.find('a', href=lambda href: href and '/news/game-updates/patch-' in href)
-        if latest_article_link:
-            title_element = latest_article_link.find('div', attrs={'data-testid': 'card-title'})
-            patch_title = title_element.text.strip() if title_element else "Título no encontrado"
-            patch_date = ""
-            date_element = latest_article_link.find('time')
-            if date_element and date_element.has_attr('datetime'):
-                timestamp_str = date_element['datetime']
-                date_obj = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                patch_date = date_obj.strftime('%d/%m/%Y')
-            patch_url_partial = latest_article_link['href']
-            patch_url_full = "https://www.leagueoflegends.com" + patch_url_partial
-            return patch_title, patch_url_full, patch_date
-        return None, None, None
+        return await watcher.latest(force=force)
     except Exception as e:
+        metrics.record_error("get_latest_patch_info", e)
         print(f"Error en get_latest_patch_info: {e}")
-        return None, None, None
+        return watcher.result or (None, None, None)
 
-def scrape_summary_image(patch_url):
+async def prewarm_patch(patch_url):
+    """Deja el parche listo en caché (artículo, campeones, objetos, runas) antes de anunciarlo."""
     try:
-        response = requests.get(patch_url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        summary_link = soup.find('a', class_='cboxElement')
-        if summary_link:
-            image_tag = summary_link.find('img')
-            if image_tag and image_tag.has_attr('src'):
-                return image_tag['src']
+        report = await patch_cache.prewarm(patch_url)
+        if not report.was_cached:
+            print(f"Parche precargado: {report.summary()}")
+        return report
+    except Exception as e:
+        metrics.record_error("prewarm_patch", e)
+        print(f"Error en prewarm_patch: {e}")
         return None
+
+async def scrape_summary_image(patch_url):
+    try:
+        model = await patch_cache.get_patch_model(patch_url)
+        return model.summary_image
     except Exception as e:
+        metrics.record_error("scrape_summary_image", e)
         print(f"Error en scrape_summary_image: {e}")
         return None
 
-def scrape_champion_list(patch_url):
+async def scrape_champion_list(patch_url):
     try:
-        response = requests.get(patch_url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        champion_links = soup.find_all('a', href=lambda href: href and '/champions/' in href)
-        champion_names = []
-        for link in champion_links:
-            name = link.text.strip()
-            if name and name not in champion_names:
-                champion_names.append(name)
-        return champion_names
+        model = await patch_cache.get_patch_model(patch_url)
+        return model.champion_list
     except Exception as e:
+        metrics.record_error("scrape_champion_list", e)
         print(f"Error en scrape_champion_list: {e}")
         return []
 
-def format_change_li(li_element):
-    parts = []
-    for content in li_element.contents:
-        if content.name == 'strong':
-            parts.append(f"**{content.get_text(strip=True)}**")
-        elif isinstance(content, NavigableString):
-            text = str(content).replace('⇒', ' ⇒ ')
-            parts.append(text.strip())
-    return ' '.join(filter(None, parts))
-
-def scrape_champion_details(patch_url, champion_name):
+async def scrape_champion_details(patch_url, champion_name, key=None):
     """Extrae TODOS los bloques de cambios de un campeón (habilidades, estadísticas, etc.)."""
     try:
-        response = requests.get(patch_url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        normalized_name = champion_name.lower().replace(' ', '').replace('.', '').replace("'", "")
-        target_id = f"patch-{normalized_name}"
-        
-        champion_header = soup.find('h3', id=target_id)
-        if not champion_header: return None
-
-        champion_data = { "name": champion_name.title(), "portrait_url": None, "summary": "", "change_blocks": [] }
-
-        portrait_link = champion_header.find_previous('a', class_='reference-link')
-        if portrait_link and portrait_link.find('img'):
-            champion_data['portrait_url'] = portrait_link.find('img')['src']
-        
-        summary_tag = champion_header.find_next_sibling('blockquote')
-        if summary_tag:
-            champion_data['summary'] = summary_tag.get_text(strip=True)
-
-        all_siblings = champion_header.find_next_siblings()
-        change_headers = []
-        for sibling in all_siblings:
-            if sibling.name == 'h3':
-                break
-            if sibling.name == 'h4' and 'change-detail-title' in sibling.get('class', []):
-                change_headers.append(sibling)
-
-        for header in change_headers:
-            icon_tag = header.find('img')
-            icon_url = icon_tag['src'] if icon_tag else None
-            
-            changes_list_tag = header.find_next_sibling('ul')
-            changes = []
-            if changes_list_tag:
-                changes = [f"• {format_change_li(li)}" for li in changes_list_tag.find_all('li')]
-            
-            current_block = {
-                "title": header.get_text(strip=True),
-                "icon_url": icon_url,
-                "changes": changes
-            }
-            champion_data['change_blocks'].append(current_block)
-
-        return champion_data
+        model = await patch_cache.get_patch_model(patch_url)
+        return model.champion_details(champion_name, key)
     except Exception as e:
+        metrics.record_error("scrape_champion_details", e)
         print(f"Error en scrape_champion_details: {e}")
         return None
 
-def scrape_section_details(patch_url, section_id, header_tag='h2'):
+async def scrape_patch_diff(patch_url):
+    """Buffs y nerfs del parche (ver patch_diff.py)."""
+    try:
+        return await patch_cache.get_patch_diff(patch_url)
+    except Exception as e:
+        metrics.record_error("scrape_patch_diff", e)
+        print(f"Error en scrape_patch_diff: {e}")
+        return None
+
+async def scrape_section_details(patch_url, section_id):
     """
     Extrae una lista de todos los bloques de cambio (para objetos o runas)
     dentro de una sección.
     """
     try:
-        response = requests.get(patch_url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # 1. Encontramos el encabezado principal (ej. <h2 id="patch-items">)
-        main_header = soup.find(header_tag, id=section_id)
-        if not main_header:
-            return [] # Devolvemos una lista vacía si la sección no existe
-
-        # 2. Determinamos el "padre" desde donde iterar
-        iterate_from = main_header
-        if main_header.parent.name == 'header':
-            iterate_from = main_header.parent
-
-        change_blocks_data = []
-        
-        # 3. Iteramos sobre los "hermanos" del encabezado
-        for sibling in iterate_from.find_next_siblings():
-            # 4. Condición de parada (si encontramos el siguiente encabezado principal)
-            if (sibling.name == header_tag) or (sibling.name == 'header' and sibling.find(header_tag)):
-                break
-            
-            # 5. Encontramos todos los sub-bloques de cambio (ej. cada item)
-            # Buscamos por la misma estructura que 'p!ver' (h3, h4, etc.)
-            item_headers = sibling.find_all(['h3', 'h4'], class_='change-title')
-            
-            for item_header in item_headers:
-                item_data = { "title": item_header.get_text(strip=True), "icon_url": None, "summary": "", "changes": [] }
-                
-                # Buscar el ícono (igual que en campeones)
-                icon_link = item_header.find_previous('a', class_='reference-link')
-                if icon_link and icon_link.find('img'):
-                    item_data['icon_url'] = icon_link.find('img')['src']
-                
-                # Buscar el resumen (blockquote) y la lista (ul)
-                current_element = item_header
-                while hasattr(current_element, 'next_sibling') and current_element.next_sibling:
-                    current_element = current_element.next_sibling
-                    if current_element.name == 'h3' or current_element.name == 'h4': # Parar si encontramos el siguiente item
-                        break
-                    if current_element.name == 'blockquote':
-                        item_data['summary'] = current_element.get_text(strip=True)
-                    if current_element.name == 'ul':
-                        item_data['changes'] = [f"• {format_change_li(li)}" for li in current_element.find_all('li')]
-                        # A diferencia de !ver, a veces el resumen viene DESPUÉS de la lista
-                        # así que no rompemos el bucle aquí.
-                
-                change_blocks_data.append(item_data)
-
-        return change_blocks_data
+        model = await patch_cache.get_patch_model(patch_url)
+        return model.section_details(section_id)
     except Exception as e:
+        metrics.record_error("scrape_section_details", e)
         print(f"Error en scrape_section_details: {e}")
         return []
     
@@ -285,238 +317,362 @@ def format_timedelta(delta):
 # --- Configuración del Bot ---
 intents = discord.Intents.default()
 intents.message_content = True 
+
+# Con SLASH_COMMANDS=1 los mismos comandos también se registran como slash commands (/ver, /resumen...).
+SLASH_COMMANDS = os.getenv('SLASH_COMMANDS', '0') == '1'
+
+class PoroBot(commands.Bot):
+    async def setup_hook(self):
+        # El servidor de salud corre en el mismo event loop que el bot (sin hilos extra). Es lo único
+        # que arranca antes del gateway: Render necesita el puerto abierto para dar por bueno el deploy.
+        try:
+            with STARTUP.phase("servidor de salud"):
+                await keep_alive()
+        except OSError as e:
+            print(f"Error al iniciar el servidor de salud: {e}")
+
+    async def close(self):
+        # Liberamos el pool de conexiones HTTP antes de desconectarnos.
+        await stop_keep_alive()
+        await http_client.close_session()
+        await super().close()
+
 # Usamos un prefijo que no exista para que el sistema de comandos no interfiera con nuestro on_message.
-bot = commands.Bot(command_prefix='&', intents=intents)
+bot = PoroBot(command_prefix='&', intents=intents)
 
 # --- TAREAS AUTOMÁTICAS (NUEVA LÓGICA) ---
+def is_reminder_sent(reminder_id):
+    return reminder_id in SENT_REMINDERS
+
+async def mark_reminder_sent(reminder):
+    await asyncio.to_thread(SENT_REMINDERS.add, reminder.reminder_id, reminder.group, reminder.due_at.date())
+
+# --- ANUNCIOS A LOS CANALES SUSCRITOS ---
+TIMEZONE_LABELS = {"America/Mexico_City": "CDMX"}
+
+def format_local_time(moment, timezone):
+    """"17:00 (CDMX)" en la zona horaria de la suscripción."""
+    return f"{moment.astimezone(timezone).strftime('%H:%M')} ({TIMEZONE_LABELS.get(timezone.zone, timezone.zone)})"
+
+def subscription_language(subscription):
+    return GUILD_LANGUAGES.get(subscription.guild_id)
+
+def announcement_channels(announcement_type):
+    """[(canal, zona horaria, idioma)] de las suscripciones a este tipo de anuncio cuyos canales ve el bot."""
+    targets = []
+    for subscription in SUBSCRIPTIONS.targets(announcement_type):
+        channel = bot.get_channel(subscription.channel_id)
+        if channel is None:
+            continue
+        # El canal por defecto no duplica el anuncio si su servidor ya tiene su propia suscripción.
+        guild = getattr(channel, 'guild', None)
+        if subscription.guild_id is None and guild is not None and SUBSCRIPTIONS.get(guild.id):
+            continue
+        targets.append((channel, pytz.timezone(subscription.timezone), subscription_language(subscription)))
+    return targets
+
+async def announce(announcement_type, render, label):
+    """
+    Envía un anuncio a todos los canales suscritos. `render(zona, idioma)` construye el embed una
+    sola vez por cada zona horaria e idioma distintos (no por canal) y los envíos van en paralelo
+    con delivery.fan_out. Devuelve el FanOutReport, o None si ningún canal suscrito está disponible.
+    """
+    targets = announcement_channels(announcement_type)
+    if not targets:
+        return None
+    variants = {}
+    embeds = {}
+    for channel, timezone, language in targets:
+        variant = variants[channel.id] = (timezone.zone, language)
+        if variant not in embeds:
+            embeds[variant] = render(timezone, language)
+
+    async def send(channel):
+        await DELIVERY.send_embeds(channel, [embeds[variants[channel.id]]])
+
+    return await delivery.fan_out([channel for channel, _, _ in targets], send, label=label)
 
-def update_reminders_file():
-    """Función de ayuda para guardar el estado de la memoria en el JSON."""
-    with open("sent_reminders.json", "w") as f:
-        json.dump({
-            "patch_reminders_sent": PATCH_REMINDERS_SENT,
-            "clash_reminders_sent": CLASH_REMINDERS_SENT
-        }, f, indent=4)
-
-@tasks.loop(minutes=1)
-async def patch_scheduler():
-    """Revisa cada minuto si debe enviar un anuncio relacionado con los parches."""
-    now_cdmx = datetime.now(TIMEZONE_CDMX)
-    channel = bot.get_channel(CHANNEL_ID)
-    if not channel: return
-
-    # --- 1. Lógica del Recordatorio Pre-Parche (10:00 AM del día anterior) ---
-    for date_str in PATCH_DATES:
+async def localized_patch_infos(announcement_type, patch_info, same_patch):
+    """
+    {idioma: (título, url, fecha)} para los idiomas de los suscriptores: el mismo parche en la página
+    de cada idioma si esa página ya lo publicó (same_patch(url)); si no, se usa `patch_info`.
+    """
+    infos = {i18n.DEFAULT_LANGUAGE: patch_info}
+    languages = {subscription_language(subscription) for subscription in SUBSCRIPTIONS.targets(announcement_type)}
+    for language in languages - set(infos):
+        info = await get_latest_patch_info(force=True, language=language)
+        if info[1] and same_patch(info[1]):
+            infos[language] = info
+    return infos
+
+def render_reminder(reminder, timezone, language, now, patch_info=None):
+    """Embed de un recordatorio del planificador, con las horas en la zona y las fechas en el idioma de la suscripción."""
+    embed = None
+
+    # --- Recordatorio Pre-Parche (10:00 AM del día anterior) ---
+    if reminder.kind == "prepatch":
+        date_str = reminder.data['date']
         patch_date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        reminder_time = patch_date_obj - timedelta(days=1)
-        reminder_id = f"{date_str}-prepatch"
-
-        if (now_cdmx.year == reminder_time.year and
-            now_cdmx.month == reminder_time.month and
-            now_cdmx.day == reminder_time.day and
-            now_cdmx.hour == 10 and now_cdmx.minute == 0 and
-            reminder_id not in PATCH_REMINDERS_SENT):
-            
-            disable_time = patch_date_obj.replace(hour=1, minute=30)
-            # Aseguramos que el tiempo de CDMX esté asignado
-            disable_time = TIMEZONE_CDMX.localize(disable_time) 
-            time_remaining = disable_time - now_cdmx
-            
-            embed = discord.Embed(title="⏰ ¡Recordatorio de Parche!", description=f"Mañana, **{patch_date_obj.strftime('%d de %B')}**, es día de parche. Las colas clasificatorias se desactivarán aproximadamente a la 1:30 AM (CDMX).", color=discord.Color.orange())
-            embed.add_field(name="Tiempo Restante para la Desactivación", value=format_timedelta(time_remaining))
-            await channel.send(embed=embed)
-            
-            PATCH_REMINDERS_SENT.append(reminder_id)
-            update_reminders_file()
-            break # Solo un anuncio de parche por ciclo
-
-    # --- 2. Lógica del Anuncio de Notas (Medianoche del día del parche) ---
-    for date_str in PATCH_DATES:
-        patch_date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-        reminder_id = f"{date_str}-notes-published"
-
-        if (now_cdmx.date() == patch_date_obj and
-            now_cdmx.hour == 0 and now_cdmx.minute == 0 and
-            reminder_id not in PATCH_REMINDERS_SENT):
-            
-            title, url, date = get_latest_patch_info()
-            if url and (date_str in url or (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d') in url):
-                embed = discord.Embed(title=f"✅ ¡Notas del Parche ya Disponibles!", description=f"Ya puedes consultar las notas de la versión **{title}**.", color=discord.Color.green(), url=url)
-                await channel.send(embed=embed)
-                
-                PATCH_REMINDERS_SENT.append(reminder_id)
-                update_reminders_file()
-                break
-
-    # --- 3. Lógica de Revisión de Página (cada 30 mins) ---
-    # Revisa si hay un parche nuevo que no estaba en el calendario
-    if now_cdmx.minute % 30 == 0:
-        title, url, date = get_latest_patch_info()
-        if not url: return
-        
-        try:
-            with open("last_patch_url.txt", "r") as f: last_url = f.read().strip()
-        except FileNotFoundError: last_url = ""
-            
-        if url != last_url:
-            print(f"Nuevo parche detectado por scraping: {title}")
-            image_url = scrape_summary_image(url)
-            embed = discord.Embed(title=f"¡Nuevas Notas de Parche Disponibles!", description=f"**{title}** - Publicado el {date}", color=discord.Color.gold(), url=url)
-            if image_url:
-                embed.set_image(url=image_url)
-            await channel.send(embed=embed)
-            with open("last_patch_url.txt", "w") as f: f.write(url)
-
-@tasks.loop(minutes=1)
-async def clash_scheduler():
-    """Revisa cada minuto si debe enviar un anuncio relacionado con Clash."""
-    now_cdmx = datetime.now(TIMEZONE_CDMX)
-    channel = bot.get_channel(CHANNEL_ID)
-    if not channel: return
-    
-    reminders_updated = False
-    for event in CLASH_EVENTS:
-        formation_date = datetime.strptime(event['team_formation_start'], "%Y-%m-%d").date()
-        reminder_id_formation = f"{event['name']}-{event['team_formation_start']}-formation"
-
-        if (now_cdmx.date() == formation_date and
-            now_cdmx.hour == 10 and now_cdmx.minute == 0 and
-            reminder_id_formation not in CLASH_REMINDERS_SENT):
-            
-            first_tournament_day = TIMEZONE_CDMX.localize(datetime.strptime(event['tournament_days'][0], "%Y-%m-%d"))
-            time_remaining = first_tournament_day - now_cdmx
-            tournament_days_str = " y ".join([datetime.strptime(d, "%Y-%m-%d").strftime("%d") for d in event['tournament_days']])
-            month_year = datetime.strptime(event['tournament_days'][0], "%Y-%m-%d").strftime("%B")
-            
-            embed = discord.Embed(title=f"📢 ¡La Formación de Equipos para Clash: {event['name']} ha comenzado!", color=discord.Color.green())
-            embed.add_field(name="Días del Torneo", value=f"{tournament_days_str} de {month_year}", inline=False)
-            embed.add_field(name="Tiempo Restante para el Torneo", value=format_timedelta(time_remaining), inline=False)
-            embed.add_field(name="Hora de Confirmación General", value="A partir de las 17:00 CDMX.", inline=False)
-            await channel.send(embed=embed)
-            
-            CLASH_REMINDERS_SENT.append(reminder_id_formation)
-            reminders_updated = True
+        disable_time = TIMEZONE_CDMX.localize(patch_date_obj.replace(hour=1, minute=30))
+        time_remaining = disable_time - now
+        embed = discord.Embed(title="⏰ ¡Recordatorio de Parche!", description=f"Mañana, **{i18n.format_date(disable_time.astimezone(timezone), 'day_month', language)}**, es día de parche. Las colas clasificatorias se desactivarán aproximadamente a las {format_local_time(disable_time, timezone)}.", color=discord.Color.orange())
+        embed.add_field(name="Tiempo Restante para la Desactivación", value=format_timedelta(time_remaining))
+
+    # --- Anuncio de Notas (Medianoche del día del parche) ---
+    elif reminder.kind == "notes":
+        title, url, date = patch_info
+        embed = discord.Embed(title=f"✅ ¡Notas del Parche ya Disponibles!", description=f"Ya puedes consultar las notas de la versión **{title}**.", color=discord.Color.green(), url=url)
+
+    # --- Inicio de Formación de Equipos de Clash ---
+    elif reminder.kind == "formation":
+        event = reminder.data['event']
+        first_tournament_day = TIMEZONE_CDMX.localize(datetime.strptime(event['tournament_days'][0], "%Y-%m-%d"))
+        time_remaining = first_tournament_day - now
+        tournament_days = i18n.format_days([datetime.strptime(d, "%Y-%m-%d") for d in event['tournament_days']], "days_month", language)
+        confirmation_time = first_tournament_day.replace(hour=17)
+
+        embed = discord.Embed(title=f"📢 ¡La Formación de Equipos para Clash: {event['name']} ha comenzado!", color=discord.Color.green())
+        embed.add_field(name="Días del Torneo", value=tournament_days, inline=False)
+        embed.add_field(name="Tiempo Restante para el Torneo", value=format_timedelta(time_remaining), inline=False)
+        embed.add_field(name="Hora de Confirmación General", value=f"A partir de las {format_local_time(confirmation_time, timezone)}.", inline=False)
+
+    # --- Recordatorio 10:00 AM del día de torneo ---
+    elif reminder.kind == "morning":
+        event = reminder.data['event']
+        confirmation_start_time = TIMEZONE_CDMX.localize(datetime.strptime(reminder.data['day'], "%Y-%m-%d").replace(hour=17))
+        time_remaining = confirmation_start_time - now
+        first_place_prize = CLASH_INFO.get("premios", {}).get("lista", [{}])[0].get("recompensa", "Recompensas épicas")
+
+        embed = discord.Embed(title=f"⚔️ ¡Hoy es día de Torneo Clash: {event['name']}!", color=discord.Color.gold())
+        embed.add_field(name="Premio del 1er Lugar", value=first_place_prize, inline=False)
+        embed.add_field(name=f"La Fase de Confirmación inicia a las {format_local_time(confirmation_start_time, timezone)}", value=f"(Faltan: {format_timedelta(time_remaining)})", inline=False)
+
+    # --- Recordatorio 18:50 PM (última llamada) ---
+    elif reminder.kind == "final":
+        event = reminder.data['event']
+        confirmation_end_time = TIMEZONE_CDMX.localize(datetime.strptime(reminder.data['day'], "%Y-%m-%d").replace(hour=19))
+        time_remaining = confirmation_end_time - now
+        first_place_prize = CLASH_INFO.get("premios", {}).get("lista", [{}])[0].get("recompensa", "Recompensas épicas")
+
+        embed = discord.Embed(title=f"🚨 ¡ÚLTIMA LLAMADA PARA CLASH: {event['name']}!", description="**¡SOLO QUEDAN 10 MINUTOS PARA CONFIRMAR!**", color=discord.Color.dark_red())
+        embed.add_field(name="Premio del 1er Lugar", value=first_place_prize, inline=False)
+        embed.add_field(name=f"La Fase de Confirmación termina a las {format_local_time(confirmation_end_time, timezone)}", value=f"(Cierra en: {format_timedelta(time_remaining)})", inline=False)
+
+    return embed
+
+async def send_reminder(reminder):
+    """Envía un recordatorio del planificador a los canales suscritos. Devuelve False si hay que reintentarlo más tarde."""
+    announcement_type = subscriptions.REMINDER_TYPES.get(reminder.kind)
+    if announcement_type is None or not SUBSCRIPTIONS.targets(announcement_type):
+        return True   # nadie está suscrito a este tipo de anuncio
+
+    patch_infos = {}
+    if reminder.kind == "notes":
+        date_str = reminder.data['date']
+        day_before = (reminder.due_at - timedelta(days=1)).strftime('%Y-%m-%d')
+        patch_info = await get_latest_patch_info(force=True)
+        title, url, date = patch_info
+        if not (url and (date_str in url or day_before in url)):
+            return False # Las notas todavía no están publicadas; se reintenta dentro del periodo de gracia.
+        patch_infos = await localized_patch_infos(announcement_type, patch_info, lambda url: date_str in url or day_before in url)
+
+    now = datetime.now(pytz.utc)
+
+    def render(timezone, language):
+        patch_info = patch_infos.get(language, patch_infos.get(i18n.DEFAULT_LANGUAGE))
+        return render_reminder(reminder, timezone, language, now, patch_info)
+
+    report = await announce(announcement_type, render, label=f"recordatorio {reminder.reminder_id}")
+    # Sin canales disponibles (el bot aún no termina de conectarse) o todos fallaron: se reintenta.
+    if report is None or not report.delivered:
+        return False
+    await mark_reminder_sent(reminder)
+    return True
+
+REMINDERS = reminder_scheduler.ReminderScheduler(TIMEZONE_CDMX, send_reminder, is_reminder_sent,
+                                                prune_sent=SENT_REMINDERS.prune_before)
+REMINDERS_TASK = None
+CONFIG_WATCHER_TASK = None
+PATCH_CHECK_MINUTES = 30
+LAST_PATCH_CHECK = None   # time.monotonic() de la última revisión de parches
+
+@tasks.loop(minutes=PATCH_CHECK_MINUTES)
+@metrics.timed(metrics.SCHEDULER_SECONDS, task="patch_page_check")
+async def patch_page_check():
+    """
+    Revisa cada 30 minutos si hay un parche nuevo que no estaba en el calendario.
+    También corre al arrancar: en cada vuelta se precarga el último parche, así que
+    los primeros comandos tras un parche nuevo (o tras reiniciar) ya lo encuentran en caché.
+    """
+    global LAST_PATCH_CHECK
+    LAST_PATCH_CHECK = time.monotonic()
+    title, url, date = await get_latest_patch_info(force=True)
+    if not url: return
 
-        for day_str in event['tournament_days']:
-            tournament_date = datetime.strptime(day_str, "%Y-%m-%d").date()
-            
-            # Recordatorio 10:00 AM
-            reminder_id_morning = f"{event['name']}-{day_str}-morning"
-            if (now_cdmx.date() == tournament_date and
-                now_cdmx.hour == 10 and now_cdmx.minute == 0 and
-                reminder_id_morning not in CLASH_REMINDERS_SENT):
-                
-                confirmation_start_time = TIMEZONE_CDMX.localize(now_cdmx.replace(hour=17, minute=0, second=0))
-                time_remaining = confirmation_start_time - now_cdmx
-                first_place_prize = CLASH_INFO.get("premios", {}).get("lista", [{}])[0].get("recompensa", "Recompensas épicas")
-
-                embed = discord.Embed(title=f"⚔️ ¡Hoy es día de Torneo Clash: {event['name']}!", color=discord.Color.gold())
-                embed.add_field(name="Premio del 1er Lugar", value=first_place_prize, inline=False)
-                embed.add_field(name="La Fase de Confirmación inicia a las 17:00 CDMX", value=f"(Faltan: {format_timedelta(time_remaining)})", inline=False)
-                await channel.send(embed=embed)
-                
-                CLASH_REMINDERS_SENT.append(reminder_id_morning)
-                reminders_updated = True
-            
-            # Recordatorio 18:50 PM
-            reminder_id_final = f"{event['name']}-{day_str}-final"
-            if (now_cdmx.date() == tournament_date and
-                now_cdmx.hour == 18 and now_cdmx.minute == 50 and
-                reminder_id_final not in CLASH_REMINDERS_SENT):
-                
-                confirmation_end_time = TIMEZONE_CDMX.localize(now_cdmx.replace(hour=19, minute=0, second=0))
-                time_remaining = confirmation_end_time - now_cdmx
-                first_place_prize = CLASH_INFO.get("premios", {}).get("lista", [{}])[0].get("recompensa", "Recompensas épicas")
-
-                embed = discord.Embed(title=f"🚨 ¡ÚLTIMA LLAMADA PARA CLASH: {event['name']}!", description="**¡SOLO QUEDAN 10 MINUTOS PARA CONFIRMAR!**", color=discord.Color.dark_red())
-                embed.add_field(name="Premio del 1er Lugar", value=first_place_prize, inline=False)
-                embed.add_field(name="La Fase de Confirmación termina a las 19:00 CDMX", value=f"(Cierra en: {format_timedelta(time_remaining)})", inline=False)
-                await channel.send(embed=embed)
-
-                CLASH_REMINDERS_SENT.append(reminder_id_final)
-                reminders_updated = True
-
-    if reminders_updated:
-        update_reminders_file()
+    # Antes del anuncio: quien lea el aviso y use p!ver ya no paga la descarga.
+    try:
+        await asyncio.to_thread(patch_cache.ARCHIVE.save_listing, title, url, date)
+    except Exception as e:
+        metrics.record_error("patch_archive", e)
+        print(f"Error al archivar el último parche: {e}")
+    await prewarm_patch(url)
+
+    try:
+        with open("last_patch_url.txt", "r") as f: last_url = f.read().strip()
+    except FileNotFoundError: last_url = ""
+        
+    if url != last_url:
+        print(f"Nuevo parche detectado por scraping: {title}")
+        patch_infos = await localized_patch_infos(subscriptions.NEW_PATCH, (title, url, date),
+                                                  lambda localized_url: i18n.article_key(localized_url) == i18n.article_key(url))
+        image_urls = {}
+        for language, (_, localized_url, _) in patch_infos.items():
+            if localized_url != url:
+                await prewarm_patch(localized_url)
+            image_urls[language] = await scrape_summary_image(localized_url)
+
+        def render(timezone, language):
+            if language not in patch_infos:
+                language = i18n.DEFAULT_LANGUAGE
+            localized_title, localized_url, localized_date = patch_infos[language]
+            embed = discord.Embed(title=f"¡Nuevas Notas de Parche Disponibles!", description=f"**{localized_title}** - Publicado el {localized_date}", color=discord.Color.gold(), url=localized_url)
+            if image_urls[language]:
+                embed.set_image(url=image_urls[language])
+            return embed
+
+        report = await announce(subscriptions.NEW_PATCH, render, label="nuevo parche")
+        # Si hay suscriptores pero sus canales aún no están disponibles, se reintenta en la siguiente revisión.
+        if (report is None or not report.delivered) and SUBSCRIPTIONS.targets(subscriptions.NEW_PATCH):
+            return
+        with open("last_patch_url.txt", "w") as f: f.write(url)
+
+# --- SALUD Y MÉTRICAS (/readyz y /metrics en keep_alive.py) ---
+READY_MAX_LATENCY = float(os.getenv('READY_MAX_LATENCY', 5))   # segundos de latencia del gateway
+
+def seconds_since(monotonic_time):
+    return None if monotonic_time is None else round(time.monotonic() - monotonic_time)
+
+def task_alive(task):
+    return task is not None and not task.done()
+
+def check_gateway():
+    latency = bot.latency
+    if not bot.is_ready() or bot.is_closed():
+        return False, "sin conexión al gateway"
+    if math.isnan(latency) or math.isinf(latency) or latency > READY_MAX_LATENCY:
+        return False, f"latencia del gateway: {latency}"
+    return True, f"latencia del gateway: {latency * 1000:.0f} ms"
+
+def check_reminders():
+    idle = seconds_since(REMINDERS.last_tick)
+    ok = task_alive(REMINDERS_TASK) and idle is not None and idle <= 2 * reminder_scheduler.MAX_SLEEP_SECONDS
+    return ok, f"{len(REMINDERS)} pendientes, última vuelta hace {idle} s, {REMINDERS.failures} envíos con error"
+
+def check_patch_page():
+    idle = seconds_since(LAST_PATCH_CHECK)
+    ok = patch_page_check.is_running() and idle is not None and idle <= 2 * PATCH_CHECK_MINUTES * 60
+    return ok, f"última revisión hace {idle} s"
+
+def check_config_watcher():
+    return task_alive(CONFIG_WATCHER_TASK), "vigilando archivos de configuración"
+
+def check_patch_cache():
+    known = PATCH_WATCHER.result is not None and PATCH_WATCHER.result[1] is not None
+    cached = known and PATCH_WATCHER.result[1] in patch_cache.PATCH_MODELS
+    return known, f"último parche: {PATCH_WATCHER.result[0] if known else 'desconocido'}, en caché: {'sí' if cached else 'no'}"
+
+add_check("gateway", check_gateway)
+add_check("reminders", check_reminders)
+add_check("patch_page_check", check_patch_page)
+add_check("config_watcher", check_config_watcher)
+add_check("patch_cache", check_patch_cache)
+
+metrics.gauge("gateway_latency_seconds", "Latencia del heartbeat con el gateway de Discord.", lambda: bot.latency)
+metrics.gauge("ready", "1 si todas las verificaciones de /readyz pasan.", lambda: int(run_checks()[0]))
+metrics.gauge("guilds", "Servidores en los que está el bot.", lambda: len(bot.guilds))
+metrics.gauge("startup_phase_seconds", "Duración de cada fase del arranque.",
+              lambda: {(("phase", name),): seconds for name, seconds in STARTUP.durations().items()})
+metrics.gauge("startup_ready_seconds", "Segundos desde que arrancó el proceso hasta conectarse al gateway.", lambda: STARTUP.ready_at)
+metrics.gauge("shared_cache", "Caché compartida entre procesos: leídas, hechas como líder, esperas y errores.",
+              lambda: {(("result", name),): value for name, value in shared_cache.SHARED.stats.items()}
+              if shared_cache.SHARED else {})
+metrics.gauge("guild_languages", "Servidores que eligieron cada idioma con p!idioma.",
+              lambda: {(("language", code),): count for code, count in GUILD_LANGUAGES.counts().items()})
+metrics.gauge("subscriptions", "Servidores suscritos a los anuncios automáticos.", lambda: len(SUBSCRIPTIONS))
+metrics.gauge("reminders_pending", "Recordatorios programados.", lambda: len(REMINDERS))
+metrics.gauge("reminders_sent", "Recordatorios enviados en el registro.", lambda: len(SENT_REMINDERS))
+metrics.gauge("patch_models_cached", "Artículos de parche en la caché en memoria.", lambda: len(patch_cache.PATCH_MODELS))
+metrics.gauge("patch_cache_hits", "Aciertos de la caché de artículos.", lambda: patch_cache.PATCH_MODELS.hits)
+metrics.gauge("patch_cache_misses", "Fallos de la caché de artículos.", lambda: patch_cache.PATCH_MODELS.misses)
+metrics.gauge("patch_archive_patches", "Parches guardados en el archivo local.", lambda: len(patch_cache.ARCHIVE))
+metrics.gauge("search_documents", "Líneas indexadas para p!buscar.", lambda: len(patch_cache.SEARCH_INDEX))
+metrics.gauge("patch_list_polls", "Consultas a la lista de parches, por idioma y resultado.",
+              lambda: {(("language", language), ("result", name)): value
+                       for language, watcher in patch_watchers().items() for name, value in watcher.stats.items()})
+metrics.gauge("singleflight_calls", "Llamadas combinadas por single-flight, por grupo y tipo.",
+              lambda: {(("group", group), ("kind", kind)): value
+                       for group, group_stats in singleflight.stats().items() for kind, value in group_stats.items()})
+metrics.gauge("patch_check_age_seconds", "Segundos desde la última revisión de parches.", lambda: seconds_since(LAST_PATCH_CHECK))
 
 # --- EVENTOS DEL BOT ---
+async def sync_slash_commands():
+    try:
+        COMMANDS.register_slash_commands(bot.tree)
+        synced = await bot.tree.sync()
+        print(f"Se registraron {len(synced)} slash commands.")
+    except Exception as e:
+        metrics.record_error("slash_commands", e)
+        print(f"Error al registrar los slash commands: {e}")
+
+async def start_optional_subsystems():
+    """Lo que no hace falta para conectarse: arranca una sola vez, cuando el gateway ya está listo."""
+    with STARTUP.phase("índice de p!buscar"):
+        await load_patch_archive()
+    if SLASH_COMMANDS:
+        with STARTUP.phase("slash commands"):
+            await sync_slash_commands()
+    print(STARTUP.report())
+
 @bot.event
 async def on_ready():
+    global REMINDERS_TASK, CONFIG_WATCHER_TASK
+    STARTUP.end("gateway")
+    STARTUP.mark_ready()
     print(f"¡{bot.user} se ha conectado a Discord!")
-    if not patch_scheduler.is_running():
-        patch_scheduler.start()
-    if not clash_scheduler.is_running():
-        clash_scheduler.start()
+    if REMINDERS_TASK is None or REMINDERS_TASK.done():
+        REMINDERS_TASK = asyncio.create_task(REMINDERS.run())
+    if CONFIG_WATCHER_TASK is None or CONFIG_WATCHER_TASK.done():
+        CONFIG_WATCHER_TASK = asyncio.create_task(CONFIG_WATCHER.run())
+    if not patch_page_check.is_running():
+        patch_page_check.start()
+    if not STARTUP.reported:
+        STARTUP.reported = True
+        asyncio.create_task(start_optional_subsystems())
 
 # --- NUEVO "PORTERO" (MANEJADOR DE MENSAJES) ---
+# La tabla de comandos se llena al final del archivo, cuando ya existen todos los manejadores.
+COMMANDS = command_router.CommandRouter()
+
 @bot.event
 async def on_message(message):
+    # Descarte barato: casi todos los mensajes son plática y se rechazan con una sola expresión precompilada.
+    resolved = COMMANDS.resolve(message.content)
+    if resolved is None:
+        return
     # Ignorar mensajes del propio bot
     if message.author == bot.user:
         return
-
-    # Definir los prefijos
-    PREFIX_PATCH = 'p!'
-    PREFIX_CLASH = 'c!'
-    PREFIX_GLOBAL = '!'
-
-    msg = message.content
-
-    # --- ENRUTADOR GLOBAL ---
-    if msg.startswith(PREFIX_GLOBAL):
-        command_string = msg[len(PREFIX_GLOBAL):] # Quita el '!'
-        parts = command_string.split(maxsplit=1)
-        command = parts[0].lower()
-
-        if command == "ayuda":
-            await handle_ayuda(message)
-
-    # --- ENRUTADOR DE PARCHES ---
-    elif msg.startswith(PREFIX_PATCH):
-        command_string = msg[len(PREFIX_PATCH):] # Quita el 'p!'
-        parts = command_string.split(maxsplit=1)
-        command = parts[0].lower()
-        argument = parts[1] if len(parts) > 1 else None
-
-        if command == "parche":
-            await handle_parche(message)
-        elif command == "campeones":
-            await handle_campeones(message)
-        elif command == "ver":
-            if argument:
-                await handle_ver_champ(message, champion_name=argument)
-            else:
-                await message.channel.send("Debes especificar un campeón. Ej: `p!ver Ahri`")
-        elif command == "objetos":
-            await handle_objetos(message)
-        elif command == "runas":
-            await handle_runas(message)
-        elif command == "calendario":
-            await handle_cparche(message)
-        elif command == "siguiente":
-            await handle_sparche(message)
-
-    # --- ENRUTADOR DE CLASH ---
-    elif msg.startswith(PREFIX_CLASH):
-        command_string = msg[len(PREFIX_CLASH):] # Quita el 'c!'
-        parts = command_string.split(maxsplit=1)
-        command = parts[0].lower()
-
-        if command == "clash":
-            await handle_sclash(message)
-        elif command == "calendario":
-            await handle_cclash(message)
-        elif command == "horarios":
-            await handle_hclash(message)
-        elif command == "premios":
-            await handle_pclash(message)
+    command, argument = resolved
+    with metrics.MESSAGE_SECONDS.time(command=command.key):
+        await COMMANDS.dispatch(message, command, argument)
 
 # --- MANEJADORES DE COMANDOS DE PARCHE ---
+@metrics.timed(metrics.HANDLER_SECONDS, handler="parche")
 async def handle_parche(message):
     async with message.channel.typing():
-        title, url, date = get_latest_patch_info()
+        title, url, date = await get_latest_patch_info(language=guild_language(message))
         if title and url:
-            image_url = scrape_summary_image(url)
+            image_url = await scrape_summary_image(url)
             embed = discord.Embed(title=f"Notas del Parche: {title}", description=f"Anunciadas el {date}.", color=discord.Color.blue(), url=url)
             if image_url:
                 embed.set_image(url=image_url)
@@ -525,208 +681,511 @@ async def handle_parche(message):
             await message.channel.send("No se pudo obtener la información del parche en este momento.")
 
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler="campeones")
 async def handle_campeones(message):
     async with message.channel.typing():
-        title, url, date = get_latest_patch_info()
+        title, url, date = await get_latest_patch_info(language=guild_language(message))
         if not url:
             await message.channel.send("Error: No se pudo encontrar el último parche.")
             return
-        champ_list = scrape_champion_list(url)
+        champ_list = await scrape_champion_list(url)
     if champ_list:
-        description = "- " + "\n- ".join(champ_list)
-        embed = discord.Embed(title=f"Campeones en el Parche: {title}", description=description, color=discord.Color.teal())
-        await message.channel.send(embed=embed)
+        pages = [champ_list[i:i + CHAMPIONS_PER_PAGE] for i in range(0, len(champ_list), CHAMPIONS_PER_PAGE)]
+
+        def render_page(index):
+            description = "- " + "\n- ".join(pages[index])
+            return [discord.Embed(title=f"Campeones en el Parche: {title}", description=description, color=discord.Color.teal())]
+
+        await pagination.send_paginated(message.channel, render_page, len(pages), author_id=message.author.id, label="p!campeones")
     else:
         await message.channel.send("No se encontraron campeones en estas notas del parche.")
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler="ver_champ")
 async def handle_ver_champ(message, champion_name: str):
-    clean_name = champion_name.lower().strip()
-    if clean_name not in VALID_CHAMPIONS:
+    lookup = CHAMPION_INDEX.lookup(champion_name)
+    if not lookup.match:
+        description = f"No se encontró un campeón llamado **'{champion_name}'**.\n\n"
+        if lookup.suggestions:
+            description += "¿Quisiste decir " + ", ".join(f"**{name}**" for name in lookup.suggestions) + "?\n\n"
+        description += "Revisa la ortografía o usa `p!campeones` para ver la lista."
         embed = discord.Embed(
             title="❌ Error: Campeón no encontrado",
-            description=f"No se encontró un campeón llamado **'{champion_name}'**.\n\nRevisa la ortografía o usa `p!campeones` para ver la lista.",
+            description=description,
             color=discord.Color.red()
         )
         await message.channel.send(embed=embed)
         return
+    clean_name = lookup.match.name
 
     async with message.channel.typing():
-        title, url, date = get_latest_patch_info()
+        title, url, date = await get_latest_patch_info(language=guild_language(message))
         if not url:
             await message.channel.send("Error: No se pudo encontrar el último parche.")
             return
-        details = scrape_champion_details(url, clean_name)
+        details = await scrape_champion_details(url, clean_name, lookup.match.key)
+        patch = await scrape_patch_diff(url)
 
     if not details:
         embed = discord.Embed(
-            description=f"No se encontraron cambios para **{champion_name.title()}** en las notas del parche actual.",
+            description=f"No se encontraron cambios para **{clean_name}** en las notas del parche actual.",
             color=discord.Color.light_grey()
         )
         await message.channel.send(embed=embed)
         return
 
-    main_embed = discord.Embed(title=f"Cambios para {details['name']} ({title})", description=details.get('summary', 'Sin resumen.'), color=discord.Color.purple())
-    if details['portrait_url']:
-        main_embed.set_thumbnail(url=details['portrait_url'])
-    await message.channel.send(embed=main_embed)
-
-    for block in details.get('change_blocks', []):
-        changes_text = "\n".join(block['changes'])
-        if not changes_text: changes_text = "Sin detalles específicos."
-        block_embed = discord.Embed(color=discord.Color.purple())
-        if block['icon_url']:
-            block_embed.set_author(name=block['title'], icon_url=block['icon_url'])
-        else:
-            block_embed.set_author(name=block['title'])
-        block_embed.description = changes_text
-        await message.channel.send(embed=block_embed)
+    blocks = pagination.split_blocks(details.get('change_blocks', []))
+    pages = pagination.paginate(blocks, block_size)
+    description = details.get('summary', 'Sin resumen.')
+    entity = patch.get(details['name']) if patch else None
+    if entity and entity.changes:
+        description += f"\n\n**Veredicto:** {verdict_label(entity)}"
+
+    # Solo se construyen los embeds de la página que se muestra.
+    def render_page(index):
+        main_embed = discord.Embed(title=f"Cambios para {details['name']} ({title})", description=description, color=discord.Color.purple())
+        if details['portrait_url']:
+            main_embed.set_thumbnail(url=details['portrait_url'])
+        embeds = [main_embed]
+
+        start, end = pages[index]
+        for block in blocks[start:end]:
+            changes_text = "\n".join(block['changes'])
+            if not changes_text: changes_text = "Sin detalles específicos."
+            block_embed = discord.Embed(color=discord.Color.purple())
+            if block['icon_url']:
+                block_embed.set_author(name=block['title'], icon_url=block['icon_url'])
+            else:
+                block_embed.set_author(name=block['title'])
+            block_embed.description = changes_text
+            embeds.append(block_embed)
+        return embeds
+
+    await pagination.send_paginated(message.channel, render_page, len(pages), author_id=message.author.id, label="p!ver")
+
 
+def clip_field(text):
+    """Recorta el texto al límite de un campo de embed (1024 caracteres)."""
+    return text if len(text) <= 1024 else text[:1023] + "…"
+
+def block_size(block):
+    """Tamaño aproximado (en caracteres) del embed de un bloque, para repartir páginas sin construirlo."""
+    return len(block['title']) + len(block.get('summary', '')) + sum(len(change) + 1 for change in block['changes'])
+
+def build_section_block_embed(block, color):
+    """Embed de un objeto o runa: resumen, lista de cambios e ícono."""
+    summary_text = block.get('summary', 'Sin resumen.')
+    changes_text = "\n".join(block['changes'])
+    
+    description = summary_text
+    if changes_text:
+        # Los bloques de continuación (pagination.split_blocks) no repiten el resumen.
+        description = f"{summary_text}\n\n**Cambios:**\n{changes_text}" if summary_text else f"**Cambios:**\n{changes_text}"
+    
+    embed = discord.Embed(
+        title=block['title'],
+        description=description,
+        color=color
+    )
+    if block['icon_url']:
+        embed.set_thumbnail(url=block['icon_url'])
+    return embed
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler="objetos")
 async def handle_objetos(message):
     async with message.channel.typing():
-        title, url, date = get_latest_patch_info()
+        title, url, date = await get_latest_patch_info(language=guild_language(message))
         if not url:
             await message.channel.send("Error: No se pudo encontrar el último parche.")
             return
         
-        item_list = scrape_section_details(url, "patch-items")
+        item_list = await scrape_section_details(url, "patch-items")
 
     if not item_list:
         embed = discord.Embed(description=f"No hay cambios a objetos en el parche **{title}**.", color=discord.Color.orange())
         await message.channel.send(embed=embed)
         return
 
-    main_embed = discord.Embed(title=f"Cambios a Objetos ({title})", color=discord.Color.orange())
-    await message.channel.send(embed=main_embed)
-    
-    for item in item_list:
-        summary_text = item.get('summary', 'Sin resumen.')
-        changes_text = "\n".join(item['changes'])
-        
-        description = summary_text
-        if changes_text:
-            description += f"\n\n**Cambios:**\n{changes_text}"
-        
-        embed = discord.Embed(
-            title=item['title'],
-            description=description,
-            color=discord.Color.orange()
-        )
-        if item['icon_url']:
-            embed.set_thumbnail(url=item['icon_url'])
-        
-        await message.channel.send(embed=embed)
+    item_list = pagination.split_blocks(item_list)
+    pages = pagination.paginate(item_list, block_size)
+
+    def render_page(index):
+        start, end = pages[index]
+        main_embed = discord.Embed(title=f"Cambios a Objetos ({title})", color=discord.Color.orange())
+        return [main_embed] + [build_section_block_embed(item, discord.Color.orange()) for item in item_list[start:end]]
 
+    await pagination.send_paginated(message.channel, render_page, len(pages), author_id=message.author.id, label="p!objetos")
 
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler="runas")
 async def handle_runas(message):
     async with message.channel.typing():
-        title, url, date = get_latest_patch_info()
+        title, url, date = await get_latest_patch_info(language=guild_language(message))
         if not url:
             await message.channel.send("Error: No se pudo encontrar el último parche.")
             return
             
-        rune_list = scrape_section_details(url, "patch-runes")
+        rune_list = await scrape_section_details(url, "patch-runes")
 
     if not rune_list:
         embed = discord.Embed(description=f"No hay cambios a runas en el parche **{title}**.", color=discord.Color.light_grey())
         await message.channel.send(embed=embed)
         return
 
-    main_embed = discord.Embed(title=f"Cambios a Runas ({title})", color=discord.Color.light_grey())
-    await message.channel.send(embed=main_embed)
-    
-    for rune in rune_list:
-        summary_text = rune.get('summary', 'Sin resumen.')
-        changes_text = "\n".join(rune['changes'])
-        
-        description = summary_text
-        if changes_text:
-            description += f"\n\n**Cambios:**\n{changes_text}"
-        
-        embed = discord.Embed(
-            title=rune['title'],
-            description=description,
-            color=discord.Color.light_grey()
-        )
-        if rune['icon_url']:
-            embed.set_thumbnail(url=rune['icon_url'])
-        
-        await message.channel.send(embed=embed)
+    rune_list = pagination.split_blocks(rune_list)
+    pages = pagination.paginate(rune_list, block_size)
 
+    def render_page(index):
+        start, end = pages[index]
+        main_embed = discord.Embed(title=f"Cambios a Runas ({title})", color=discord.Color.light_grey())
+        return [main_embed] + [build_section_block_embed(rune, discord.Color.light_grey()) for rune in rune_list[start:end]]
 
-async def handle_cparche(message):
-    now = datetime.now()
-    future_patches = [date for date in PATCH_DATES if datetime.strptime(date, "%Y-%m-%d") > now]
-    if future_patches:
-        next_patch_str = future_patches[0]
-        description_lines = []
-        for date_str in future_patches:
-            patch_date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-            formatted_date = patch_date_obj.strftime('%d de %B de %Y')
-            if date_str == next_patch_str:
-                next_patch_datetime = datetime.strptime(date_str + " 03:00", "%Y-%m-%d %H:%M")
-                time_remaining = next_patch_datetime - now
-                description_lines.append(f"• **{formatted_date}** (Faltan: {format_timedelta(time_remaining)})")
+    await pagination.send_paginated(message.channel, render_page, len(pages), author_id=message.author.id, label="p!runas")
+
+
+# --- Resumen de buffs y nerfs ---
+VERDICT_LABELS = {patch_diff.BUFF: "📈 Buff", patch_diff.NERF: "📉 Nerf", patch_diff.ADJUSTMENT: "⚖️ Ajuste"}
+
+def verdict_label(entity):
+    return f"{VERDICT_LABELS[entity.verdict]} ({entity.buffs} ▲ / {entity.nerfs} ▼)"
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler="resumen")
+async def handle_resumen(message):
+    async with message.channel.typing():
+        title, url, date = await get_latest_patch_info(language=guild_language(message))
+        if not url:
+            await message.channel.send("Error: No se pudo encontrar el último parche.")
+            return
+        patch = await scrape_patch_diff(url)
+
+    if not patch or not patch.entities:
+        await message.channel.send("No se encontraron cambios numéricos en estas notas del parche.")
+        return
+
+    totals = patch.totals()
+    embed = discord.Embed(
+        title=f"Resumen del Parche: {title}",
+        description=f"{totals[patch_diff.BUFF]} buffs, {totals[patch_diff.NERF]} nerfs y {totals[patch_diff.ADJUSTMENT]} ajustes.",
+        color=discord.Color.gold(),
+        url=url,
+    )
+    for verdict, label in VERDICT_LABELS.items():
+        entities = patch.by_verdict(verdict)
+        if entities:
+            value = "\n".join(f"{entity.name} ({entity.kind}) {entity.buffs}▲ {entity.nerfs}▼" for entity in entities)
+            embed.add_field(name=label, value=clip_field(value), inline=True)
+    await message.channel.send(embed=delivery.fit_single_message([embed])[0])
+
+
+# --- Historial (desde el archivo local, sin red) ---
+HISTORY_DEFAULT = 5
+HISTORY_MAX = 10
+
+def history_field_value(summary, changes):
+    """Texto de un parche en el historial, recortado al límite de un campo de embed (1024)."""
+    value = summary or ""
+    if changes:
+        value += ("\n" if value else "") + "\n".join(changes)
+    value = value or "Sin detalles."
+    return clip_field(value)
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler="historial")
+async def handle_historial(message, argument):
+    parts = argument.rsplit(maxsplit=1)
+    limit = HISTORY_DEFAULT
+    if len(parts) == 2 and parts[1].isdigit():
+        argument, limit = parts[0], max(1, min(int(parts[1]), HISTORY_MAX))
+
+    lookup = CHAMPION_INDEX.lookup(argument)
+    if not lookup.match:
+        await message.channel.send(f"No se encontró un campeón llamado **'{argument}'**. Usa `p!campeones` para ver la lista.")
+        return
+    champion = lookup.match.name
+
+    history = await asyncio.to_thread(patch_cache.ARCHIVE.champion_history, champion, limit)
+    if not history:
+        await message.channel.send(f"No hay cambios a **{champion}** en los parches archivados.")
+        return
+
+    embed = discord.Embed(title=f"Historial de {champion}", description=f"Últimos {len(history)} parches con cambios.", color=discord.Color.purple())
+    for version, patch_title, details in history:
+        changes = [f"**{block['title']}**" for block in details.get('change_blocks', [])]
+        embed.add_field(name=patch_title or f"Parche {version}", value=history_field_value(details.get('summary'), changes), inline=False)
+    if history[0][2].get('portrait_url'):
+        embed.set_thumbnail(url=history[0][2]['portrait_url'])
+    await message.channel.send(embed=delivery.fit_single_message([embed])[0])
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler="section_history")
+async def handle_section_history(message, command, name):
+    section_id, color = ("patch-items", discord.Color.orange()) if command == "objeto" else ("patch-runes", discord.Color.light_grey())
+    history = await asyncio.to_thread(patch_cache.ARCHIVE.section_history, section_id, name, HISTORY_MAX)
+    if not history:
+        await message.channel.send(f"Ningún parche archivado cambió **{name}**.")
+        return
+
+    titles = sorted({block['title'] for _, _, block in history})
+    embed = discord.Embed(title=f"Parches que cambiaron: {', '.join(titles)}", color=color)
+    for version, patch_title, block in history:
+        field_name = f"{patch_title or f'Parche {version}'}" + (f" - {block['title']}" if len(titles) > 1 else "")
+        embed.add_field(name=field_name, value=history_field_value(block.get('summary'), block['changes']), inline=False)
+    if history[0][2].get('icon_url'):
+        embed.set_thumbnail(url=history[0][2]['icon_url'])
+    await message.channel.send(embed=delivery.fit_single_message([embed])[0])
+
+
+# --- Métricas (solo administradores) ---
+BOT_ADMIN_IDS = {int(user_id) for user_id in os.getenv('BOT_ADMIN_IDS', '').split(',') if user_id.strip().isdigit()}
+
+def is_admin(user):
+    permissions = getattr(user, 'guild_permissions', None)
+    return user.id in BOT_ADMIN_IDS or bool(permissions and permissions.administrator)
+
+def format_ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f} ms"
+
+def latency_lines(histogram, label):
+    lines = []
+    for labels in histogram.label_sets():
+        count = histogram.count(**labels)
+        p50 = histogram.quantile(0.5, **labels)
+        p95 = histogram.quantile(0.95, **labels)
+        lines.append(f"`{labels.get(label, '-')}` {count}× · p50 {format_ms(p50)} · p95 {format_ms(p95)}")
+    return clip_field("\n".join(lines) or "Sin datos todavía.")
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler="metricas")
+async def handle_metricas(message):
+    if not is_admin(message.author):
+        await message.channel.send("Este comando es solo para administradores.")
+        return
+
+    embed = discord.Embed(title="📊 Métricas del Bot", color=discord.Color.dark_grey())
+    embed.add_field(name="Comandos", value=latency_lines(metrics.HANDLER_SECONDS, "handler"), inline=False)
+    embed.add_field(name="Etapas del scraping", value=latency_lines(metrics.STAGE_SECONDS, "stage"), inline=False)
+    embed.add_field(name="Tareas automáticas", value=latency_lines(metrics.SCHEDULER_SECONDS, "task"), inline=False)
+
+    downloads = [f"`{labels['host']}` {labels['result']}: {metrics.HTTP_SECONDS.count(**labels)}× · p95 {format_ms(metrics.HTTP_SECONDS.quantile(0.95, **labels))}"
+                 for labels in metrics.HTTP_SECONDS.label_sets()]
+    total_bytes = sum(metrics.HTTP_BYTES.values.values())
+    downloads.append(f"{total_bytes / 1024:.0f} KB descargados")
+    embed.add_field(name="Descargas", value=clip_field("\n".join(downloads)), inline=False)
+
+    caches = []
+    for cache in ("patch_models", "patch_archive"):
+        hits = metrics.CACHE_LOOKUPS.get(cache=cache, result="hit")
+        misses = metrics.CACHE_LOOKUPS.get(cache=cache, result="miss")
+        ratio = f"{hits / (hits + misses):.0%}" if hits + misses else "-"
+        caches.append(f"`{cache}` {ratio} aciertos ({hits}/{hits + misses})")
+    caches.append(f"Peticiones combinadas: {singleflight.stats_summary()}")
+    embed.add_field(name="Cachés", value=clip_field("\n".join(caches)), inline=False)
+
+    errors = sorted(metrics.ERRORS.values.items(), key=lambda item: -item[1])[:10]
+    embed.add_field(name="Errores", value=clip_field("\n".join(f"`{dict(labels)['where']}` {dict(labels)['type']}: {count}" for labels, count in errors) or "Ninguno."), inline=False)
+    embed.set_footer(text=f"Latencia del gateway: {format_ms(bot.latency)} · /metrics para el detalle completo")
+    await message.channel.send(embed=delivery.fit_single_message([embed])[0])
+
+
+# --- Suscripciones a los anuncios automáticos (p!avisos) ---
+ANNOUNCEMENT_TYPE_NAMES = {
+    subscriptions.PREPATCH: "recordatorio un día antes del parche",
+    subscriptions.NOTES: "notas publicadas el día del parche",
+    subscriptions.NEW_PATCH: "parche nuevo detectado en la página",
+    subscriptions.CLASH: "formación de equipos, día de torneo y última llamada de Clash",
+}
+
+def subscription_embed(subscription, title):
+    embed = discord.Embed(title=title, color=discord.Color.dark_green())
+    embed.add_field(name="Canal", value=f"<#{subscription.channel_id}>", inline=False)
+    embed.add_field(name="Anuncios", value="\n".join(f"`{kind}` - {name}" for kind, name in ANNOUNCEMENT_TYPE_NAMES.items() if subscription.wants(kind)) or "Ninguno.", inline=False)
+    embed.add_field(name="Zona horaria", value=subscription.timezone, inline=False)
+    return embed
+
+async def save_subscriptions():
+    await asyncio.to_thread(SUBSCRIPTIONS.save, subscriptions.SUBSCRIPTIONS_PATH)
+    CONFIG_WATCHER.mark_loaded(subscriptions.SUBSCRIPTIONS_PATH)
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler="avisos")
+async def handle_avisos(message, argument):
+    """
+    p!avisos                       -> muestra la suscripción del servidor
+    p!avisos aqui [tipos...]       -> publica los anuncios (todos o los tipos dados) en este canal
+    p!avisos zona <Zona/Horaria>   -> zona horaria de las horas en los anuncios
+    p!avisos quitar                -> deja de enviar anuncios a este servidor
+    """
+    if message.guild is None:
+        await message.channel.send("Este comando solo funciona dentro de un servidor.")
+        return
+    if not is_admin(message.author):
+        await message.channel.send("Este comando es solo para administradores.")
+        return
+
+    parts = (argument or "").split()
+    action = parts[0].lower() if parts else None
+    current = SUBSCRIPTIONS.get(message.guild.id)
+    try:
+        if action is None:
+            if current:
+                await message.channel.send(embed=subscription_embed(current, "📣 Anuncios de este servidor"))
             else:
-                description_lines.append(f"• {formatted_date}")
-        embed = discord.Embed(title="🗓️ Calendario de Futuros Parches", description="\n".join(description_lines), color=discord.Color.dark_purple())
-        await message.channel.send(embed=embed)
-    else:
-        await message.channel.send("No hay más parches programados en el calendario.")
+                types = ", ".join(f"`{kind}`" for kind in subscriptions.ANNOUNCEMENT_TYPES)
+                await message.channel.send(f"Este servidor no recibe anuncios. Usa `p!avisos aqui` en el canal donde los quieras (tipos: {types}).")
+            return
+        if action in ("aqui", "aquí"):
+            types = subscriptions.parse_types(parts[1:]) if len(parts) > 1 else frozenset(subscriptions.ANNOUNCEMENT_TYPES)
+            timezone = current.timezone if current else subscriptions.DEFAULT_TIMEZONE
+            updated = subscriptions.Subscription(message.guild.id, message.channel.id, types, timezone)
+        elif action == "zona" and len(parts) == 2:
+            timezone = subscriptions.parse_timezone(parts[1])
+            updated = subscriptions.Subscription(message.guild.id, current.channel_id if current else message.channel.id,
+                                                 current.types if current else frozenset(subscriptions.ANNOUNCEMENT_TYPES), timezone)
+        elif action == "quitar":
+            if SUBSCRIPTIONS.remove(message.guild.id):
+                await save_subscriptions()
+            await message.channel.send("Este servidor ya no recibirá anuncios automáticos.")
+            return
+        else:
+            await message.channel.send("Uso: `p!avisos`, `p!avisos aqui [tipos...]`, `p!avisos zona America/Bogota` o `p!avisos quitar`.")
+            return
+    except ValueError as e:
+        await message.channel.send(f"No se pudo guardar: {e}.")
+        return
 
+    SUBSCRIPTIONS.set(updated)
+    await save_subscriptions()
+    await message.channel.send(embed=subscription_embed(updated, "✅ Anuncios actualizados"))
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler="idioma")
+async def handle_idioma(message, argument):
+    """
+    p!idioma          -> idioma del servidor y los disponibles
+    p!idioma <código> -> cambia el idioma de las fechas y de las notas de parche (administradores)
+    """
+    available = ", ".join(f"`{code}` ({language.name})" for code, language in i18n.LANGUAGES.items())
+    if message.guild is None:
+        await message.channel.send("Este comando solo funciona dentro de un servidor.")
+        return
+    if not argument:
+        current = i18n.get_language(GUILD_LANGUAGES.get(message.guild.id))
+        await message.channel.send(f"Idioma de este servidor: **{current.name}**. Disponibles: {available}.")
+        return
+    if not is_admin(message.author):
+        await message.channel.send("Este comando es solo para administradores.")
+        return
+    try:
+        code = i18n.parse_language(argument)
+    except ValueError as e:
+        await message.channel.send(f"No se pudo guardar: {e}.")
+        return
+    GUILD_LANGUAGES.set(message.guild.id, code)
+    await asyncio.to_thread(GUILD_LANGUAGES.save, i18n.LANGUAGES_PATH)
+    CONFIG_WATCHER.mark_loaded(i18n.LANGUAGES_PATH)
+    await message.channel.send(f"✅ Idioma actualizado: **{i18n.LANGUAGES[code].name}**. Las fechas y las notas de parche se mostrarán en este idioma.")
+
+
+# --- Búsqueda de texto ---
+SEARCH_RESULTS = 10
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler="buscar")
+async def handle_buscar(message, query):
+    """Busca en el último parche; si ahí no hay resultados, en todos los parches archivados."""
+    latest_url = PATCH_WATCHER.result[1] if PATCH_WATCHER.result else None
+    latest_version = patch_archive.patch_version(latest_url)[0] if latest_url else None
+    hits = []
+    if latest_version in patch_cache.SEARCH_INDEX.versions():
+        hits = patch_cache.SEARCH_INDEX.search(query, SEARCH_RESULTS, version=latest_version)
+    scope = f"parche {latest_version}"
+    if not hits:
+        hits = patch_cache.SEARCH_INDEX.search(query, SEARCH_RESULTS)
+        scope = "todos los parches archivados"
+    if not hits:
+        await message.channel.send(f"No se encontraron cambios que mencionen **{query}**.")
+        return
+
+    lines = []
+    for hit in hits:
+        document = hit.document
+        where = f"**{document.entity}**" + (f" · {document.block}" if document.block else f" ({document.kind})")
+        lines.append(f"{where} — {document.version}\n{document.text}")
+    embed = discord.Embed(title=f"Resultados para \"{query}\"", description="\n\n".join(lines), color=discord.Color.blurple())
+    embed.set_footer(text=f"Buscado en: {scope}")
+    await message.channel.send(embed=delivery.fit_single_message([embed])[0])
+
+
+async def send_calendar_response(message, key, render):
+    """Envía la respuesta de un comando de calendario, renderizándola solo si la caché ya venció."""
+    now = datetime.now(TIMEZONE_CDMX)
+    language = guild_language(message)
+    response = CALENDAR_RENDERS.get((key, language), now)
+    if response is None:
+        response, valid_until = render(now, language)
+        CALENDAR_RENDERS.set((key, language), response, valid_until)
+    await message.channel.send(**response)
+
+def render_cparche(now, language):
+    future_patches = PATCH_CALENDAR.future_releases(now)
+    if not future_patches:
+        return {"content": "No hay más parches programados en el calendario."}, now + timedelta(days=1)
+    description_lines = []
+    for index, release_time in enumerate(future_patches):
+        formatted_date = i18n.format_date(release_time, "date", language)
+        if index == 0:
+            time_remaining = release_time - now
+            description_lines.append(f"• **{formatted_date}** (Faltan: {format_timedelta(time_remaining)})")
+        else:
+            description_lines.append(f"• {formatted_date}")
+    embed = discord.Embed(title="🗓️ Calendario de Futuros Parches", description="\n".join(description_lines), color=discord.Color.dark_purple())
+    return {"embed": embed}, calendar_model.next_minute(now)
+
+def render_sparche(now, language):
+    next_patch_date = PATCH_CALENDAR.next_release(now)
+    if not next_patch_date:
+        return {"content": "No hay más parches programados en el calendario para este año."}, now + timedelta(days=1)
+    time_remaining = next_patch_date - now
+    embed = discord.Embed(title="📅 Próximo Parche de LoL", description=f"La próxima actualización está programada para el **{i18n.format_date(next_patch_date, 'date', language)}**.", color=discord.Color.blue())
+    embed.add_field(name="Tiempo Restante", value=format_timedelta(time_remaining))
+    return {"embed": embed}, calendar_model.next_minute(now)
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler="cparche")
+async def handle_cparche(message):
+    await send_calendar_response(message, "p!calendario", render_cparche)
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler="sparche")
 async def handle_sparche(message):
-    now = datetime.now()
-    next_patch_date = None
-    for date_str in PATCH_DATES:
-        patch_date = datetime.strptime(date_str + " 03:00", "%Y-%m-%d %H:%M")
-        if patch_date > now:
-            next_patch_date = patch_date
-            break
-    if next_patch_date:
-        time_remaining = next_patch_date - now
-        embed = discord.Embed(title="📅 Próximo Parche de LoL", description=f"La próxima actualización está programada para el **{next_patch_date.strftime('%d de %B de %Y')}**.", color=discord.Color.blue())
-        embed.add_field(name="Tiempo Restante", value=format_timedelta(time_remaining))
-        await message.channel.send(embed=embed)
-    else:
-        await message.channel.send("No hay más parches programados en el calendario para este año.")
+    await send_calendar_response(message, "p!siguiente", render_sparche)
 
 # --- MANEJADORES DE COMANDOS DE CLASH ---
+def render_sclash(now, language):
+    next_clash = CLASH_CALENDAR.next_event(now)
+    if not next_clash:
+        return {"content": "No hay más torneos de Clash programados."}, now + timedelta(days=1)
+    time_remaining = next_clash.formation_start - now
+    tournament_days = i18n.format_days(next_clash.tournament_days, "days_month_year", language)
+    team_formation_date = i18n.format_date(next_clash.formation_date, "day_month", language)
+    description = (f"Corresponde a la versión {next_clash.version}.\n\n"
+                   f"**Inicio de Formación de Equipos:** {team_formation_date}\n"
+                   f"**Días del Torneo:** {tournament_days}\n\n"
+                   f"**Tiempo para Formar Equipo:** {format_timedelta(time_remaining)}")
+    embed = discord.Embed(title=f"🏆 Próximo Clash: {next_clash.name}", description=description, color=discord.Color.red())
+    return {"embed": embed}, calendar_model.next_minute(now)
+
+def render_cclash(now, language):
+    future_clash = CLASH_CALENDAR.future_events(now)
+    if not future_clash:
+        return {"content": "No hay más torneos de Clash programados."}, now + timedelta(days=1)
+    embed = discord.Embed(title="⚔️ Calendario de Futuros Torneos de Clash", color=discord.Color.dark_red())
+    for event in future_clash:
+        value = f"Torneo: **{i18n.format_days(event.tournament_days, 'days_month_year', language)}**."
+        embed.add_field(name=f"{event.name} (Versión {event.version})", value=value, inline=False)
+    # Sin cuenta regresiva: la respuesta solo cambia cuando empieza el siguiente Clash.
+    return {"embed": embed}, future_clash[0].formation_start
+
+@metrics.timed(metrics.HANDLER_SECONDS, handler="sclash")
 async def handle_sclash(message):
-    now = datetime.now()
-    next_clash = None
-    for event in CLASH_EVENTS:
-        event_start_date = datetime.strptime(event['team_formation_start'], "%Y-%m-%d")
-        if event_start_date > now:
-            next_clash = event
-            break
-    if next_clash:
-        time_remaining = event_start_date - now
-        tournament_days_str = " y ".join([datetime.strptime(day, "%Y-%m-%d").strftime("%d") for day in next_clash['tournament_days']])
-        month_year = datetime.strptime(next_clash['tournament_days'][0], "%Y-%m-%d").strftime("%B de %Y")
-        team_formation_date = datetime.strptime(next_clash['team_formation_start'], "%Y-%m-%d").strftime("%d de %B")
-        description = (f"Corresponde a la versión {next_clash['version']}.\n\n"
-                       f"**Inicio de Formación de Equipos:** {team_formation_date}\n"
-                       f"**Días del Torneo:** {tournament_days_str} de {month_year}\n\n"
-                       f"**Tiempo para Formar Equipo:** {format_timedelta(time_remaining)}")
-        embed = discord.Embed(title=f"🏆 Próximo Clash: {next_clash['name']}", description=description, color=discord.Color.red())
-        await message.channel.send(embed=embed)
-    else:
-        await message.channel.send("No hay más torneos de Clash programados.")
+    await send_calendar_response(message, "c!clash", render_sclash)
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler="cclash")
 async def handle_cclash(message):
-    now = datetime.now()
-    future_clash = [event for event in CLASH_EVENTS if datetime.strptime(event['team_formation_start'], "%Y-%m-%d") > now]
-    if future_clash:
-        embed = discord.Embed(title="⚔️ Calendario de Futuros Torneos de Clash", color=discord.Color.dark_red())
-        for event in future_clash:
-            tournament_days_str = " y ".join([datetime.strptime(day, "%Y-%m-%d").strftime("%d") for day in event['tournament_days']])
-            month_year = datetime.strptime(event['tournament_days'][0], "%Y-%m-%d").strftime("%B de %Y")
-            value = f"Torneo: **{tournament_days_str} de {month_year}**."
-            embed.add_field(name=f"{event['name']} (Versión {event['version']})", value=value, inline=False)
-        await message.channel.send(embed=embed)
-    else:
-        await message.channel.send("No hay más torneos de Clash programados.")
+    await send_calendar_response(message, "c!calendario", render_cclash)
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler="hclash")
 async def handle_hclash(message):
     if "horarios" in CLASH_INFO:
         horarios_data = CLASH_INFO["horarios"]
@@ -737,6 +1196,7 @@ async def handle_hclash(message):
     else:
         await message.channel.send("No se encontró la información de horarios de Clash.")
 
+@metrics.timed(metrics.HANDLER_SECONDS, handler="pclash")
 async def handle_pclash(message):
     if "premios" in CLASH_INFO:
         premios_data = CLASH_INFO["premios"]
@@ -748,6 +1208,7 @@ async def handle_pclash(message):
         await message.channel.send("No se encontró la información de premios de Clash.")
 
 # --- MANEJADOR DE AYUDA GLOBAL ---
+@metrics.timed(metrics.HANDLER_SECONDS, handler="ayuda")
 async def handle_ayuda(message):
     embed = discord.Embed(title="Ayuda - El Rincón del Poro", description="Comandos disponibles:", color=discord.Color.dark_green())
     patch_commands = (
@@ -756,6 +1217,10 @@ async def handle_ayuda(message):
         "`p!ver <campeón>` - Cambios detallados del **campeón**.\n"
         "`p!objetos` - Cambios a **objetos**.\n"
         "`p!runas` - Cambios a **runas**.\n"
+        "`p!historial <campeón> [N]` - Cambios al **campeón** en los últimos N parches.\n"
+        "`p!objeto <nombre>` / `p!runa <nombre>` - **Parches** que cambiaron un objeto o runa.\n"
+        "`p!resumen` - **Buffs y nerfs** del último parche.\n"
+        "`p!buscar <texto>` - **Busca** en las notas (ej. `p!buscar curación`).\n"
         "`p!siguiente` - Muestra el **siguiente parche** programado.\n"
         "`p!calendario` - Visualiza el **calendario de parches** futuros."
     )
@@ -770,7 +1235,54 @@ async def handle_ayuda(message):
     embed.add_field(name="--- 🏆 Comandos de Clash ---", value=clash_commands, inline=False)
     await message.channel.send(embed=embed)
 
+# --- TABLA DE COMANDOS ---
+COMMANDS.register('!', "ayuda", handle_ayuda, aliases=("help", "comandos"), description="Lista de comandos disponibles.")
+
+COMMANDS.register('p!', "parche", handle_parche, description="Información del último parche.")
+COMMANDS.register('p!', "campeones", handle_campeones, description="Campeones con cambios en el último parche.")
+COMMANDS.register('p!', "ver", handle_ver_champ, aliases=("campeon", "campeón"), usage="Debes especificar un campeón. Ej: `p!ver Ahri`",
+                  description="Cambios detallados de un campeón.")
+COMMANDS.register('p!', "objetos", handle_objetos, aliases=("items",), description="Cambios a objetos en el último parche.")
+COMMANDS.register('p!', "runas", handle_runas, description="Cambios a runas en el último parche.")
+COMMANDS.register('p!', "historial", handle_historial, usage="Debes especificar un campeón. Ej: `p!historial Ahri 5`",
+                  description="Cambios a un campeón en los últimos parches.")
+COMMANDS.register('p!', "objeto", lambda message, name: handle_section_history(message, "objeto", name),
+                  usage="Debes especificar un nombre. Ej: `p!objeto Eclipse`", description="Parches que cambiaron un objeto.")
+COMMANDS.register('p!', "runa", lambda message, name: handle_section_history(message, "runa", name),
+                  usage="Debes especificar un nombre. Ej: `p!runa Conquistador`", description="Parches que cambiaron una runa.")
+COMMANDS.register('p!', "resumen", handle_resumen, aliases=("buffs", "nerfs"), description="Buffs y nerfs del último parche.")
+COMMANDS.register('p!', "buscar", handle_buscar, usage="Debes escribir qué buscar. Ej: `p!buscar curación`",
+                  description="Busca en las notas de parche.")
+COMMANDS.register('p!', "siguiente", handle_sparche, aliases=("proximo", "próximo"), description="Siguiente parche programado.")
+COMMANDS.register('p!', "calendario", handle_cparche, description="Calendario de parches futuros.")
+COMMANDS.register('p!', "metricas", handle_metricas, aliases=("métricas",), description="Métricas del bot (administradores).")
+COMMANDS.register('p!', "avisos", handle_avisos, takes_argument=True, description="Anuncios automáticos del servidor (administradores).")
+COMMANDS.register('p!', "idioma", handle_idioma, aliases=("language",), takes_argument=True,
+                  description="Idioma de las fechas y de las notas de parche del servidor.")
+
+COMMANDS.register('c!', "clash", handle_sclash, description="Próximo torneo de Clash.")
+COMMANDS.register('c!', "calendario", handle_cclash, slash_name="clash-calendario", description="Calendario de torneos de Clash.")
+COMMANDS.register('c!', "horarios", handle_hclash, slash_name="clash-horarios", description="Horarios de la fase de confirmación de Clash.")
+COMMANDS.register('c!', "premios", handle_pclash, slash_name="clash-premios", description="Premios de Clash.")
+
 # --- Punto de Entrada ---
-load_config()
-keep_alive()
-bot.run(TOKEN)
\ No newline at end of file
+async def main():
+    """
+    Arranque en orden: configuración (en paralelo), login, gateway. El índice de búsqueda y los
+    slash commands esperan a que el bot esté conectado (ver start_optional_subsystems).
+    """
+    with STARTUP.phase("configuración"):
+        await load_config()
+    async with bot:
+        with STARTUP.phase("login"):
+            await bot.login(TOKEN)
+        STARTUP.begin("gateway")
+        await bot.connect()
+
+# benchmark.py importa este módulo para medir los comandos sin conectarse a Discord.
+if __name__ == "__main__":
+    discord.utils.setup_logging()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
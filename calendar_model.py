@@ -0,0 +1,94 @@
+# calendar_model.py
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+# Hora (CDMX) a la que se considera que sale un parche, como en p!siguiente.
+PATCH_RELEASE_HOUR = 3
+
+
+def _parse_date(date_str):
+    return datetime.strptime(date_str, "%Y-%m-%d").date()
+
+
+def _localize(timezone, day, hour=0, minute=0):
+    return timezone.localize(datetime(day.year, day.month, day.day, hour, minute))
+
+
+def next_minute(now):
+    """Inicio del siguiente minuto (las cuentas regresivas se muestran con precisión de minutos)."""
+    return now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+
+class PatchCalendar:
+    """Fechas de parche parseadas una sola vez, ordenadas y con zona horaria."""
+
+    def __init__(self, date_strs, timezone):
+        self.dates = sorted({_parse_date(date_str) for date_str in date_strs})
+        self.release_times = [_localize(timezone, day, PATCH_RELEASE_HOUR) for day in self.dates]
+
+    def __len__(self):
+        return len(self.dates)
+
+    def _first_future(self, now):
+        return bisect_right(self.release_times, now)
+
+    def next_release(self, now):
+        """Hora de salida del siguiente parche (o None si ya no quedan en el calendario)."""
+        index = self._first_future(now)
+        return self.release_times[index] if index < len(self.release_times) else None
+
+    def future_releases(self, now):
+        return self.release_times[self._first_future(now):]
+
+
+class ClashEvent:
+    """Un torneo de Clash con sus fechas ya parseadas."""
+
+    def __init__(self, event, timezone):
+        self.raw = event
+        self.name = event['name']
+        self.version = event['version']
+        self.formation_date = _parse_date(event['team_formation_start'])
+        self.formation_start = _localize(timezone, self.formation_date)
+        self.tournament_days = [_parse_date(day) for day in event['tournament_days']]
+
+
+class ClashCalendar:
+    """Eventos de Clash ordenados por inicio de formación de equipos, con búsqueda por bisect."""
+
+    def __init__(self, clash_events, timezone):
+        self.events = sorted((ClashEvent(event, timezone) for event in clash_events), key=lambda event: event.formation_start)
+        self.formation_starts = [event.formation_start for event in self.events]
+
+    def __len__(self):
+        return len(self.events)
+
+    def _first_future(self, now):
+        return bisect_right(self.formation_starts, now)
+
+    def next_event(self, now):
+        index = self._first_future(now)
+        return self.events[index] if index < len(self.events) else None
+
+    def future_events(self, now):
+        return self.events[self._first_future(now):]
+
+
+class RenderCache:
+    """Guarda respuestas ya renderizadas hasta que cruzan su siguiente frontera de tiempo."""
+
+    def __init__(self):
+        self._entries = {}   # clave -> (válido_hasta, valor)
+
+    def get(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None or now >= entry[0]:
+            return None
+        return entry[1]
+
+    def set(self, key, value, valid_until):
+        self._entries[key] = (valid_until, value)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,161 @@
+# champion_index.py
+
+import re
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from patch_search import fold
+
+# Apodos y nombres alternativos comunes -> nombre oficial (tal como aparece en champions.txt).
+DEFAULT_ALIASES = {
+    "monkey king": "Wukong",
+    "monkeyking": "Wukong",
+    "mf": "Miss Fortune",
+    "tf": "Twisted Fate",
+    "j4": "Jarvan IV",
+    "jarvan": "Jarvan IV",
+    "asol": "Aurelion Sol",
+    "nunu": "Nunu & Willump",
+    "willump": "Nunu & Willump",
+    "mundo": "Dr. Mundo",
+    "cho": "Cho'Gath",
+    "kog": "Kog'Maw",
+    "vel": "Vel'Koz",
+    "xin": "Xin Zhao",
+    "lee": "Lee Sin",
+    "yi": "Master Yi",
+    "tahm": "Tahm Kench",
+    "kench": "Tahm Kench",
+    "renata": "Renata Glasc",
+    "ww": "Warwick",
+    "gp": "Gangplank",
+    "heimer": "Heimerdinger",
+    "fiddle": "Fiddlesticks",
+    "blitz": "Blitzcrank",
+    "cait": "Caitlyn",
+    "kassa": "Kassadin",
+    "morde": "Mordekaiser",
+    "naut": "Nautilus",
+    "voli": "Volibear",
+}
+
+ChampionEntry = namedtuple('ChampionEntry', ['name', 'key'])
+LookupResult = namedtuple('LookupResult', ['match', 'exact', 'suggestions'])
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Conjunciones que el artículo traduce en nombres compuestos: "Nunu & Willump" en champions.txt
+# es "Nunu y Willump" en las notas en español, "Nunu e Willump" en portugués, "Nunu et Willump" en francés.
+_CONJUNCTIONS = {"y", "and", "e", "et"}
+
+
+def normalize_name(text):
+    """
+    Minúsculas, sin acentos y solo letras/números: "Kai'Sa" -> "kaisa", "Rék Sai" -> "reksai".
+    Sin las conjunciones entre palabras: "Nunu & Willump" y "Nunu y Willump" -> "nunuwillump".
+    """
+    words = _WORD.findall(fold(text))
+    return ''.join(words[:1] + [word for word in words[1:] if word not in _CONJUNCTIONS])
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Distancia de Levenshtein; corta en cuanto se sabe que supera `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _max_distance(key):
+    if len(key) <= 4:
+        return 1
+    if len(key) <= 8:
+        return 2
+    return 3
+
+
+class ChampionIndex:
+    """
+    Índice precalculado de campeones: claves normalizadas, apodos, búsqueda por prefijo
+    y coincidencia aproximada (trigramas + distancia de edición) para errores de dedo.
+    """
+
+    def __init__(self, names, aliases=DEFAULT_ALIASES):
+        self.entries = {}    # clave normalizada -> ChampionEntry
+        self._trigram_index = {}
+        for name in names:
+            key = normalize_name(name)
+            if not key or key in self.entries:
+                continue
+            self.entries[key] = ChampionEntry(name, key)
+            for trigram in _trigrams(key):
+                self._trigram_index.setdefault(trigram, []).append(key)
+        self._sorted_keys = sorted(self.entries)
+
+        # Los apodos solo cuentan si el campeón existe en la lista cargada.
+        by_name = {entry.name.lower(): entry for entry in self.entries.values()}
+        self.aliases = {}
+        for alias, target in aliases.items():
+            entry = by_name.get(target.lower())
+            if entry:
+                self.aliases[normalize_name(alias)] = entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        key = normalize_name(name)
+        return key in self.entries or key in self.aliases
+
+    def lookup(self, query, max_suggestions=3):
+        """Devuelve LookupResult(match, exact, suggestions) para lo que escribió el usuario."""
+        key = normalize_name(query)
+        if not key:
+            return LookupResult(None, False, [])
+
+        entry = self.entries.get(key) or self.aliases.get(key)
+        if entry:
+            return LookupResult(entry, True, [])
+
+        # Prefijo único ("kais" -> Kai'Sa).
+        if len(key) >= 3:
+            prefixed = self._prefix_matches(key)
+            if len(prefixed) == 1:
+                return LookupResult(self.entries[prefixed[0]], True, [])
+
+        # Coincidencia aproximada: candidatos por trigramas compartidos, luego distancia de edición.
+        shared = Counter()
+        for trigram in _trigrams(key):
+            for candidate in self._trigram_index.get(trigram, ()):
+                shared[candidate] += 1
+        limit = _max_distance(key)
+        ranked = []
+        for candidate, overlap in shared.most_common(20):
+            distance = edit_distance(key, candidate, limit + 1)
+            ranked.append((distance, -overlap, candidate))
+        ranked.sort()
+
+        suggestions = [self.entries[candidate].name for _, _, candidate in ranked[:max_suggestions]]
+        if ranked and ranked[0][0] <= limit and (len(ranked) == 1 or ranked[1][0] > ranked[0][0]):
+            best = self.entries[ranked[0][2]]
+            return LookupResult(best, False, [name for name in suggestions if name != best.name])
+        return LookupResult(None, False, suggestions)
+
+    def _prefix_matches(self, key):
+        start = bisect_left(self._sorted_keys, key)
+        matches = []
+        for candidate in self._sorted_keys[start:]:
+            if not candidate.startswith(key):
+                break
+            matches.append(candidate)
+        return matches
@@ -0,0 +1,136 @@
+# command_router.py
+# Tabla de comandos: prefijo -> nombre (o alias) -> manejador.
+# on_message corre para cada mensaje de cada canal y casi todos son plática, así que el descarte
+# es una sola expresión precompilada; solo los mensajes que parecen comandos llegan a la tabla.
+# Los mismos manejadores se pueden registrar como slash commands (SLASH_COMMANDS=1).
+
+import contextlib
+import re
+from dataclasses import dataclass
+import discord
+from discord import app_commands
+
+
+@dataclass(frozen=True)
+class Command:
+    prefix: str
+    name: str
+    handler: object               # corrutina: handler(message) o handler(message, argumento)
+    aliases: tuple = ()
+    takes_argument: bool = False
+    usage: str = None             # si está, el argumento es obligatorio y esto se responde cuando falta
+    description: str = ""         # para el slash command
+    slash_name: str = None        # nombre del slash command (None = el mismo nombre)
+
+    @property
+    def key(self):
+        return f"{self.prefix}{self.name}"
+
+
+class CommandRouter:
+    """Registro de comandos con un descarte barato de los mensajes que no lo son."""
+
+    def __init__(self):
+        self._table = {}          # (prefijo, nombre o alias) -> Command
+        self._commands = []
+        self._pattern = None
+
+    def register(self, prefix, name, handler, aliases=(), takes_argument=False, usage=None, description="", slash_name=None):
+        command = Command(prefix, name, handler, tuple(aliases), takes_argument or usage is not None, usage, description, slash_name)
+        for alias in (name, *aliases):
+            key = (prefix, alias.lower())
+            if key in self._table:
+                raise ValueError(f"el comando {prefix}{alias} ya está registrado")
+            self._table[key] = command
+        self._commands.append(command)
+        self._pattern = None
+        return command
+
+    @property
+    def commands(self):
+        return list(self._commands)
+
+    def _compile(self):
+        # Prefijos más largos primero para que "p!ver" no se lea como "!" + "ver".
+        prefixes = sorted({prefix for prefix, _ in self._table}, key=len, reverse=True)
+        alternatives = "|".join(re.escape(prefix) for prefix in prefixes)
+        self._pattern = re.compile(rf"({alternatives})\s*(\S+)(?:\s+(.*))?", re.DOTALL)
+
+    def resolve(self, content):
+        """(Command, argumento o None) si el mensaje es un comando registrado; si no, None."""
+        if self._pattern is None:
+            self._compile()
+        match = self._pattern.match(content)
+        if match is None:
+            return None
+        command = self._table.get((match.group(1), match.group(2).lower()))
+        if command is None:
+            return None
+        argument = match.group(3)
+        return command, (argument.strip() or None) if argument else None
+
+    async def dispatch(self, message, command, argument):
+        if command.usage and not argument:
+            await message.channel.send(command.usage)
+        elif command.takes_argument:
+            await command.handler(message, argument)
+        else:
+            await command.handler(message)
+
+    # --- Slash commands ---
+    def register_slash_commands(self, tree):
+        """Agrega cada comando de la tabla al árbol de slash commands del bot (falta tree.sync())."""
+        for command in self._commands:
+            tree.add_command(app_commands.Command(
+                name=command.slash_name or command.name,
+                description=(command.description or command.key)[:100],
+                callback=self._slash_callback(command),
+            ))
+
+    def _slash_callback(self, command):
+        async def run(interaction, argument=None):
+            await self.dispatch(InteractionMessage(interaction, command, argument), command, argument)
+
+        if command.usage:
+            # El argumento obligatorio lo pide la interfaz de Discord.
+            async def callback(interaction: discord.Interaction, argumento: str):
+                await run(interaction, argumento)
+        elif command.takes_argument:
+            async def callback(interaction: discord.Interaction, argumento: str = None):
+                await run(interaction, argumento)
+        else:
+            async def callback(interaction: discord.Interaction):
+                await run(interaction)
+        return callback
+
+
+class InteractionChannel:
+    """Lo que los manejadores usan de message.channel, respondiendo a la interacción."""
+
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.id = interaction.channel_id
+
+    @contextlib.asynccontextmanager
+    async def typing(self):
+        # Respuestas lentas (descargar un parche): se avisa a Discord para no pasar de los 3 segundos.
+        if not self.interaction.response.is_done():
+            await self.interaction.response.defer(thinking=True)
+        yield
+
+    async def send(self, content=None, **kwargs):
+        if not self.interaction.response.is_done():
+            await self.interaction.response.send_message(content, **kwargs)
+            return await self.interaction.original_response()
+        return await self.interaction.followup.send(content, wait=True, **kwargs)
+
+
+class InteractionMessage:
+    """Adapta una interacción de slash command a la forma de un mensaje, para usar los mismos manejadores."""
+
+    def __init__(self, interaction, command, argument):
+        self.interaction = interaction
+        self.author = interaction.user
+        self.guild = interaction.guild
+        self.channel = InteractionChannel(interaction)
+        self.content = f"{command.key} {argument}" if argument else command.key
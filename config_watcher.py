@@ -0,0 +1,71 @@
+# config_watcher.py
+
+import asyncio
+import json
+import os
+import metrics
+
+# Cada cuántos segundos se revisan las fechas de modificación de los archivos de configuración.
+CONFIG_RELOAD_SECONDS = float(os.getenv('CONFIG_RELOAD_SECONDS', 10))
+
+
+def file_signature(path):
+    """(mtime, tamaño) del archivo, o None si no existe."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def write_json_atomic(path, data):
+    """Escribe `data` como JSON de forma atómica (archivo temporal + os.replace)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class ConfigWatcher:
+    """
+    Vigila archivos de configuración por fecha de modificación (sin dependencias extra)
+    y llama a `on_change(path)` solo para el archivo que cambió.
+    """
+
+    def __init__(self, interval=CONFIG_RELOAD_SECONDS):
+        self.interval = interval
+        self._callbacks = {}
+        self._signatures = {}
+
+    def register(self, path, on_change):
+        self._callbacks[path] = on_change
+        self._signatures[path] = file_signature(path)
+
+    def mark_loaded(self, path):
+        """Registra la versión actual del archivo como ya cargada."""
+        self._signatures[path] = file_signature(path)
+
+    def check(self):
+        """Revisa todos los archivos una vez y recarga los que cambiaron. Devuelve sus rutas."""
+        changed = []
+        for path, on_change in self._callbacks.items():
+            signature = file_signature(path)
+            if signature == self._signatures.get(path):
+                continue
+            self._signatures[path] = signature
+            if signature is None:
+                print(f"Advertencia: {path} ya no existe; se conserva la versión cargada.")
+                continue
+            changed.append(path)
+            try:
+                on_change(path)
+            except Exception as e:
+                metrics.record_error("config_reload", e)
+                print(f"Error al recargar {path}: {e}. Se conserva la versión anterior.")
+        return changed
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            with metrics.SCHEDULER_SECONDS.time(task="config_watcher"):
+                self.check()
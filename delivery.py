@@ -0,0 +1,179 @@
+# delivery.py
+
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+import discord
+
+# --- Límites de Discord ---
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_CHARS_PER_MESSAGE = 6000      # suma de títulos, descripciones, campos, pies y autores
+MAX_DESCRIPTION_CHARS = 4096
+# Límite de mensajes por canal que aplica Discord (aprox. 5 cada 5 segundos).
+CHANNEL_BUCKET_SIZE = 5
+CHANNEL_BUCKET_SECONDS = 5.0
+# Canales a los que se envía un anuncio al mismo tiempo (el resto espera su turno).
+FANOUT_CONCURRENCY = int(os.getenv('FANOUT_CONCURRENCY', 16))
+
+
+@dataclass
+class DeliveryReport:
+    """Lo que costó enviar la respuesta de un comando."""
+    embeds: int = 0
+    messages: int = 0
+    api_calls: int = 0
+    elapsed_ms: float = 0.0
+    first_message: object = None
+
+
+@dataclass
+class FanOutReport:
+    """Resultado de enviar un anuncio a todos los canales suscritos."""
+    targets: int = 0
+    delivered: int = 0
+    failures: list = field(default_factory=list)   # [(destino, error)]
+    elapsed_ms: float = 0.0
+
+
+def pack_embeds(embeds):
+    """Agrupa los embeds en mensajes de hasta 10 embeds y 6000 caracteres."""
+    messages = []
+    current = []
+    current_chars = 0
+    for embed in embeds:
+        embed_chars = len(embed)
+        if current and (len(current) >= MAX_EMBEDS_PER_MESSAGE or current_chars + embed_chars > MAX_CHARS_PER_MESSAGE):
+            messages.append(current)
+            current = []
+            current_chars = 0
+        current.append(embed)
+        current_chars += embed_chars
+    if current:
+        messages.append(current)
+    return messages
+
+
+def fit_single_message(embeds):
+    """
+    Ajusta los embeds para que quepan en UN mensaje (por ejemplo, una página que se edita):
+    máximo 10 embeds y 6000 caracteres, recortando las descripciones más largas con "…".
+    """
+    embeds = embeds[:MAX_EMBEDS_PER_MESSAGE]
+    for embed in embeds:
+        if embed.description and len(embed.description) > MAX_DESCRIPTION_CHARS:
+            embed.description = embed.description[:MAX_DESCRIPTION_CHARS - 1] + "…"
+    excess = sum(len(embed) for embed in embeds) - MAX_CHARS_PER_MESSAGE
+    while excess > 0:
+        longest = max(embeds, key=lambda embed: len(embed.description or ""))
+        description = longest.description or ""
+        if not description:
+            break
+        keep = max(0, len(description) - excess - 1)
+        longest.description = description[:keep] + "…"
+        excess = sum(len(embed) for embed in embeds) - MAX_CHARS_PER_MESSAGE
+    return embeds
+
+
+class EmbedDelivery:
+    """
+    Envía embeds agrupados y en orden por canal, respetando el límite de mensajes por canal
+    para no chocar con los rate limits de Discord.
+    """
+
+    def __init__(self, bucket_size=CHANNEL_BUCKET_SIZE, bucket_seconds=CHANNEL_BUCKET_SECONDS):
+        self.bucket_size = bucket_size
+        self.bucket_seconds = bucket_seconds
+        self._locks = {}          # canal -> asyncio.Lock (un envío a la vez por canal, en orden)
+        self._sent_at = {}        # canal -> deque con la hora de los últimos envíos
+        self._in_flight = {}      # canal -> envíos en curso o esperando el lock
+        self._last_sweep = time.monotonic()
+
+    def _evict_idle(self, now):
+        """Olvida los canales sin envíos en curso cuya ventana de límite ya pasó (no hay nada que esperar)."""
+        for channel_id, sent_at in list(self._sent_at.items()):
+            if channel_id in self._in_flight or (sent_at and sent_at[-1] + self.bucket_seconds > now):
+                continue
+            del self._sent_at[channel_id]
+            self._locks.pop(channel_id, None)
+
+    async def _wait_for_bucket(self, channel_id):
+        sent_at = self._sent_at.setdefault(channel_id, deque(maxlen=self.bucket_size))
+        if len(sent_at) == self.bucket_size:
+            wait = sent_at[0] + self.bucket_seconds - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        sent_at.append(time.monotonic())
+
+    async def _send(self, channel, report, **kwargs):
+        for attempt in range(3):
+            await self._wait_for_bucket(channel.id)
+            report.api_calls += 1
+            try:
+                message = await channel.send(**kwargs)
+                report.messages += 1
+                return message
+            except discord.HTTPException as e:
+                if e.status != 429 or attempt == 2:
+                    raise
+                await asyncio.sleep(getattr(e, 'retry_after', None) or self.bucket_seconds)
+
+    async def send_embeds(self, channel, embeds, label=None, **kwargs):
+        """Envía todos los embeds con el mínimo de mensajes. Los kwargs extra van en el primer mensaje."""
+        report = DeliveryReport()
+        start = time.perf_counter()
+        # Como mucho una vez por ventana se recorren los canales para soltar los inactivos.
+        now = time.monotonic()
+        if now - self._last_sweep >= self.bucket_seconds:
+            self._last_sweep = now
+            self._evict_idle(now)
+        self._in_flight[channel.id] = self._in_flight.get(channel.id, 0) + 1
+        try:
+            lock = self._locks.setdefault(channel.id, asyncio.Lock())
+            async with lock:
+                for batch in pack_embeds(embeds):
+                    report.embeds += len(batch)
+                    message = await self._send(channel, report, embeds=batch, **kwargs)
+                    if report.first_message is None:
+                        report.first_message = message
+                    kwargs = {}
+        finally:
+            self._in_flight[channel.id] -= 1
+            if not self._in_flight[channel.id]:
+                del self._in_flight[channel.id]
+        report.elapsed_ms = (time.perf_counter() - start) * 1000
+        if label:
+            print(f"[{label}] {report.embeds} embeds en {report.messages} mensajes ({report.api_calls} llamadas a la API, {report.elapsed_ms:.0f} ms)")
+        return report
+
+
+# Instancia compartida por todo el bot (los límites por canal solo sirven si todos pasan por aquí).
+DEFAULT_DELIVERY = EmbedDelivery()
+
+
+async def fan_out(targets, send, concurrency=FANOUT_CONCURRENCY, label=None):
+    """
+    Llama a `send(destino)` para cada destino, con como máximo `concurrency` envíos a la vez.
+    Un destino que falla (canal borrado, sin permisos, etc.) no detiene a los demás: su error
+    queda en el reporte.
+    """
+    report = FanOutReport(targets=len(targets))
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+
+    async def deliver(target):
+        async with semaphore:
+            try:
+                await send(target)
+                report.delivered += 1
+            except Exception as e:
+                report.failures.append((target, e))
+
+    await asyncio.gather(*(deliver(target) for target in targets))
+    report.elapsed_ms = (time.perf_counter() - start) * 1000
+    if label:
+        print(f"[{label}] enviado a {report.delivered}/{report.targets} canales en {report.elapsed_ms:.0f} ms")
+        for target, error in report.failures:
+            print(f"[{label}] Error al enviar a {target}: {error}")
+    return report
@@ -0,0 +1,144 @@
+# http_client.py
+
+import asyncio
+import os
+import random
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+import aiohttp
+import metrics
+import singleflight
+
+# --- Configuración del Cliente HTTP ---
+# Todos los valores se pueden ajustar por variables de entorno (.env).
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 10))
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', 20))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv('HTTP_MAX_CONNECTIONS_PER_HOST', 4))
+HTTP_MAX_CONCURRENT_REQUESTS = int(os.getenv('HTTP_MAX_CONCURRENT_REQUESTS', 8))
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 3))
+HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', 0.5))
+HTTP_USER_AGENT = "ElRinconDelPoroBot/1.2 (+https://github.com/carlosfong02/El-Rincon-del-Poro-Bot)"
+
+# Códigos que vale la pena reintentar (límite de peticiones y errores del servidor).
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# --- Estado Compartido ---
+# Una sola sesión (con su pool de conexiones keep-alive) para todo el bot.
+_session = None
+_semaphore = None
+# Descargas idénticas en curso (misma URL y mismos encabezados) comparten una sola petición.
+FETCHES = singleflight.SingleFlight("http")
+
+
+# Respuesta completa para quien necesite el código y los validadores (ETag / Last-Modified).
+FetchResult = namedtuple('FetchResult', ['status', 'body', 'etag', 'last_modified'])
+
+
+class FetchError(Exception):
+    """Se lanza cuando una URL no se pudo descargar después de todos los reintentos."""
+
+
+async def get_session():
+    """Devuelve la sesión compartida, creándola dentro del event loop actual si hace falta."""
+    global _session, _semaphore
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_MAX_CONNECTIONS,
+            limit_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=30,
+            ttl_dns_cache=300,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+            headers={"User-Agent": HTTP_USER_AGENT},
+        )
+        _semaphore = asyncio.Semaphore(HTTP_MAX_CONCURRENT_REQUESTS)
+    return _session
+
+
+def _backoff_delay(attempt, retry_after=None):
+    """Calcula la espera antes del siguiente intento (exponencial con jitter)."""
+    if retry_after:
+        try:
+            return min(float(retry_after), 60.0)
+        except ValueError:
+            pass
+    return HTTP_BACKOFF_BASE * (2 ** attempt) + random.uniform(0, HTTP_BACKOFF_BASE)
+
+
+async def fetch(url, headers=None):
+    """
+    Descarga una URL sin bloquear el event loop y devuelve su contenido en bytes.
+    Reintenta con backoff exponencial ante timeouts, errores de red y respuestas 429/5xx.
+    """
+    result = await fetch_response(url, headers)
+    return result.body
+
+
+async def fetch_response(url, headers=None):
+    """
+    Igual que fetch, pero devuelve un FetchResult. Una respuesta 304 (Not Modified) a una
+    petición condicional se devuelve tal cual, con body vacío.
+    Si ya hay una descarga idéntica en curso, se espera su resultado en vez de repetirla.
+    """
+    key = (url, tuple(sorted((headers or {}).items())))
+    return await FETCHES.do(key, lambda: _fetch_response(url, headers))
+
+
+async def _fetch_response(url, headers=None):
+    host = urlsplit(url).netloc
+    start = time.perf_counter()
+    result = "error"
+    try:
+        response = await _fetch_with_retries(url, headers)
+        result = str(response.status)
+        metrics.HTTP_BYTES.inc(len(response.body), host=host)
+        return response
+    except Exception as e:
+        metrics.record_error("http_fetch", e)
+        raise
+    finally:
+        metrics.HTTP_SECONDS.observe(time.perf_counter() - start, host=host, result=result)
+
+
+async def _fetch_with_retries(url, headers=None):
+    session = await get_session()
+    last_error = None
+
+    for attempt in range(HTTP_MAX_RETRIES):
+        retry_after = None
+        try:
+            async with _semaphore:
+                async with session.get(url, headers=headers) as response:
+                    if response.status in RETRY_STATUSES:
+                        retry_after = response.headers.get('Retry-After')
+                        last_error = f"HTTP {response.status}"
+                    else:
+                        response.raise_for_status()
+                        body = await response.read()
+                        return FetchResult(
+                            response.status,
+                            body,
+                            response.headers.get('ETag'),
+                            response.headers.get('Last-Modified'),
+                        )
+        except aiohttp.ClientResponseError as e:
+            # Un 404 o 403 no se arregla reintentando.
+            raise FetchError(f"No se pudo descargar {url}: HTTP {e.status}") from e
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            last_error = repr(e)
+
+        if attempt < HTTP_MAX_RETRIES - 1:
+            await asyncio.sleep(_backoff_delay(attempt, retry_after))
+
+    raise FetchError(f"No se pudo descargar {url} tras {HTTP_MAX_RETRIES} intentos: {last_error}")
+
+
+async def close_session():
+    """Cierra la sesión compartida (se llama al apagar el bot)."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
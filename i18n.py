@@ -0,0 +1,189 @@
+# i18n.py
+# Idiomas del bot: nombres de meses y días ya calculados, formatos de fecha y la página de notas
+# de parche de cada idioma. No se usa locale.setlocale: cambia el locale de todo el proceso (no es
+# seguro con hilos) y depende de los locales instalados en el servidor; sin es_ES.UTF-8 los meses
+# salían en inglés. Cada servidor elige su idioma con p!idioma; se guarda en languages.json:
+#   {"guilds": {"123": "en"}}
+
+import json
+import os
+from dataclasses import dataclass
+import config_watcher
+
+LANGUAGES_PATH = os.getenv('LANGUAGES_PATH', "languages.json")
+# Lista de notas de parche; {region} se reemplaza por la del idioma (es-mx, en-us, ...).
+# Se puede apuntar a un servidor local de pruebas (sin {region}, todos los idiomas usan esa URL).
+PATCH_LIST_URL = os.getenv('PATCH_LIST_URL', "https://www.leagueoflegends.com/{region}/news/tags/patch-notes/")
+
+
+@dataclass(frozen=True)
+class Language:
+    code: str
+    name: str
+    region: str       # segmento de leagueoflegends.com con las notas en este idioma
+    months: tuple     # enero ... diciembre
+    days: tuple       # lunes ... domingo (en el orden de datetime.weekday())
+    conjunction: str  # para unir días: "14 y 15"
+    formats: dict     # estilo -> plantilla con {day}, {days}, {month}, {year}, {weekday}
+
+
+LANGUAGES = {language.code: language for language in (
+    Language(
+        code="es", name="Español", region="es-mx",
+        months=("enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
+                "septiembre", "octubre", "noviembre", "diciembre"),
+        days=("lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo"),
+        conjunction="y",
+        formats={
+            "day": "{day:02d}",
+            "day_month": "{day:02d} de {month}",
+            "date": "{day:02d} de {month} de {year}",
+            "month_year": "{month} de {year}",
+            "days_month": "{days} de {month}",
+            "days_month_year": "{days} de {month} de {year}",
+            "weekday_date": "{weekday} {day:02d} de {month} de {year}",
+        },
+    ),
+    Language(
+        code="en", name="English", region="en-us",
+        months=("January", "February", "March", "April", "May", "June", "July", "August",
+                "September", "October", "November", "December"),
+        days=("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"),
+        conjunction="and",
+        formats={
+            "day": "{day}",
+            "day_month": "{month} {day}",
+            "date": "{month} {day}, {year}",
+            "month_year": "{month} {year}",
+            "days_month": "{month} {days}",
+            "days_month_year": "{month} {days}, {year}",
+            "weekday_date": "{weekday}, {month} {day}, {year}",
+        },
+    ),
+    Language(
+        code="pt", name="Português", region="pt-br",
+        months=("janeiro", "fevereiro", "março", "abril", "maio", "junho", "julho", "agosto",
+                "setembro", "outubro", "novembro", "dezembro"),
+        days=("segunda-feira", "terça-feira", "quarta-feira", "quinta-feira", "sexta-feira", "sábado", "domingo"),
+        conjunction="e",
+        formats={
+            "day": "{day:02d}",
+            "day_month": "{day:02d} de {month}",
+            "date": "{day:02d} de {month} de {year}",
+            "month_year": "{month} de {year}",
+            "days_month": "{days} de {month}",
+            "days_month_year": "{days} de {month} de {year}",
+            "weekday_date": "{weekday}, {day:02d} de {month} de {year}",
+        },
+    ),
+    Language(
+        code="fr", name="Français", region="fr-fr",
+        months=("janvier", "février", "mars", "avril", "mai", "juin", "juillet", "août",
+                "septembre", "octobre", "novembre", "décembre"),
+        days=("lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"),
+        conjunction="et",
+        formats={
+            "day": "{day}",
+            "day_month": "{day} {month}",
+            "date": "{day} {month} {year}",
+            "month_year": "{month} {year}",
+            "days_month": "{days} {month}",
+            "days_month_year": "{days} {month} {year}",
+            "weekday_date": "{weekday} {day} {month} {year}",
+        },
+    ),
+)}
+
+DEFAULT_LANGUAGE = os.getenv('BOT_LANGUAGE', "es")
+if DEFAULT_LANGUAGE not in LANGUAGES:
+    print(f"Advertencia: BOT_LANGUAGE={DEFAULT_LANGUAGE} no existe, se usará es.")
+    DEFAULT_LANGUAGE = "es"
+
+
+def get_language(code=None):
+    """El Language de un código; el idioma por defecto si es None o no existe."""
+    return LANGUAGES.get(code) or LANGUAGES[DEFAULT_LANGUAGE]
+
+
+# --- Fechas ---
+# Funciones puras sobre tablas que no cambian: se pueden usar desde cualquier hilo.
+def format_date(moment, style="date", language=None):
+    """Fecha con el formato `style` del idioma: format_date(d, "date", "es") -> "21 de octubre de 2025"."""
+    lang = get_language(language)
+    return lang.formats[style].format(day=moment.day, month=lang.months[moment.month - 1], year=moment.year,
+                                      weekday=lang.days[moment.weekday()])
+
+
+def format_days(moments, style="days_month_year", language=None):
+    """Varios días del mismo mes: "14 y 15 de octubre de 2025" / "October 14 and 15, 2025"."""
+    lang = get_language(language)
+    numbers = [lang.formats["day"].format(day=moment.day) for moment in moments]
+    days = numbers[0] if len(numbers) == 1 else f"{', '.join(numbers[:-1])} {lang.conjunction} {numbers[-1]}"
+    first = moments[0]
+    return lang.formats[style].format(days=days, month=lang.months[first.month - 1], year=first.year)
+
+
+# --- Páginas de notas de parche ---
+def patch_list_url(language=None):
+    """Lista de notas de parche en el idioma dado."""
+    return PATCH_LIST_URL.format(region=get_language(language).region)
+
+
+def language_for_url(url):
+    """Idioma de una URL de leagueoflegends.com según su región ("/en-us/" -> "en"); el por defecto si no trae."""
+    for language in LANGUAGES.values():
+        if f"/{language.region}/" in (url or ""):
+            return language.code
+    return DEFAULT_LANGUAGE
+
+
+def article_key(url):
+    """La URL sin el segmento de región: el mismo artículo en dos idiomas tiene la misma clave."""
+    region = get_language(language_for_url(url)).region
+    return (url or "").replace(f"/{region}/", "/", 1)
+
+
+# --- Idioma por servidor ---
+def parse_language(code):
+    """Valida un código de idioma ("es", "en", ...). Lanza ValueError si no existe."""
+    code = str(code).strip().lower()
+    if code not in LANGUAGES:
+        raise ValueError(f"idioma desconocido: {code} (disponibles: {', '.join(LANGUAGES)})")
+    return code
+
+
+def load_guild_languages(path):
+    """Lee y valida languages.json sin tocar el registro en memoria: {guild_id: código}."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {int(guild_id): parse_language(code) for guild_id, code in data.get("guilds", {}).items()}
+
+
+class GuildLanguages:
+    """Idioma elegido por cada servidor; los que no eligieron usan DEFAULT_LANGUAGE."""
+
+    def __init__(self):
+        self._by_guild = {}
+
+    def __len__(self):
+        return len(self._by_guild)
+
+    def replace(self, languages):
+        self._by_guild = dict(languages)
+
+    def get(self, guild_id):
+        return self._by_guild.get(guild_id, DEFAULT_LANGUAGE)
+
+    def set(self, guild_id, code):
+        self._by_guild[guild_id] = code
+
+    def counts(self):
+        """{código: servidores que lo eligieron}."""
+        counts = {}
+        for code in self._by_guild.values():
+            counts[code] = counts.get(code, 0) + 1
+        return counts
+
+    def save(self, path=LANGUAGES_PATH):
+        data = {"guilds": {str(guild_id): code for guild_id, code in sorted(self._by_guild.items())}}
+        config_watcher.write_json_atomic(path, data)
@@ -1,15 +1,76 @@
-from flask import Flask
-from threading import Thread
+# keep_alive.py
+# Servidor HTTP ligero dentro del mismo event loop del bot (aiohttp, que ya viene con discord.py).
+#   /         -> texto fijo (para UptimeRobot)
+#   /healthz  -> el proceso y el event loop responden
+#   /readyz   -> el bot realmente está funcionando (gateway, tareas, caché); 503 si algo falla
+#   /metrics  -> métricas en formato Prometheus
 
-app = Flask('')
+import os
+import time
+from aiohttp import web
+import metrics
 
-@app.route('/')
-def home():
-    return "El Rincón del Poro está vivo."
+HEALTH_HOST = os.getenv('HEALTH_HOST', '0.0.0.0')
+HEALTH_PORT = int(os.getenv('PORT', 8080))   # Render asigna el puerto en PORT
 
-def run():
-  app.run(host='0.0.0.0',port=8080)
+STARTED_AT = time.monotonic()
 
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
\ No newline at end of file
+# nombre -> función que devuelve (ok, detalle). Las registra bot.py.
+_checks = {}
+_runner = None
+
+
+def add_check(name, fn):
+    """Registra una verificación para /readyz."""
+    _checks[name] = fn
+
+
+def run_checks():
+    """Corre todas las verificaciones. Devuelve (todo_bien, {nombre: {"ok": ..., "detail": ...}})."""
+    results = {}
+    for name, fn in _checks.items():
+        try:
+            ok, detail = fn()
+        except Exception as e:
+            ok, detail = False, f"{type(e).__name__}: {e}"
+        results[name] = {"ok": bool(ok), "detail": detail}
+    return all(result["ok"] for result in results.values()), results
+
+
+async def home(request):
+    return web.Response(text="El Rincón del Poro está vivo.")
+
+
+async def healthz(request):
+    return web.json_response({"status": "ok", "uptime_seconds": round(time.monotonic() - STARTED_AT)})
+
+
+async def readyz(request):
+    ready, results = run_checks()
+    return web.json_response({"status": "ready" if ready else "not ready", "checks": results}, status=200 if ready else 503)
+
+
+async def metrics_page(request):
+    return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8",
+                        headers={"Cache-Control": "no-store"})
+
+
+async def keep_alive(host=HEALTH_HOST, port=HEALTH_PORT):
+    """Arranca el servidor en el event loop actual (se llama desde setup_hook del bot)."""
+    global _runner
+    app = web.Application()
+    app.router.add_get('/', home)
+    app.router.add_get('/healthz', healthz)
+    app.router.add_get('/readyz', readyz)
+    app.router.add_get('/metrics', metrics_page)
+    _runner = web.AppRunner(app, access_log=None)
+    await _runner.setup()
+    await web.TCPSite(_runner, host, port).start()
+    print(f"Servidor de salud escuchando en {host}:{port} (/healthz, /readyz, /metrics).")
+
+
+async def stop_keep_alive():
+    global _runner
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
@@ -0,0 +1,218 @@
+# metrics.py
+# Métricas del bot en formato de texto de Prometheus (las sirve keep_alive.py en /metrics).
+# Contadores e histogramas en memoria, pensados para dejarse siempre activos: registrar una
+# medición es un perf_counter, una búsqueda en un dict y unas cuantas sumas.
+
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+
+# Prefijo común de todas las métricas.
+METRIC_PREFIX = "poro_"
+
+# Límites (en segundos) de los histogramas de latencia: de 1 ms a 30 s.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# nombre -> (ayuda, función). La función devuelve un número o un dict {etiquetas: número},
+# donde las etiquetas son una tupla de pares (("grupo", "http"),).
+_GAUGES = {}
+# nombre -> Counter / Histogram
+_METRICS = {}
+
+
+def gauge(name, help_text, fn):
+    """Registra un valor que se calcula al momento de pedir /metrics (tamaños de caché, latencia, etc.)."""
+    _GAUGES[METRIC_PREFIX + name] = (help_text, fn)
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Counter:
+    """Contador que solo sube, con etiquetas opcionales."""
+
+    def __init__(self, name, help_text):
+        self.name = METRIC_PREFIX + name
+        self.help_text = help_text
+        self.values = {}
+        self._lock = threading.Lock()   # también se usa desde los hilos de asyncio.to_thread
+        _METRICS[self.name] = self
+
+    def inc(self, amount=1, **labels):
+        key = _labels_key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self.values.get(_labels_key(labels), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(labels)} {_format_value(value)}" for labels, value in sorted(self.values.items())]
+        return lines
+
+
+class Histogram:
+    """Histograma de latencias con cubetas fijas (suficiente para p50/p95 aproximados)."""
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = METRIC_PREFIX + name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.series = {}    # etiquetas -> [conteos por cubeta (+Inf al final), suma, total]
+        self._lock = threading.Lock()
+        _METRICS[self.name] = self
+
+    def observe(self, seconds, **labels):
+        key = _labels_key(labels)
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def time(self, **labels):
+        return Timer(self, labels)
+
+    def count(self, **labels):
+        series = self.series.get(_labels_key(labels))
+        return series[2] if series else 0
+
+    def quantile(self, q, **labels):
+        """Percentil aproximado (interpolando dentro de la cubeta), o None si no hay datos."""
+        return _quantile(self.buckets, self.series.get(_labels_key(labels)), q)
+
+    def label_sets(self):
+        return [dict(key) for key in sorted(self.series)]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+def _quantile(buckets, series, q):
+    if not series or not series[2]:
+        return None
+    counts, _, count = series
+    target = q * count
+    cumulative = 0
+    lower = 0.0
+    for bound, bucket_count in zip(buckets + (math.inf,), counts):
+        if bucket_count and cumulative + bucket_count >= target:
+            if bound == math.inf:
+                return lower
+            return lower + (bound - lower) * (target - cumulative) / bucket_count
+        cumulative += bucket_count
+        lower = bound
+    return lower
+
+
+class Timer:
+    """
+    Mide un bloque (`with` o `async with`) y lo registra en el histograma. Si el bloque lanza
+    una excepción, se cuenta en ERRORS con su tipo y se deja pasar.
+    """
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        # Solo errores reales: una cancelación (asyncio.CancelledError) no cuenta.
+        if exc_type is not None and issubclass(exc_type, Exception):
+            where = self.histogram.name[len(METRIC_PREFIX):]
+            if self.labels:
+                where += ":" + ",".join(str(value) for value in self.labels.values())
+            ERRORS.inc(where=where, type=exc_type.__name__)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+def timed(histogram, **labels):
+    """Decorador para corrutinas: mide cada llamada con `histogram` y las etiquetas dadas."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with Timer(histogram, labels):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_error(where, error):
+    """Cuenta un error atrapado (de los que antes solo se imprimían) por lugar y tipo."""
+    ERRORS.inc(where=where, type=type(error).__name__)
+
+
+# --- Métricas del bot ---
+ERRORS = Counter("errors_total", "Errores por lugar y tipo de excepción.")
+MESSAGE_SECONDS = Histogram("message_seconds", "Tiempo total de on_message para mensajes con prefijo, por comando.")
+HANDLER_SECONDS = Histogram("handler_seconds", "Tiempo de cada manejador de comando.")
+HTTP_SECONDS = Histogram("http_fetch_seconds", "Tiempo de cada descarga (con reintentos), por destino y resultado.")
+HTTP_BYTES = Counter("http_bytes_downloaded_total", "Bytes descargados, por destino.")
+STAGE_SECONDS = Histogram("scrape_stage_seconds", "Tiempo de cada etapa del scraping (parse, extract, list, diff).")
+SCHEDULER_SECONDS = Histogram("scheduler_tick_seconds", "Duración de cada vuelta de las tareas automáticas.")
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Búsquedas en cachés, por caché y resultado (hit/miss).")
+
+
+def _format_value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "NaN"
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def render():
+    """Todas las métricas registradas, listas para responder en /metrics."""
+    lines = []
+    for name, metric in sorted(_METRICS.items()):
+        lines += metric.render()
+    for name, (help_text, fn) in sorted(_GAUGES.items()):
+        try:
+            value = fn()
+        except Exception as e:
+            print(f"Error al calcular la métrica {name}: {e}")
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        if isinstance(value, dict):
+            lines += [f"{name}{_format_labels(labels)} {_format_value(item)}" for labels, item in value.items()]
+        else:
+            lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,162 @@
+# pagination.py
+
+import os
+from collections import OrderedDict
+import discord
+import delivery
+
+# --- Configuración de la Paginación ---
+PAGE_VIEW_TIMEOUT = int(os.getenv('PAGE_VIEW_TIMEOUT', 300))   # segundos sin uso antes de quitar los botones
+PAGE_VIEWS_MAX = int(os.getenv('PAGE_VIEWS_MAX', 200))         # vistas vivas a la vez en memoria
+PAGE_MAX_BLOCKS = 4                                             # bloques de cambio por página
+PAGE_MAX_CHARS = 4500                                           # deja margen para el encabezado (límite: 6000)
+PAGE_BLOCK_CHARS = 3500                                         # cambios por bloque (límite de una descripción: 4096)
+
+# Vistas activas, de la más vieja a la más nueva. Al pasar del máximo se cierran las más viejas.
+_active_views = OrderedDict()
+
+
+def _split_text(text, limit):
+    """Parte un texto en trozos de como máximo `limit` caracteres, cortando por líneas cuando se puede."""
+    chunks = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_blocks(blocks, max_chars=PAGE_BLOCK_CHARS):
+    """
+    Parte los bloques cuyos cambios no caben en un embed en bloques de continuación (mismo título
+    con "(cont.)"), cortando entre líneas, para que paginate los reparta sin perder texto.
+    """
+    pieces = []
+    for block in blocks:
+        chunks = _split_text("\n".join(block['changes']), max_chars)
+        if len(chunks) <= 1:
+            pieces.append(block)
+            continue
+        for index, chunk in enumerate(chunks):
+            piece = dict(block, changes=chunk.split("\n"))
+            if index:
+                piece.update(title=f"{block['title']} (cont.)", summary="")
+            pieces.append(piece)
+    return pieces
+
+
+def paginate(blocks, size_of, max_blocks=PAGE_MAX_BLOCKS, max_chars=PAGE_MAX_CHARS):
+    """
+    Reparte los bloques en páginas usando solo su tamaño estimado (sin construir embeds).
+    Devuelve una lista de rangos (inicio, fin).
+    """
+    pages = []
+    start = 0
+    chars = 0
+    for index, block in enumerate(blocks):
+        size = size_of(block)
+        if index > start and (index - start >= max_blocks or chars + size > max_chars):
+            pages.append((start, index))
+            start = index
+            chars = 0
+        chars += size
+    if start < len(blocks) or not pages:
+        pages.append((start, len(blocks)))
+    return pages
+
+
+class PaginatedView(discord.ui.View):
+    """
+    Botones ◀ / ▶ sobre una respuesta larga. Solo se renderiza la página que se muestra;
+    cada página se construye la primera vez que alguien la pide y se guarda mientras la vista viva.
+    """
+
+    def __init__(self, render_page, page_count, author_id=None, timeout=PAGE_VIEW_TIMEOUT):
+        super().__init__(timeout=timeout)
+        self.render_page = render_page
+        self.page_count = page_count
+        self.author_id = author_id
+        self.page = 0
+        self.message = None
+        self._rendered = {}
+        self._update_buttons()
+
+    def page_embeds(self, index):
+        if index not in self._rendered:
+            embeds = self.render_page(index)
+            if self.page_count > 1:
+                embeds[-1].set_footer(text=f"Página {index + 1} de {self.page_count}")
+            self._rendered[index] = delivery.fit_single_message(embeds)
+        return self._rendered[index]
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.page_count - 1
+        self.page_label.label = f"{self.page + 1}/{self.page_count}"
+
+    async def interaction_check(self, interaction):
+        if self.author_id is None or interaction.user.id == self.author_id:
+            return True
+        await interaction.response.send_message("Solo quien usó el comando puede cambiar de página.", ephemeral=True)
+        return False
+
+    async def _show(self, interaction):
+        self._update_buttons()
+        await interaction.response.edit_message(embeds=self.page_embeds(self.page), view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction, button):
+        self.page = max(0, self.page - 1)
+        await self._show(interaction)
+
+    @discord.ui.button(label="1/1", style=discord.ButtonStyle.secondary, disabled=True)
+    async def page_label(self, interaction, button):
+        pass
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction, button):
+        self.page = min(self.page_count - 1, self.page + 1)
+        await self._show(interaction)
+
+    async def close(self):
+        """Quita los botones del mensaje y libera las páginas renderizadas."""
+        self.stop()
+        _active_views.pop(id(self), None)
+        self._rendered.clear()
+        if self.message is not None:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+    async def on_timeout(self):
+        await self.close()
+
+
+async def send_paginated(channel, render_page, page_count, author_id=None, label=None):
+    """Envía la primera página (con botones si hay más de una) y registra la vista."""
+    if page_count <= 1:
+        embeds = render_page(0)
+        return await delivery.DEFAULT_DELIVERY.send_embeds(channel, delivery.fit_single_message(embeds), label=label)
+
+    view = PaginatedView(render_page, page_count, author_id)
+    report = await delivery.DEFAULT_DELIVERY.send_embeds(channel, view.page_embeds(0), label=label, view=view)
+    view.message = report.first_message
+
+    _active_views[id(view)] = view
+    while len(_active_views) > PAGE_VIEWS_MAX:
+        _, oldest = _active_views.popitem(last=False)
+        await oldest.close()
+    return report
@@ -0,0 +1,247 @@
+# patch_archive.py
+# Archivo local de parches: cada artículo ya extraído se guarda en SQLite (el modelo completo,
+# comprimido) junto con índices por campeón y por objeto/runa para consultar parches viejos
+# sin volver a descargarlos.
+# Uso: python patch_archive.py importar <notas.html> [...]   (carga artículos guardados a mano)
+
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from dataclasses import asdict
+import champion_index
+import patch_parser
+
+_VERSION_PATTERN = re.compile(r"patch-(\d+)-(\d+)")
+# Versión de las claves de champion_changes/section_changes (champion_index.normalize_name).
+# Si cambia, las filas se reconstruyen desde los modelos guardados al abrir el archivo.
+INDEX_KEYS_VERSION = "2"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patches (
+    url TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    sort_key INTEGER NOT NULL,
+    title TEXT,
+    published TEXT,
+    first_archived REAL NOT NULL,
+    updated REAL NOT NULL,
+    model BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS patches_by_version ON patches (sort_key);
+CREATE TABLE IF NOT EXISTS champion_changes (
+    champion TEXT NOT NULL,
+    url TEXT NOT NULL,
+    details TEXT NOT NULL,
+    PRIMARY KEY (champion, url)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS section_changes (
+    section_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    block TEXT NOT NULL,
+    PRIMARY KEY (section_id, key, url)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def patch_version(url):
+    """("…/patch-25-22-notes/") -> ("25.22", 25022). Si la URL no trae versión, se usa la URL tal cual."""
+    match = _VERSION_PATTERN.search(url or "")
+    if not match:
+        return url, 0
+    major, minor = int(match.group(1)), int(match.group(2))
+    return f"{major}.{minor}", major * 1000 + minor
+
+
+def pack_model(model):
+    """PatchModel -> JSON comprimido (también lo usa la caché compartida, ver shared_cache.py)."""
+    return zlib.compress(json.dumps(asdict(model), ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def unpack_model(blob):
+    return patch_parser.PatchModel(**json.loads(zlib.decompress(blob)))
+
+
+class PatchArchive:
+    """
+    Archivo de parches en un solo archivo SQLite. Los métodos son bloqueantes:
+    desde el bot se llaman con asyncio.to_thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+        self._count = None   # parches guardados: se cuenta al abrir y save_model lo mantiene al día
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._reindex_if_stale(self._conn)
+            self._count = self._conn.execute("SELECT COUNT(*) FROM patches").fetchone()[0]
+        return self._conn
+
+    def _reindex_if_stale(self, conn):
+        """Reescribe las filas de los índices si se guardaron con otra versión de las claves."""
+        row = conn.execute("SELECT value FROM meta WHERE key = 'index_keys'").fetchone()
+        if row and row[0] == INDEX_KEYS_VERSION:
+            return
+        with conn:
+            conn.execute("DELETE FROM champion_changes")
+            conn.execute("DELETE FROM section_changes")
+            for (blob,) in conn.execute("SELECT model FROM patches").fetchall():
+                self._insert_index_rows(conn, unpack_model(blob))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('index_keys', ?)", (INDEX_KEYS_VERSION,))
+
+    @staticmethod
+    def _insert_index_rows(conn, model):
+        # Campeones bajo la misma clave con la que se consultan (la del índice de campeones),
+        # tomada del mapa de anclas del artículo: "Nunu y Willump" -> "nunuwillump".
+        conn.executemany(
+            "INSERT OR REPLACE INTO champion_changes (champion, url, details) VALUES (?, ?, ?)",
+            [(key, model.url, json.dumps(model.champions[anchor], ensure_ascii=False))
+             for key, anchor in model.champion_anchors.items()],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO section_changes (section_id, key, url, block) VALUES (?, ?, ?, ?)",
+            [(section_id, champion_index.normalize_name(block['title']), model.url, json.dumps(block, ensure_ascii=False))
+             for section_id, blocks in model.sections.items() for block in blocks],
+        )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Escritura ---
+    def save_model(self, model, title=None, published=None):
+        """Guarda (o actualiza) el modelo de un parche y reconstruye sus filas en los índices."""
+        version, sort_key = patch_version(model.url)
+        blob = pack_model(model)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if title is None:
+                title, published = self._listing_for(conn, model.url)
+            is_new = conn.execute("SELECT 1 FROM patches WHERE url = ?", (model.url,)).fetchone() is None
+            with conn:
+                conn.execute(
+                    "INSERT INTO patches (url, version, sort_key, title, published, first_archived, updated, model) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (url) DO UPDATE SET model = excluded.model, updated = excluded.updated, "
+                    "title = COALESCE(excluded.title, patches.title), published = COALESCE(excluded.published, patches.published)",
+                    (model.url, version, sort_key, title, published, now, now, blob),
+                )
+                conn.execute("DELETE FROM champion_changes WHERE url = ?", (model.url,))
+                conn.execute("DELETE FROM section_changes WHERE url = ?", (model.url,))
+                self._insert_index_rows(conn, model)
+            if is_new:
+                self._count += 1
+
+    def save_listing(self, title, url, published):
+        """Recuerda (título, url, fecha) del último parche anunciado, para arrancar sin red."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('latest', ?)",
+                             (json.dumps([title, url, published], ensure_ascii=False),))
+                conn.execute("UPDATE patches SET title = ?, published = ? WHERE url = ?", (title, published, url))
+
+    def _listing_for(self, conn, url):
+        row = conn.execute("SELECT value FROM meta WHERE key = 'latest'").fetchone()
+        if row:
+            title, latest_url, published = json.loads(row[0])
+            if latest_url == url:
+                return title, published
+        return None, None
+
+    # --- Lectura ---
+    def latest_listing(self):
+        """(título, url, fecha) del último parche visto, o None si el archivo está vacío."""
+        with self._lock:
+            row = self._connection().execute("SELECT value FROM meta WHERE key = 'latest'").fetchone()
+        return tuple(json.loads(row[0])) if row else None
+
+    def load_model(self, url):
+        """Devuelve (modelo, segundos desde que se archivó por primera vez, segundos desde la última actualización)."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT model, first_archived, updated FROM patches WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        return unpack_model(row[0]), now - row[1], now - row[2]
+
+    def iter_models(self):
+        """Todos los modelos archivados, del más viejo al más nuevo (para reconstruir índices en memoria)."""
+        with self._lock:
+            rows = self._connection().execute("SELECT model FROM patches ORDER BY sort_key").fetchall()
+        for (blob,) in rows:
+            yield unpack_model(blob)
+
+    def versions(self):
+        """Parches archivados, del más nuevo al más viejo: [(versión, título, url)]."""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT version, title, url FROM patches ORDER BY sort_key DESC, published DESC").fetchall()
+
+    def champion_history(self, champion_name, limit=5):
+        """
+        Cambios a un campeón en los últimos `limit` parches que lo tocaron: [(versión, título, datos)].
+        `champion_name` puede ser el de champions.txt o el del artículo: ambos dan la misma clave.
+        """
+        key = champion_index.normalize_name(champion_name)
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT p.version, p.title, c.details FROM champion_changes c JOIN patches p ON p.url = c.url "
+                "WHERE c.champion = ? ORDER BY p.sort_key DESC LIMIT ?", (key, limit)).fetchall()
+        return [(version, title, json.loads(details)) for version, title, details in rows]
+
+    def section_history(self, section_id, name, limit=5):
+        """
+        Parches que cambiaron un objeto o runa: [(versión, título, bloque)]. Primero busca el nombre
+        exacto (sin acentos ni signos) y, si no aparece, cualquier nombre que lo contenga.
+        """
+        key = champion_index.normalize_name(name)
+        if not key:
+            return []
+        query = ("SELECT p.version, p.title, s.block FROM section_changes s JOIN patches p ON p.url = s.url "
+                 "WHERE s.section_id = ? AND s.key {} ? ORDER BY p.sort_key DESC LIMIT ?")
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(query.format("="), (section_id, key, limit)).fetchall()
+            if not rows:
+                rows = conn.execute(query.format("LIKE"), (section_id, f"%{key}%", limit)).fetchall()
+        return [(version, title, json.loads(block)) for version, title, block in rows]
+
+    def __len__(self):
+        """Parches guardados, sin consultar SQLite (se puede leer desde el event loop, p. ej. en /metrics)."""
+        if self._count is None:
+            with self._lock:
+                self._connection()
+        return self._count
+
+
+if __name__ == "__main__":
+    import patch_cache
+    if len(sys.argv) < 3 or sys.argv[1] != "importar":
+        print("Uso: python patch_archive.py importar <notas.html> [...]")
+        sys.exit(1)
+    archive = PatchArchive(patch_cache.PATCH_ARCHIVE_PATH)
+    for path in sys.argv[2:]:
+        with open(path, 'rb') as f:
+            model = patch_parser.parse_patch_article(f.read(), path)
+        archive.save_model(model)
+        print(f"{path}: versión {patch_version(path)[0]}, {len(model.champions)} campeones")
+    archive.close()
@@ -0,0 +1,266 @@
+# patch_cache.py
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import http_client
+import i18n
+import metrics
+import patch_archive
+import patch_diff
+import patch_parser
+import patch_search
+import shared_cache
+import singleflight
+
+# --- Configuración de la Caché ---
+PATCH_CACHE_TTL = int(os.getenv('PATCH_CACHE_TTL', 6 * 60 * 60))  # segundos
+PATCH_CACHE_SIZE = int(os.getenv('PATCH_CACHE_SIZE', 4))           # artículos en memoria
+# Archivo local de parches. Una copia archivada se usa tal cual al arrancar; solo los parches
+# recientes (Riot a veces corrige las notas los primeros días) se vuelven a descargar cuando
+# su copia tiene más de PATCH_CACHE_TTL, y si no hay red se sigue usando la copia.
+PATCH_ARCHIVE_PATH = os.getenv('PATCH_ARCHIVE_PATH', "patch_archive.sqlite3")
+PATCH_ARCHIVE_SETTLE_DAYS = float(os.getenv('PATCH_ARCHIVE_SETTLE_DAYS', 3))
+# Secciones que trae un artículo normal de notas de parche; si falta alguna, el calentamiento avisa.
+EXPECTED_SECTIONS = ("patch-champions", "patch-items", "patch-runes")
+
+
+class TTLCache:
+    """Caché LRU con tamaño máximo y expiración por tiempo para cada entrada."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        entry = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self):
+        self._data.clear()
+
+    def values(self):
+        return [value for _, value in self._data.values()]
+
+    def __contains__(self, key):
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# --- Cachés Compartidas ---
+PATCH_MODELS = TTLCache(maxsize=PATCH_CACHE_SIZE, ttl=PATCH_CACHE_TTL)
+ARCHIVE = patch_archive.PatchArchive(PATCH_ARCHIVE_PATH)
+SEARCH_INDEX = patch_search.SearchIndex()
+PATCH_DIFFS = TTLCache(maxsize=PATCH_CACHE_SIZE, ttl=PATCH_CACHE_TTL)
+# Los artículos de otros idiomas (ver i18n.py) tienen sus propias cachés en memoria, para que los
+# servidores en inglés no saquen de la caché el parche en español y al revés. El archivo local y
+# el índice de p!buscar (con raíces del español) son solo del idioma por defecto.
+_LANGUAGE_CACHES = {i18n.DEFAULT_LANGUAGE: (PATCH_MODELS, PATCH_DIFFS)}
+_latest_patch_urls = {}   # idioma -> URL del último parche
+# Varios comandos pidiendo el mismo artículo a la vez comparten una sola descarga y extracción.
+MODEL_BUILDS = singleflight.SingleFlight("patch_model")
+
+
+def language_caches(patch_url):
+    """(modelos, diffs) del idioma del artículo."""
+    language = i18n.language_for_url(patch_url)
+    caches = _LANGUAGE_CACHES.get(language)
+    if caches is None:
+        caches = _LANGUAGE_CACHES[language] = (TTLCache(maxsize=PATCH_CACHE_SIZE, ttl=PATCH_CACHE_TTL),
+                                               TTLCache(maxsize=PATCH_CACHE_SIZE, ttl=PATCH_CACHE_TTL))
+    return caches
+
+
+def is_archived_language(patch_url):
+    return i18n.language_for_url(patch_url) == i18n.DEFAULT_LANGUAGE
+
+
+async def get_patch_model(patch_url):
+    """Devuelve el modelo del parche desde la caché, descargándolo y extrayéndolo solo si falta."""
+    model = language_caches(patch_url)[0].get(patch_url)
+    metrics.CACHE_LOOKUPS.inc(cache="patch_models", result="miss" if model is None else "hit")
+    if model is None:
+        model = await MODEL_BUILDS.do(patch_url, lambda: _build_patch_model(patch_url))
+    return model
+
+
+async def get_patch_diff(patch_url):
+    """Buffs y nerfs del parche (patch_diff.PatchDiff), calculados una vez por modelo."""
+    model = await get_patch_model(patch_url)
+    diffs = language_caches(patch_url)[1]
+    cached = diffs.get(patch_url)
+    if cached is None or cached[0] is not model:
+        with metrics.STAGE_SECONDS.time(stage="diff"):
+            cached = (model, patch_diff.diff_model(model))
+        diffs.set(patch_url, cached)
+    return cached[1]
+
+
+async def _build_patch_model(patch_url):
+    models = language_caches(patch_url)[0]
+    archived = await _load_archived(patch_url) if is_archived_language(patch_url) else None
+    metrics.CACHE_LOOKUPS.inc(cache="patch_archive", result="miss" if archived is None else "hit")
+    if archived is not None:
+        model, age, since_update = archived
+        if age > PATCH_ARCHIVE_SETTLE_DAYS * 86400 or since_update < PATCH_CACHE_TTL:
+            models.set(patch_url, model)
+            return model
+
+    try:
+        model = await _fetch_patch_model(patch_url)
+    except Exception as e:
+        if archived is None:
+            raise
+        metrics.record_error("patch_refresh", e)
+        print(f"No se pudo actualizar {patch_url} ({e}); se usa la copia archivada.")
+        model = archived[0]
+    else:
+        # Una página sin secciones (artículo a medio publicar) no se archiva.
+        if model.sections and is_archived_language(patch_url):
+            try:
+                await asyncio.to_thread(ARCHIVE.save_model, model)
+            except Exception as e:
+                metrics.record_error("patch_archive", e)
+                print(f"Error al archivar {patch_url}: {e}")
+            index_model(model)
+    models.set(patch_url, model)
+    return model
+
+
+async def _download_patch_model(patch_url):
+    content = await http_client.fetch(patch_url)
+    return await asyncio.to_thread(patch_parser.parse_patch_article, content, patch_url)
+
+
+async def _fetch_patch_model(patch_url):
+    """
+    Descarga y extrae el artículo. Con caché compartida (SHARED_CACHE_URL) solo un proceso lo hace
+    y los demás leen su resultado; una página sin secciones no se comparte, para volver a intentarla.
+    """
+    if shared_cache.SHARED is None:
+        return await _download_patch_model(patch_url)
+    return await shared_cache.SHARED.fetch(
+        f"patch_model:{patch_url}", lambda: _download_patch_model(patch_url), ttl=PATCH_CACHE_TTL,
+        encode=patch_archive.pack_model, decode=patch_archive.unpack_model, keep=lambda model: bool(model.sections))
+
+
+async def _load_archived(patch_url):
+    try:
+        return await asyncio.to_thread(ARCHIVE.load_model, patch_url)
+    except Exception as e:
+        metrics.record_error("patch_archive", e)
+        print(f"Error al leer el archivo de parches: {e}")
+        return None
+
+
+def index_model(model):
+    """Agrega (o reemplaza) un parche en el índice de búsqueda sin tocar los demás."""
+    SEARCH_INDEX.add_model(model, patch_archive.patch_version(model.url)[0])
+
+
+def _index_archive():
+    index = patch_search.SearchIndex()
+    for model in ARCHIVE.iter_models():
+        index.add_model(model, patch_archive.patch_version(model.url)[0])
+    return index
+
+
+async def build_search_index():
+    """
+    Construye el índice de búsqueda con todo el archivo local en un hilo y lo activa de una vez
+    (se llama al arrancar). Los parches descargados mientras tanto se vuelven a agregar.
+    Devuelve el número de líneas indexadas.
+    """
+    global SEARCH_INDEX
+    index = await asyncio.to_thread(_index_archive)
+    for model in PATCH_MODELS.values():
+        index.add_model(model, patch_archive.patch_version(model.url)[0])
+    SEARCH_INDEX = index
+    return len(index)
+
+
+def remember_latest(patch_url):
+    """Registra la URL del último parche (por idioma) e invalida el artículo anterior si cambió."""
+    language = i18n.language_for_url(patch_url)
+    previous = _latest_patch_urls.get(language)
+    if previous and patch_url != previous:
+        language_caches(previous)[0].pop(previous)
+    _latest_patch_urls[language] = patch_url
+
+
+# --- Calentamiento ---
+@dataclass
+class WarmupReport:
+    """Resultado de preparar un parche antes de que lo pidan los comandos."""
+    url: str
+    elapsed_ms: float = 0.0
+    was_cached: bool = False
+    champions: int = 0
+    items: int = 0
+    runes: int = 0
+    missing: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.missing
+
+    def summary(self):
+        state = "ya estaba en caché" if self.was_cached else f"listo en {self.elapsed_ms:.0f} ms"
+        text = f"{self.champions} campeones, {self.items} objetos, {self.runes} runas ({state})"
+        if self.missing:
+            text += f". Falta: {', '.join(self.missing)}"
+        return text
+
+
+async def prewarm(patch_url):
+    """
+    Descarga y extrae el artículo una sola vez para que el primer comando ya lo encuentre en caché,
+    y revisa que traiga las secciones esperadas. Si la página no tiene ninguna sección (todavía no
+    está publicada por completo), se saca de la caché para volver a intentarlo en la siguiente revisión.
+    """
+    models = language_caches(patch_url)[0]
+    report = WarmupReport(patch_url, was_cached=patch_url in models)
+    start = time.perf_counter()
+    model = await get_patch_model(patch_url)
+    await get_patch_diff(patch_url)
+    report.elapsed_ms = (time.perf_counter() - start) * 1000
+
+    report.champions = len(model.champion_list)
+    report.items = len(model.items)
+    report.runes = len(model.runes)
+    report.missing = [section_id for section_id in EXPECTED_SECTIONS if section_id not in model.sections]
+    if not model.summary_image:
+        report.missing.append("imagen de resumen")
+    report.missing += [name for name in model.champion_list if model.champion_details(name) is None]
+
+    if not model.sections:
+        models.pop(patch_url)
+    return report
@@ -0,0 +1,194 @@
+# patch_diff.py
+# Convierte las líneas de cambio ("**Daño base:** 60/85/110 ⇒ 70/95/120") en valores antes/después
+# y decide si cada cambio es una mejora (buff) o un empeoramiento (nerf), por línea, por campeón
+# u objeto, y por parche.
+
+import re
+from collections import namedtuple
+from dataclasses import dataclass, field
+from functools import lru_cache
+from patch_search import fold
+
+# Estadísticas en las que un número MÁS BAJO es mejor (sin acentos, en minúsculas), en cada
+# idioma de i18n.py: las notas en inglés, portugués o francés usan otras palabras.
+LOWER_IS_BETTER = (
+    "enfriamiento", "costo", "coste", "precio", "tiempo de lanzamiento", "tiempo de canalizacion",
+    "tiempo de reaparicion", "tiempo de carga", "dano recibido", "retraso",
+    "cooldown", "cost", "cast time", "channel time", "respawn", "damage taken", "delay",
+    "tempo de recarga", "custo", "tempo de conjuracao", "dano sofrido", "atraso",
+    "delai de recuperation", "cout", "temps d'incantation", "degats subis", "delai",
+)
+
+BUFF = "buff"
+NERF = "nerf"
+ADJUSTMENT = "ajuste"      # mixto, sin cambio neto o sin dirección clara
+NEW = "nuevo"              # no había valor antes
+REMOVED = "eliminado"      # ya no hay valor después
+
+# --- Expresiones precompiladas (se usan para todas las líneas de un parche) ---
+_LINE = re.compile(r"^[\s•\-]*(?:\*\*(?P<bold>[^*]+)\*\*|(?P<plain>[^:⇒]+):)\s*(?P<rest>.*)$")
+_ARROW = re.compile(r"\s*⇒\s*")
+# Una lista de valores por rango: "26/31/36", "75%", "1,5 / 2 / 2,5".
+_VALUES = re.compile(r"-?\d+(?:[.,]\d+)?%?(?:\s*/\s*-?\d+(?:[.,]\d+)?%?)*")
+_SPACES = re.compile(r"\s+")
+
+# Un grupo de valores con su unidad: ((26.0, 31.0, 36.0), "% del poder de habilidad").
+ValueGroup = namedtuple('ValueGroup', ['values', 'unit'])
+LineChange = namedtuple('LineChange', ['stat', 'before', 'after', 'direction', 'delta'])
+
+
+def parse_values(side):
+    """
+    "75% del poder de habilidad" -> [ValueGroup((75.0,), "% del poder de habilidad")].
+    Cada lista de números de un lado de la flecha es un grupo; la unidad es el texto que le sigue.
+    """
+    groups = []
+    matches = list(_VALUES.finditer(side))
+    for index, match in enumerate(matches):
+        raw = match.group()
+        values = tuple(float(value.strip().rstrip('%').replace(',', '.')) for value in raw.split('/'))
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(side)
+        unit = ("%" if raw.endswith('%') else "") + side[match.end():end]
+        groups.append(ValueGroup(values, _SPACES.sub(" ", unit).strip(" ()+,")))
+    return groups
+
+
+def _mean(values):
+    return sum(values) / len(values)
+
+
+def _compare(before, after, lower_is_better):
+    """Dirección y cambio relativo (promedio de todos los rangos) entre dos grupos de valores."""
+    if len(before.values) != len(after.values):
+        # "10 ⇒ 10/20/30": se compara contra el valor único repetido en cada rango.
+        if len(before.values) == 1:
+            before = ValueGroup(before.values * len(after.values), before.unit)
+        elif len(after.values) == 1:
+            after = ValueGroup(after.values * len(before.values), after.unit)
+        else:
+            return ADJUSTMENT, None
+    differences = [new - old for old, new in zip(before.values, after.values)]
+    if all(difference == 0 for difference in differences):
+        return ADJUSTMENT, 0.0
+    rising = all(difference >= 0 for difference in differences)
+    falling = all(difference <= 0 for difference in differences)
+    old_mean = _mean(before.values)
+    delta = (_mean(after.values) - old_mean) / abs(old_mean) if old_mean else None
+    if not rising and not falling:
+        return ADJUSTMENT, delta
+    improved = falling if lower_is_better else rising
+    return (BUFF if improved else NERF), delta
+
+
+@lru_cache(maxsize=8192)
+def parse_change_line(line):
+    """
+    Convierte una línea de cambio en LineChange(stat, before, after, direction, delta), o None
+    si la línea no tiene "⇒" (cambios solo de texto). `delta` es el cambio relativo promedio.
+    Las líneas se repiten mucho entre parches, así que el resultado se memoriza.
+    """
+    match = _LINE.match(line)
+    if not match:
+        return None
+    stat = (match.group('bold') or match.group('plain')).strip().rstrip(':').strip()
+    rest = match.group('rest')
+    if '⇒' not in rest:
+        return None
+    before_text, after_text = _ARROW.split(rest, maxsplit=1)
+    before, after = parse_values(before_text), parse_values(after_text)
+
+    if not before and not after:
+        return LineChange(stat, (), (), ADJUSTMENT, None)
+    if not before:
+        return LineChange(stat, (), tuple(after), NEW, None)
+    if not after:
+        return LineChange(stat, tuple(before), (), REMOVED, None)
+
+    lower_is_better = any(keyword in fold(stat) for keyword in LOWER_IS_BETTER)
+    # La dirección la decide el primer grupo que cambió (el valor base antes que las relaciones).
+    direction, delta = ADJUSTMENT, 0.0
+    for old, new in zip(before, after):
+        direction, delta = _compare(old, new, lower_is_better)
+        if direction != ADJUSTMENT or delta != 0.0:
+            break
+    return LineChange(stat, tuple(before), tuple(after), direction, delta)
+
+
+def diff_lines(lines):
+    """Procesa todas las líneas de un parche de una vez (cada línea distinta se parsea una sola vez)."""
+    return [parse_change_line(line) for line in lines]
+
+
+def verdict(changes):
+    """Veredicto para un conjunto de cambios: gana la dirección con más líneas; empate = ajuste."""
+    buffs = sum(1 for change in changes if change.direction == BUFF)
+    nerfs = sum(1 for change in changes if change.direction == NERF)
+    if buffs > nerfs:
+        return BUFF
+    if nerfs > buffs:
+        return NERF
+    return ADJUSTMENT
+
+
+@dataclass
+class EntityDiff:
+    """Cambios numéricos de un campeón, objeto o runa en un parche."""
+    name: str
+    kind: str
+    changes: list = field(default_factory=list)
+    text_only: int = 0        # líneas sin valores antes/después
+
+    @property
+    def buffs(self):
+        return sum(1 for change in self.changes if change.direction == BUFF)
+
+    @property
+    def nerfs(self):
+        return sum(1 for change in self.changes if change.direction == NERF)
+
+    @property
+    def verdict(self):
+        return verdict(self.changes)
+
+
+@dataclass
+class PatchDiff:
+    """Resumen de un parche: un EntityDiff por campeón, objeto y runa, en el orden del artículo."""
+    url: str
+    entities: list = field(default_factory=list)
+
+    def by_verdict(self, wanted, kind=None):
+        return [entity for entity in self.entities if entity.verdict == wanted and (kind is None or entity.kind == kind)]
+
+    def get(self, name):
+        for entity in self.entities:
+            if entity.name.lower() == name.lower():
+                return entity
+        return None
+
+    def totals(self):
+        counts = {BUFF: 0, NERF: 0, ADJUSTMENT: 0}
+        for entity in self.entities:
+            counts[entity.verdict] += 1
+        return counts
+
+
+def diff_model(model):
+    """Construye el PatchDiff de un PatchModel procesando todas sus líneas en un solo lote."""
+    owners = []
+    lines = []
+    for data in model.champions.values():
+        owners.append(EntityDiff(data['name'], "campeón"))
+        for block in data.get('change_blocks', []):
+            lines.extend((len(owners) - 1, line) for line in block['changes'])
+    for section_id, kind in (("patch-items", "objeto"), ("patch-runes", "runa")):
+        for block in model.section_details(section_id):
+            owners.append(EntityDiff(block['title'], kind))
+            lines.extend((len(owners) - 1, line) for line in block['changes'])
+
+    for (owner, _), change in zip(lines, diff_lines([line for _, line in lines])):
+        if change is None:
+            owners[owner].text_only += 1
+        else:
+            owners[owner].changes.append(change)
+    return PatchDiff(model.url, owners)
@@ -0,0 +1,380 @@
+# patch_parser.py
+
+import importlib.util
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import cached_property
+from typing import Optional
+from urllib.parse import urljoin
+import champion_index
+import metrics
+
+# lxml es opcional: si no está instalado usamos el parser de la biblioteca estándar.
+# Solo se busca (sin importarlo): bs4 y lxml se cargan la primera vez que se parsea una página.
+LXML_AVAILABLE = importlib.util.find_spec("lxml") is not None
+
+# --- Configuración del Parser ---
+# HTML_PARSER: "auto" (lxml si está disponible), "lxml" o "html.parser".
+# HTML_PARSER_RESTRICT: si es "1", solo se construye el contenedor de las notas del artículo.
+HTML_PARSER = os.getenv('HTML_PARSER', 'auto')
+HTML_PARSER_RESTRICT = os.getenv('HTML_PARSER_RESTRICT', '1') == '1'
+PARSER_BACKENDS = ("lxml", "html.parser")
+
+# Todo lo que extraemos de un artículo vive dentro de este contenedor.
+ARTICLE_CONTAINER_ID = "patch-notes-container"
+ARTICLE_STRAINER = None
+# De la lista de parches solo nos interesan los enlaces (con su título y fecha dentro).
+PATCH_LIST_STRAINER = None
+
+# Clases de bs4; las llena load_bs4() (arrancar el bot no necesita bs4, que tarda en importarse).
+BeautifulSoup = NavigableString = SoupStrainer = None
+
+_lxml_warning_shown = False
+
+
+def load_bs4():
+    """Importa bs4 la primera vez que hace falta y prepara los filtros de parseo."""
+    global BeautifulSoup, NavigableString, SoupStrainer, ARTICLE_STRAINER, PATCH_LIST_STRAINER
+    if BeautifulSoup is None:
+        import bs4
+        NavigableString, SoupStrainer = bs4.NavigableString, bs4.SoupStrainer
+        ARTICLE_STRAINER = SoupStrainer(id=ARTICLE_CONTAINER_ID)
+        PATCH_LIST_STRAINER = SoupStrainer('a')
+        BeautifulSoup = bs4.BeautifulSoup   # al final: las demás ya están listas si otro hilo lo ve
+
+
+def resolve_backend(backend=None):
+    """Traduce el backend pedido (o el de HTML_PARSER) a uno que realmente esté instalado."""
+    global _lxml_warning_shown
+    backend = backend or HTML_PARSER
+    if backend == 'auto':
+        return 'lxml' if LXML_AVAILABLE else 'html.parser'
+    if backend == 'lxml' and not LXML_AVAILABLE:
+        if not _lxml_warning_shown:
+            print("Advertencia: lxml no está instalado, se usará html.parser.")
+            _lxml_warning_shown = True
+        return 'html.parser'
+    return backend
+
+
+def make_soup(content, backend=None, parse_only=None):
+    """Construye el árbol de BeautifulSoup de una página descargada, con html.parser como respaldo."""
+    load_bs4()
+    resolved = resolve_backend(backend)
+    try:
+        return BeautifulSoup(content, resolved, parse_only=parse_only)
+    except Exception as e:
+        if resolved == 'html.parser':
+            raise
+        print(f"Advertencia: el parser {resolved} falló ({e}), se usará html.parser.")
+        return BeautifulSoup(content, 'html.parser', parse_only=parse_only)
+
+
+def parse_patch_list(content, base_url, backend=None):
+    """Parsea la página con la lista de parches y devuelve (título, url, fecha) del más reciente."""
+    load_bs4()
+    with metrics.STAGE_SECONDS.time(stage="list"):
+        soup = make_soup(content, backend, parse_only=PATCH_LIST_STRAINER)
+        return extract_latest_patch_info(soup, base_url)
+
+
+def parse_patch_article(content, url="", backend=None, restrict=None):
+    """
+    Parsea un artículo descargado y devuelve su PatchModel (el árbol se descarta al terminar).
+    Con restrict solo se construye el contenedor de las notas; si la página no lo tiene,
+    se vuelve a parsear completa.
+    """
+    restrict = HTML_PARSER_RESTRICT if restrict is None else restrict
+    load_bs4()
+    with metrics.STAGE_SECONDS.time(stage="parse"):
+        soup = make_soup(content, backend, parse_only=ARTICLE_STRAINER) if restrict else None
+        if soup is None or not soup.find(id=ARTICLE_CONTAINER_ID):
+            soup = make_soup(content, backend)
+    with metrics.STAGE_SECONDS.time(stage="extract"):
+        return build_patch_model(soup, url)
+
+# --- Página con la lista de parches ---
+def extract_latest_patch_info(soup, base_url):
+    """Devuelve (título, url, fecha) del artículo de parche más reciente de la lista."""
+    latest_article_link = soup.find('a', href=lambda href: href and '/news/game-updates/patch-' in href)
+    if not latest_article_link:
+        return None, None, None
+
+    title_element = latest_article_link.find('div', attrs={'data-testid': 'card-title'})
+    patch_title = title_element.text.strip() if title_element else "Título no encontrado"
+    patch_date = ""
+    date_element = latest_article_link.find('time')
+    if date_element and date_element.has_attr('datetime'):
+        timestamp_str = date_element['datetime']
+        date_obj = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+        patch_date = date_obj.strftime('%d/%m/%Y')
+    patch_url_partial = latest_article_link['href']
+    patch_url_full = urljoin(base_url, patch_url_partial)
+    return patch_title, patch_url_full, patch_date
+
+# --- Artículo de notas del parche: extractores por comando ---
+# Cada uno recorre el documento por su cuenta. Ya no se usan en los comandos, pero se conservan
+# como referencia para comparar resultados y tiempos con build_patch_model (ver benchmark.py).
+def extract_summary_image(soup):
+    summary_link = soup.find('a', class_='cboxElement')
+    if summary_link:
+        image_tag = summary_link.find('img')
+        if image_tag and image_tag.has_attr('src'):
+            return image_tag['src']
+    return None
+
+def extract_champion_list(soup):
+    champion_links = soup.find_all('a', href=lambda href: href and '/champions/' in href)
+    champion_names = []
+    for link in champion_links:
+        name = link.text.strip()
+        if name and name not in champion_names:
+            champion_names.append(name)
+    return champion_names
+
+def format_change_li(li_element):
+    parts = []
+    for content in li_element.contents:
+        if content.name == 'strong':
+            parts.append(f"**{content.get_text(strip=True)}**")
+        elif isinstance(content, NavigableString):
+            text = str(content).replace('⇒', ' ⇒ ')
+            parts.append(text.strip())
+    return ' '.join(filter(None, parts))
+
+def extract_champion_details(soup, champion_name):
+    """Extrae TODOS los bloques de cambios de un campeón (habilidades, estadísticas, etc.)."""
+    normalized_name = champion_name.lower().replace(' ', '').replace('.', '').replace("'", "")
+    target_id = f"patch-{normalized_name}"
+
+    champion_header = soup.find('h3', id=target_id)
+    if not champion_header: return None
+
+    champion_data = { "name": champion_name.title(), "portrait_url": None, "summary": "", "change_blocks": [] }
+
+    portrait_link = champion_header.find_previous('a', class_='reference-link')
+    if portrait_link and portrait_link.find('img'):
+        champion_data['portrait_url'] = portrait_link.find('img')['src']
+
+    summary_tag = champion_header.find_next_sibling('blockquote')
+    if summary_tag:
+        champion_data['summary'] = summary_tag.get_text(strip=True)
+
+    all_siblings = champion_header.find_next_siblings()
+    change_headers = []
+    for sibling in all_siblings:
+        if sibling.name == 'h3':
+            break
+        if sibling.name == 'h4' and 'change-detail-title' in sibling.get('class', []):
+            change_headers.append(sibling)
+
+    for header in change_headers:
+        icon_tag = header.find('img')
+        icon_url = icon_tag['src'] if icon_tag else None
+
+        changes_list_tag = header.find_next_sibling('ul')
+        changes = []
+        if changes_list_tag:
+            changes = [f"• {format_change_li(li)}" for li in changes_list_tag.find_all('li')]
+
+        current_block = {
+            "title": header.get_text(strip=True),
+            "icon_url": icon_url,
+            "changes": changes
+        }
+        champion_data['change_blocks'].append(current_block)
+
+    return champion_data
+
+def extract_section_details(soup, section_id, header_tag='h2'):
+    """
+    Extrae una lista de todos los bloques de cambio (para objetos o runas)
+    dentro de una sección.
+    """
+    # 1. Encontramos el encabezado principal (ej. <h2 id="patch-items">)
+    main_header = soup.find(header_tag, id=section_id)
+    if not main_header:
+        return [] # Devolvemos una lista vacía si la sección no existe
+
+    # 2. Determinamos el "padre" desde donde iterar
+    iterate_from = main_header
+    if main_header.parent.name == 'header':
+        iterate_from = main_header.parent
+
+    change_blocks_data = []
+
+    # 3. Iteramos sobre los "hermanos" del encabezado
+    for sibling in iterate_from.find_next_siblings():
+        # 4. Condición de parada (si encontramos el siguiente encabezado principal)
+        if (sibling.name == header_tag) or (sibling.name == 'header' and sibling.find(header_tag)):
+            break
+
+        # 5. Encontramos todos los sub-bloques de cambio (ej. cada item)
+        # Buscamos por la misma estructura que 'p!ver' (h3, h4, etc.)
+        item_headers = sibling.find_all(['h3', 'h4'], class_='change-title')
+
+        for item_header in item_headers:
+            item_data = { "title": item_header.get_text(strip=True), "icon_url": None, "summary": "", "changes": [] }
+
+            # Buscar el ícono (igual que en campeones)
+            icon_link = item_header.find_previous('a', class_='reference-link')
+            if icon_link and icon_link.find('img'):
+                item_data['icon_url'] = icon_link.find('img')['src']
+
+            # Buscar el resumen (blockquote) y la lista (ul)
+            current_element = item_header
+            while hasattr(current_element, 'next_sibling') and current_element.next_sibling:
+                current_element = current_element.next_sibling
+                if current_element.name == 'h3' or current_element.name == 'h4': # Parar si encontramos el siguiente item
+                    break
+                if current_element.name == 'blockquote':
+                    item_data['summary'] = current_element.get_text(strip=True)
+                if current_element.name == 'ul':
+                    item_data['changes'] = [f"• {format_change_li(li)}" for li in current_element.find_all('li')]
+                    # A diferencia de !ver, a veces el resumen viene DESPUÉS de la lista
+                    # así que no rompemos el bucle aquí.
+
+            change_blocks_data.append(item_data)
+
+    return change_blocks_data
+
+# --- Artículo de notas del parche: modelo completo en una sola pasada ---
+# Un bloque de cambios es un dict {"title", "icon_url", "changes"} (y "summary" en objetos/runas),
+# igual que lo devolvían los extractores por comando, para que los manejadores no cambien.
+@dataclass
+class PatchModel:
+    """Todo lo que los comandos necesitan de un artículo de notas de parche."""
+    url: str
+    summary_image: Optional[str] = None
+    champion_list: list = field(default_factory=list)
+    champions: dict = field(default_factory=dict)   # id del ancla ("patch-ahri") -> datos del campeón
+    sections: dict = field(default_factory=dict)    # id de la sección ("patch-items") -> bloques
+
+    @cached_property
+    def champion_anchors(self):
+        """
+        Clave normalizada del nombre de cada encabezado de campeón -> su ancla en el artículo
+        ("Nunu y Willump" -> "nunuwillump" -> "patch-nunuywillump"). Se calcula una vez por modelo.
+        """
+        return {champion_index.normalize_name(data['name']): anchor for anchor, data in self.champions.items()}
+
+    def champion_details(self, champion_name, key=None):
+        """
+        Busca un campeón por nombre en O(1). Devuelve None si no tiene cambios en el parche.
+        Con `key` (ChampionEntry.key, ya normalizada por el índice de campeones) no se recalcula.
+        """
+        anchor = self.champion_anchors.get(key or champion_index.normalize_name(champion_name))
+        if anchor is None:
+            return None
+        return dict(self.champions[anchor], name=champion_name.title())
+
+    def section_details(self, section_id):
+        return self.sections.get(section_id, [])
+
+    @property
+    def items(self):
+        return self.section_details("patch-items")
+
+    @property
+    def runes(self):
+        return self.section_details("patch-runes")
+
+
+def _has_class(tag, class_name):
+    return class_name in (tag.get('class') or ())
+
+
+def _first_img_src(tag):
+    image_tag = tag.find('img')
+    return image_tag.get('src') if image_tag else None
+
+
+def build_patch_model(soup, url=""):
+    """
+    Recorre el artículo UNA sola vez en orden de documento y construye el PatchModel completo:
+    imagen de resumen, lista de campeones, bloques de cambio por campeón y bloques por sección.
+    """
+    model = PatchModel(url=url)
+    seen_champion_names = set()
+    summary_link_seen = False
+    reference_icon = None   # ícono del último <a class="reference-link"> visto
+
+    section_id = None       # sección <h2 id="..."> en la que estamos
+    section_blocks = None
+
+    champion_data = None    # campeón abierto y el contenedor de sus hermanos
+    champion_parent = None
+    pending_blocks = []     # bloques que todavía esperan su <ul>
+
+    item_data = None        # objeto/runa abierto y el contenedor de sus hermanos
+    item_parent = None
+
+    for tag in soup.find_all(True):
+        name = tag.name
+        parent = tag.parent
+
+        # Enlaces: imagen de resumen, lista de campeones e íconos de referencia.
+        if name == 'a':
+            classes = tag.get('class') or ()
+            if 'cboxElement' in classes and not summary_link_seen:
+                summary_link_seen = True
+                model.summary_image = _first_img_src(tag)
+            if 'reference-link' in classes:
+                reference_icon = _first_img_src(tag)
+            href = tag.get('href')
+            if href and '/champions/' in href:
+                champion_name = tag.text.strip()
+                if champion_name and champion_name not in seen_champion_names:
+                    seen_champion_names.add(champion_name)
+                    model.champion_list.append(champion_name)
+            continue
+
+        # Un <h2 id> abre una sección nueva y cierra la anterior.
+        if name == 'h2':
+            item_data = item_parent = None
+            section_id = tag.get('id')
+            section_blocks = model.sections.setdefault(section_id, []) if section_id else None
+            continue
+
+        # Hermanos del encabezado de un campeón.
+        if champion_data is not None and parent is champion_parent:
+            if name == 'h3':
+                champion_data = champion_parent = None
+            elif name == 'blockquote' and not champion_data['summary']:
+                champion_data['summary'] = tag.get_text(strip=True)
+            elif name == 'h4' and _has_class(tag, 'change-detail-title'):
+                block = {"title": tag.get_text(strip=True), "icon_url": _first_img_src(tag), "changes": []}
+                champion_data['change_blocks'].append(block)
+                pending_blocks.append(block)
+            elif name == 'ul' and pending_blocks:
+                changes = [f"• {format_change_li(li)}" for li in tag.find_all('li')]
+                for block in pending_blocks:
+                    block['changes'] = changes
+                pending_blocks = []
+
+        # Hermanos del encabezado de un objeto o runa.
+        if item_data is not None and parent is item_parent:
+            if name in ('h3', 'h4'):
+                item_data = item_parent = None
+            elif name == 'blockquote':
+                item_data['summary'] = tag.get_text(strip=True)
+            elif name == 'ul':
+                item_data['changes'] = [f"• {format_change_li(li)}" for li in tag.find_all('li')]
+
+        # Encabezado de campeón: <h3 id="patch-...">
+        if name == 'h3':
+            anchor = tag.get('id')
+            if anchor and anchor.startswith('patch-') and anchor not in model.champions:
+                champion_data = {"name": tag.get_text(strip=True), "portrait_url": reference_icon, "summary": "", "change_blocks": []}
+                champion_parent = parent
+                pending_blocks = []
+                model.champions[anchor] = champion_data
+
+        # Encabezado de objeto/runa dentro de una sección.
+        if section_blocks is not None and name in ('h3', 'h4') and _has_class(tag, 'change-title'):
+            item_data = {"title": tag.get_text(strip=True), "icon_url": reference_icon, "summary": "", "changes": []}
+            item_parent = parent
+            section_blocks.append(item_data)
+
+    return model
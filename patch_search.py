@@ -0,0 +1,168 @@
+# patch_search.py
+# Búsqueda de texto completo sobre las líneas de cambio de las notas de parche (campeones,
+# objetos y runas) con un índice invertido y ranking BM25.
+
+import math
+import re
+import unicodedata
+from collections import Counter, namedtuple
+
+# Parámetros de BM25 (los valores usuales).
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Palabras vacías del español (más unas cuantas que se repiten en todas las notas).
+STOPWORDS = {
+    "a", "al", "algo", "ante", "con", "contra", "cual", "cuando", "de", "del", "desde", "donde",
+    "durante", "e", "el", "ella", "ellos", "en", "entre", "era", "es", "esa", "ese", "eso", "esta",
+    "este", "esto", "fue", "ha", "han", "hasta", "hay", "la", "las", "le", "les", "lo", "los", "mas",
+    "me", "mi", "muy", "ni", "no", "o", "para", "pero", "por", "que", "quien", "se", "sea", "si",
+    "sin", "sobre", "son", "su", "sus", "tambien", "te", "tiene", "u", "un", "una", "uno", "unos",
+    "y", "ya", "cambio", "cambios", "cambiaron", "campeon", "campeones", "cuales",
+    "segundos", "nivel",
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_MARKDOWN = re.compile(r"[*_`•⇒]")
+
+# Un documento es una línea de cambio con su contexto.
+SearchDocument = namedtuple('SearchDocument', ['url', 'version', 'kind', 'entity', 'block', 'text'])
+SearchHit = namedtuple('SearchHit', ['score', 'document'])
+
+
+def fold(text):
+    """Minúsculas y sin acentos ("Curación" -> "curacion")."""
+    folded = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in folded if not unicodedata.combining(char))
+
+
+def stem(word):
+    """
+    Raíz ligera para español: quita plurales y la vocal final de género
+    ("curaciones" y "curación" -> "curacion"; "maná" -> "man"; "daños" -> "dan").
+    """
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith("es") and len(word) > 4 and word[-3] not in "aeiou":
+        word = word[:-2]
+    elif word.endswith("s") and len(word) > 4 and word[-2] in "aeiou":
+        word = word[:-1]
+    if word[-1] in "aeo" and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Texto -> lista de raíces sin palabras vacías."""
+    return [stem(token) for token in _TOKEN.findall(fold(_MARKDOWN.sub(" ", text))) if token not in STOPWORDS]
+
+
+class SearchIndex:
+    """
+    Índice invertido en memoria: término -> {id de documento: frecuencia}.
+    Los parches se agregan (o reemplazan) uno por uno, sin reconstruir el resto.
+    """
+
+    def __init__(self):
+        self.documents = {}       # id -> SearchDocument
+        self._lengths = {}        # id -> número de términos
+        self._postings = {}       # término -> {id: frecuencia}
+        self._by_url = {}         # url -> [ids]
+        self._by_version = {}     # versión -> {ids}
+        self._total_length = 0
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.documents)
+
+    def versions(self):
+        """Versiones con al menos un documento (vista de las claves, sin recorrer los documentos)."""
+        return self._by_version.keys()
+
+    def add_model(self, model, version):
+        """Indexa (o reindexa) todas las líneas de cambio de un parche."""
+        self.remove_url(model.url)
+        ids = self._by_url.setdefault(model.url, [])
+        for data in model.champions.values():
+            for block in data.get('change_blocks', []):
+                for line in block['changes']:
+                    ids.append(self._add(SearchDocument(model.url, version, "campeón", data['name'], block['title'], line)))
+        for section_id, kind in (("patch-items", "objeto"), ("patch-runes", "runa")):
+            for block in model.section_details(section_id):
+                for line in block['changes']:
+                    ids.append(self._add(SearchDocument(model.url, version, kind, block['title'], None, line)))
+        return len(ids)
+
+    def _add(self, document):
+        doc_id = self._next_id
+        self._next_id += 1
+        # El nombre y el bloque también cuentan ("ahri", "habilidad q"), además de la línea.
+        terms = tokenize(" ".join(filter(None, (document.entity, document.block, document.text))))
+        for term, frequency in Counter(terms).items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+        self.documents[doc_id] = document
+        self._by_version.setdefault(document.version, set()).add(doc_id)
+        self._lengths[doc_id] = len(terms)
+        self._total_length += len(terms)
+        return doc_id
+
+    def remove_url(self, url):
+        ids = self._by_url.pop(url, None)
+        if not ids:
+            return
+        removed = set(ids)
+        for term in {term for doc_id in ids for term in tokenize(self._document_text(doc_id))}:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            for doc_id in removed.intersection(postings):
+                del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        for doc_id in ids:
+            self._total_length -= self._lengths.pop(doc_id)
+            version = self.documents.pop(doc_id).version
+            version_ids = self._by_version[version]
+            version_ids.discard(doc_id)
+            if not version_ids:
+                del self._by_version[version]
+
+    def _document_text(self, doc_id):
+        document = self.documents[doc_id]
+        return " ".join(filter(None, (document.entity, document.block, document.text)))
+
+    def search(self, query, limit=10, version=None):
+        """
+        Devuelve los SearchHit mejor calificados (BM25). Si hay varias líneas del mismo bloque
+        en el mismo parche, solo se devuelve la mejor. Con `version` solo se busca en ese parche.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.documents:
+            return []
+        total = len(self.documents)
+        average_length = self._total_length / total
+        scores = Counter()
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                length_norm = 1 - BM25_B + BM25_B * self._lengths[doc_id] / average_length
+                scores[doc_id] += idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+
+        hits = []
+        seen = set()
+        # A igual puntuación, primero los parches más nuevos.
+        for doc_id, score in sorted(scores.items(), key=lambda item: (-item[1], -item[0])):
+            document = self.documents[doc_id]
+            if version is not None and document.version != version:
+                continue
+            group = (document.url, document.entity, document.block)
+            if group in seen:
+                continue
+            seen.add(group)
+            hits.append(SearchHit(score, document))
+            if len(hits) >= limit:
+                break
+        return hits
@@ -0,0 +1,96 @@
+# patch_watcher.py
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+import http_client
+import patch_cache
+import patch_parser
+import shared_cache
+import singleflight
+
+# Tiempo durante el cual los comandos reutilizan el último resultado sin consultar la página.
+# Coincide con la revisión de 30 minutos de patch_page_check, que siempre fuerza la consulta.
+PATCH_LIST_MAX_AGE = int(os.getenv('PATCH_LIST_MAX_AGE', 30 * 60))  # segundos
+# Con caché compartida, una consulta reciente de otro proceso se usa en lugar de consultar otra vez.
+# Es corto para que las revisiones forzadas (cada 30 minutos en cada proceso) sigan viendo lo último.
+PATCH_LIST_SHARED_TTL = int(os.getenv('PATCH_LIST_SHARED_TTL', 60))  # segundos
+
+
+class PatchListWatcher:
+    """
+    Vigila la página con la lista de parches usando peticiones condicionales.
+    Guarda los validadores (ETag, Last-Modified y un hash del contenido) y solo vuelve
+    a parsear cuando la página realmente cambió.
+    """
+
+    def __init__(self, list_url, max_age=PATCH_LIST_MAX_AGE, name="patch_list"):
+        self.list_url = list_url
+        self.max_age = max_age
+        self.etag = None
+        self.last_modified = None
+        self.content_hash = None
+        self.result = None
+        self.checked_at = None
+        self.stats = {"polls": 0, "not_modified": 0, "unchanged": 0, "parsed": 0}
+        # Los comandos y la revisión periódica comparten la consulta que ya esté en curso.
+        # `name` identifica al grupo en las métricas: un watcher por idioma, un grupo por watcher.
+        self._polls = singleflight.SingleFlight(name)
+
+    def is_fresh(self):
+        return self.result is not None and self.checked_at is not None and time.monotonic() - self.checked_at < self.max_age
+
+    async def latest(self, force=False):
+        """Devuelve (título, url, fecha) del último parche; solo consulta la página si hace falta."""
+        if not force and self.is_fresh():
+            return self.result
+        # Si ya hay una consulta en curso (aunque sea forzada), su resultado es igual de reciente.
+        if shared_cache.SHARED is not None:
+            return await self._polls.do("poll", self.shared_poll)
+        return await self._polls.do("poll", self.poll)
+
+    async def shared_poll(self):
+        """Consulta la lista solo si ningún otro proceso lo hizo hace menos de PATCH_LIST_SHARED_TTL."""
+        patch_info = await shared_cache.SHARED.fetch(
+            f"patch_list:{self.list_url}", self.poll, ttl=PATCH_LIST_SHARED_TTL,
+            encode=lambda info: json.dumps(list(info), ensure_ascii=False).encode('utf-8'),
+            decode=lambda value: tuple(json.loads(value)), keep=lambda info: info[1] is not None)
+        self.checked_at = time.monotonic()
+        if patch_info[1] and patch_info != self.result:
+            patch_cache.remember_latest(patch_info[1])
+            self.result = patch_info
+        return patch_info
+
+    async def poll(self):
+        """Hace una petición condicional a la lista de parches y actualiza el resultado compartido."""
+        headers = {}
+        if self.result is not None:
+            if self.etag:
+                headers['If-None-Match'] = self.etag
+            if self.last_modified:
+                headers['If-Modified-Since'] = self.last_modified
+
+        self.stats["polls"] += 1
+        response = await http_client.fetch_response(self.list_url, headers=headers)
+        self.checked_at = time.monotonic()
+
+        if response.status == 304:
+            self.stats["not_modified"] += 1
+            return self.result
+
+        self.etag = response.etag
+        self.last_modified = response.last_modified
+        content_hash = hashlib.sha256(response.body).hexdigest()
+        if content_hash == self.content_hash and self.result is not None:
+            self.stats["unchanged"] += 1
+            return self.result
+
+        patch_info = await asyncio.to_thread(patch_parser.parse_patch_list, response.body, self.list_url)
+        self.stats["parsed"] += 1
+        self.content_hash = content_hash
+        if patch_info[1]:
+            patch_cache.remember_latest(patch_info[1])
+            self.result = patch_info
+        return patch_info
@@ -0,0 +1,156 @@
+# reminder_ledger.py
+
+import json
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+
+# Los registros de recordatorios cuya fecha quedó más atrás que esto se eliminan al compactar.
+LEDGER_RETENTION_DAYS = int(os.getenv('LEDGER_RETENTION_DAYS', 60))
+
+_DATE_IN_ID = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+class ReminderLedger:
+    """
+    Memoria durable de los recordatorios ya enviados.
+    En memoria es un dict (búsquedas O(1)); en disco es un archivo JSONL al que solo se le
+    agregan líneas (con fsync), así que un corte a mitad de escritura pierde como mucho la
+    última línea en lugar de todo el archivo. La compactación reescribe el archivo de forma
+    atómica (archivo temporal + os.replace).
+    """
+
+    def __init__(self, path, legacy_path=None, retention_days=LEDGER_RETENTION_DAYS):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.retention = timedelta(days=retention_days)
+        self._records = {}   # reminder_id -> {"id", "group", "date", "sent_at"}
+        self._lines_on_disk = 0
+        self._lock = threading.RLock()  # load, add y prune_before corren en hilos (asyncio.to_thread)
+
+    def __contains__(self, reminder_id):
+        return reminder_id in self._records
+
+    def __len__(self):
+        return len(self._records)
+
+    def ids(self, group=None):
+        return [reminder_id for reminder_id, record in self._records.items() if group is None or record["group"] == group]
+
+    def load(self, today=None):
+        """Carga el registro desde disco (o lo migra desde el JSON anterior) y descarta lo viejo."""
+        with self._lock:
+            self._records = {}
+            self._lines_on_disk = 0
+            corrupt_lines = 0
+
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        self._lines_on_disk += 1
+                        try:
+                            record = json.loads(line)
+                            self._records[record["id"]] = record
+                        except (json.JSONDecodeError, KeyError, TypeError):
+                            corrupt_lines += 1
+            elif self.legacy_path and os.path.exists(self.legacy_path):
+                self._import_legacy()
+
+            if corrupt_lines:
+                print(f"Advertencia: se ignoraron {corrupt_lines} líneas dañadas en {self.path}.")
+
+            removed = self.prune(today)
+            if removed or corrupt_lines or self._lines_on_disk != len(self._records):
+                self.compact()
+            return self
+
+    def _import_legacy(self):
+        """Migra el formato anterior (sent_reminders.json con dos listas) a registros."""
+        try:
+            with open(self.legacy_path, "r") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            print(f"Advertencia: {self.legacy_path} está corrupto, no se migró.")
+            return
+        for group, key in (("patch", "patch_reminders_sent"), ("clash", "clash_reminders_sent")):
+            for reminder_id in data.get(key, []):
+                match = _DATE_IN_ID.search(reminder_id)
+                self._records[reminder_id] = {"id": reminder_id, "group": group, "date": match.group(0) if match else None, "sent_at": None}
+        print(f"Se migraron {len(self._records)} recordatorios desde {self.legacy_path}.")
+
+    def add(self, reminder_id, group, reminder_date):
+        """
+        Registra un recordatorio enviado: lo agrega al final del archivo con fsync y después a la
+        memoria. Es bloqueante (desde el bot se llama con asyncio.to_thread).
+        """
+        if reminder_id in self._records:
+            return
+        record = {
+            "id": reminder_id,
+            "group": group,
+            "date": reminder_date.isoformat() if isinstance(reminder_date, date) else reminder_date,
+            "sent_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock, open(self.path, "ab+") as f:
+            # Si un corte dejó una línea a medias, el registro nuevo empieza en su propia línea.
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = "\n" + line
+            f.write(line.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            # Solo después de escribir: si la escritura falla, el recordatorio se vuelve a intentar.
+            self._records[reminder_id] = record
+            self._lines_on_disk += 1
+
+    def prune(self, today=None):
+        """Olvida los recordatorios cuya fecha ya quedó fuera del horizonte. Devuelve cuántos se quitaron."""
+        return self._forget_before(((today or date.today()) - self.retention).isoformat())
+
+    def prune_before(self, cutoff):
+        """
+        Olvida los recordatorios con fecha anterior a `cutoff` (el planificador ya no puede volver
+        a programarlos) y compacta el archivo si quitó alguno. Bloqueante: se llama con asyncio.to_thread.
+        """
+        with self._lock:
+            removed = self._forget_before(cutoff.isoformat())
+            if removed:
+                self._compact()
+        return removed
+
+    def _forget_before(self, cutoff):
+        old_ids = [reminder_id for reminder_id, record in self._records.items() if record.get("date") and record["date"] < cutoff]
+        for reminder_id in old_ids:
+            del self._records[reminder_id]
+        return len(old_ids)
+
+    def compact(self):
+        """Reescribe el archivo solo con los registros vigentes, de forma atómica."""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in self._records.values():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._lines_on_disk = len(self._records)
+        try:
+            dir_fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
@@ -0,0 +1,198 @@
+# reminder_scheduler.py
+
+import asyncio
+import heapq
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import metrics
+
+# --- Configuración del Planificador ---
+# Si el bot estuvo caído o bloqueado, un recordatorio se envía tarde siempre que no hayan
+# pasado más de REMINDER_GRACE_MINUTES desde su hora; después de eso se descarta.
+REMINDER_GRACE_MINUTES = int(os.getenv('REMINDER_GRACE_MINUTES', 30))
+REMINDER_RETRY_MINUTES = int(os.getenv('REMINDER_RETRY_MINUTES', 5))
+# Dormimos como máximo una hora seguida para recalcular ante cambios del reloj del sistema.
+MAX_SLEEP_SECONDS = 60 * 60
+
+
+@dataclass(order=True)
+class Reminder:
+    """Un anuncio programado. Se ordena por fire_at (con zona horaria)."""
+    fire_at: datetime
+    reminder_id: str = field(compare=False)
+    group: str = field(compare=False)          # "patch" o "clash"
+    kind: str = field(compare=False)           # "prepatch", "notes", "formation", "morning", "final"
+    data: dict = field(compare=False, default_factory=dict)
+    due_at: datetime = field(compare=False, default=None)  # hora original (fire_at cambia al reintentar)
+
+    def __post_init__(self):
+        if self.due_at is None:
+            self.due_at = self.fire_at
+
+
+def _at(timezone, date_str, hour, minute=0, days=0):
+    """Fecha "YYYY-MM-DD" + hora local -> datetime con zona horaria."""
+    day = datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=days)
+    return timezone.localize(day.replace(hour=hour, minute=minute))
+
+
+def build_patch_reminders(patch_dates, timezone):
+    """Recordatorio pre-parche (10:00 del día anterior) y anuncio de notas (00:00 del día del parche)."""
+    reminders = []
+    for date_str in patch_dates:
+        reminders.append(Reminder(_at(timezone, date_str, 10, days=-1), f"{date_str}-prepatch", "patch", "prepatch", {"date": date_str}))
+        reminders.append(Reminder(_at(timezone, date_str, 0), f"{date_str}-notes-published", "patch", "notes", {"date": date_str}))
+    return reminders
+
+
+def build_clash_reminders(clash_events, timezone):
+    """Formación de equipos (10:00), mañana del torneo (10:00) y última llamada (18:50) de cada Clash."""
+    reminders = []
+    for event in clash_events:
+        formation = event['team_formation_start']
+        reminders.append(Reminder(_at(timezone, formation, 10), f"{event['name']}-{formation}-formation", "clash", "formation", {"event": event}))
+        for day_str in event['tournament_days']:
+            reminders.append(Reminder(_at(timezone, day_str, 10), f"{event['name']}-{day_str}-morning", "clash", "morning", {"event": event, "day": day_str}))
+            reminders.append(Reminder(_at(timezone, day_str, 18, 50), f"{event['name']}-{day_str}-final", "clash", "final", {"event": event, "day": day_str}))
+    return reminders
+
+
+class ReminderScheduler:
+    """
+    Mantiene todos los recordatorios futuros en un heap ordenado por hora y duerme
+    exactamente hasta el siguiente. `handler(reminder)` lo envía y devuelve False si
+    hay que reintentarlo más tarde; `is_sent(reminder_id)` evita duplicados.
+    `prune_sent(fecha)` (bloqueante, opcional) olvida los enviados de antes de esa fecha.
+    """
+
+    def __init__(self, timezone, handler, is_sent, grace_minutes=REMINDER_GRACE_MINUTES, prune_sent=None):
+        self.timezone = timezone
+        self.handler = handler
+        self.is_sent = is_sent
+        self.prune_sent = prune_sent
+        self._pruned_until = None   # último corte aplicado con prune_sent
+        self.grace = timedelta(minutes=grace_minutes)
+        self._heap = []
+        self._active = {}   # reminder_id -> Reminder vigente (las entradas viejas del heap se ignoran)
+        self._wakeup = asyncio.Event()
+        self.last_tick = None   # time.monotonic() de la última vuelta del bucle (para /readyz)
+        self.failures = 0       # envíos en los que el handler lanzó una excepción (para /readyz)
+
+    def __len__(self):
+        return len(self._active)
+
+    def next_reminder(self):
+        self._discard_stale()
+        return self._heap[0] if self._heap else None
+
+    def sync(self, group, reminders):
+        """
+        Reemplaza los recordatorios de un grupo con la nueva lista. Solo se tocan los que
+        cambiaron; los que ya pasaron su periodo de gracia o ya se enviaron no se agregan.
+        """
+        now = datetime.now(self.timezone)
+        wanted = {}
+        for reminder in reminders:
+            if reminder.due_at + self.grace >= now and not self.is_sent(reminder.reminder_id):
+                wanted[reminder.reminder_id] = reminder
+
+        added = removed = 0
+        for reminder_id, reminder in list(self._active.items()):
+            if reminder.group != group:
+                continue
+            new_reminder = wanted.get(reminder_id)
+            if new_reminder is None or new_reminder.due_at != reminder.due_at or new_reminder.data != reminder.data:
+                del self._active[reminder_id]
+                removed += 1
+
+        for reminder_id, reminder in wanted.items():
+            if reminder_id not in self._active:
+                self._active[reminder_id] = reminder
+                heapq.heappush(self._heap, reminder)
+                added += 1
+
+        if added or removed:
+            print(f"Planificador ({group}): {added} recordatorios agregados, {removed} eliminados, {len(self._active)} pendientes.")
+        # El calendario cambió: en la siguiente vuelta se vuelve a podar el registro de enviados.
+        self._pruned_until = None
+        self._wakeup.set()
+
+    async def _prune_sent(self):
+        """
+        Olvida los enviados cuya hora quedó antes del periodo de gracia: sync ya no los agrega,
+        así que no hace falta recordarlos. Corre como mucho una vez por día (o tras cada sync).
+        """
+        if self.prune_sent is None:
+            return
+        cutoff = (datetime.now(self.timezone) - self.grace).date()
+        if cutoff == self._pruned_until:
+            return
+        self._pruned_until = cutoff
+        try:
+            removed = await asyncio.to_thread(self.prune_sent, cutoff)
+        except Exception as e:
+            metrics.record_error("reminder_ledger", e)
+            print(f"Error al podar el registro de recordatorios: {e}")
+            return
+        if removed:
+            print(f"Registro de recordatorios: se olvidaron {removed} enviados antes del {cutoff}.")
+
+    def _discard_stale(self):
+        while self._heap and self._active.get(self._heap[0].reminder_id) is not self._heap[0]:
+            heapq.heappop(self._heap)
+
+    async def _sleep_until(self, when):
+        delay = (when - datetime.now(self.timezone)).total_seconds()
+        if delay <= 0:
+            return
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, MAX_SLEEP_SECONDS))
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self):
+        """Bucle principal: se lanza una sola vez como tarea en segundo plano."""
+        while True:
+            self.last_tick = time.monotonic()
+            await self._prune_sent()
+            reminder = self.next_reminder()
+            if reminder is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=MAX_SLEEP_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = datetime.now(self.timezone)
+            if reminder.fire_at > now:
+                await self._sleep_until(reminder.fire_at)
+                continue
+
+            heapq.heappop(self._heap)
+            del self._active[reminder.reminder_id]
+
+            if self.is_sent(reminder.reminder_id):
+                continue
+            if now - reminder.due_at > self.grace:
+                print(f"Recordatorio descartado por llegar tarde: {reminder.reminder_id}")
+                continue
+
+            try:
+                with metrics.SCHEDULER_SECONDS.time(task="reminders"):
+                    done = await self.handler(reminder)
+            except Exception as e:
+                self.failures += 1
+                metrics.record_error("reminders", e)
+                print(f"Error al enviar el recordatorio {reminder.reminder_id}: {e}")
+                done = False
+
+            if not done:
+                retry_at = now + timedelta(minutes=REMINDER_RETRY_MINUTES)
+                if retry_at - reminder.due_at <= self.grace:
+                    retry = Reminder(retry_at, reminder.reminder_id, reminder.group, reminder.kind, reminder.data, reminder.due_at)
+                    self._active[retry.reminder_id] = retry
+                    heapq.heappush(self._heap, retry)
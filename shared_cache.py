@@ -0,0 +1,231 @@
+# shared_cache.py
+# Caché compartida entre procesos (shards o réplicas del bot), opcional. Guarda el modelo extraído
+# de cada artículo y el resultado de consultar la lista de parches, para que la página de Riot
+# se descargue y se parsee una sola vez aunque haya varios procesos.
+# Cada dato tiene un lease (candado con vencimiento): el proceso que lo obtiene es el líder de esa
+# descarga, y los demás esperan a que publique el resultado y lo leen. Si el líder se cae, su lease
+# vence y otro proceso toma su lugar.
+#
+# SHARED_CACHE_URL:
+#   (vacío)                  desactivada (por defecto): cada proceso descarga por su cuenta
+#   sqlite:///ruta.sqlite3   archivo SQLite (WAL) compartido por los procesos de una misma máquina
+#   redis://host:6379/0      Redis o cualquier servidor compatible (necesita `pip install redis`)
+
+import asyncio
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import metrics
+
+SHARED_CACHE_URL = os.getenv('SHARED_CACHE_URL', "")
+# Un lease que no se libera (el proceso se cayó) vence después de esto; debe cubrir una descarga completa.
+SHARED_CACHE_LEASE = float(os.getenv('SHARED_CACHE_LEASE', 60))                 # segundos
+# Cada cuánto revisa un proceso que espera si el líder ya publicó el resultado.
+SHARED_CACHE_POLL_INTERVAL = float(os.getenv('SHARED_CACHE_POLL_INTERVAL', 0.1))  # segundos
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+
+# --- Backends ---
+# Métodos bloqueantes (SharedCache los llama con asyncio.to_thread). Las expiraciones usan
+# time.time(): los procesos no comparten el reloj de time.monotonic().
+class SQLiteBackend:
+    """Un archivo SQLite en modo WAL: varios procesos leen a la vez y las escrituras son atómicas."""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM entries WHERE key = ? AND expires > ?", (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)", (key, value, now + ttl))
+                conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+
+    def acquire(self, name, owner, ttl):
+        """Toma (o renueva) el lease si está libre, vencido o ya es de `owner`. Una sola sentencia: es atómico."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT INTO leases (name, owner, expires) VALUES (?, ?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+                    "WHERE leases.owner = excluded.owner OR leases.expires <= ?",
+                    (name, owner, now + ttl, now),
+                )
+                row = conn.execute("SELECT owner FROM leases WHERE name = ?", (name,)).fetchone()
+        return row is not None and row[0] == owner
+
+    def release(self, name, owner):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+
+# Compara y cambia en el servidor: nadie puede tomar ni soltar un lease ajeno entre el GET y el SET.
+_REDIS_ACQUIRE = """
+local current = redis.call('GET', KEYS[1])
+if current == false or current == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+_REDIS_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisBackend:
+    """Redis (o un servidor compatible). El cliente se importa la primera vez que se usa."""
+
+    def __init__(self, url, prefix="poro:"):
+        self.url = url
+        self.prefix = prefix
+        self._client = None
+
+    def _connection(self):
+        if self._client is None:
+            import redis   # dependencia opcional: solo hace falta con SHARED_CACHE_URL=redis://...
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def get(self, key):
+        return self._connection().get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self._connection().set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    def acquire(self, name, owner, ttl):
+        return bool(self._connection().eval(_REDIS_ACQUIRE, 1, self.prefix + name, owner, max(1, int(ttl * 1000))))
+
+    def release(self, name, owner):
+        self._connection().eval(_REDIS_RELEASE, 1, self.prefix + name, owner)
+
+
+def open_backend(url):
+    """Backend para una SHARED_CACHE_URL. Lanza ValueError si el esquema no existe."""
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"SHARED_CACHE_URL no reconocida: {url} (usa sqlite:///ruta o redis://host)")
+
+
+# --- Caché compartida ---
+class SharedCache:
+    """
+    fetch() con un solo líder por clave entre todos los procesos: como singleflight.SingleFlight,
+    pero a través del backend. Si el backend falla, se descarga localmente (el bot nunca depende de él).
+    """
+
+    def __init__(self, backend, owner=None, lease_seconds=SHARED_CACHE_LEASE, poll_interval=SHARED_CACHE_POLL_INTERVAL):
+        self.backend = backend
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.stats = {"hits": 0, "built": 0, "waited": 0, "errors": 0}
+
+    async def fetch(self, key, build, ttl, encode, decode, keep=None):
+        """
+        El valor de `key` desde el backend; si no está, el proceso que obtiene el lease ejecuta
+        `build()` y publica el resultado (solo si keep(resultado)) y los demás esperan a leerlo.
+        """
+        waited = False
+        try:
+            while True:
+                value = await asyncio.to_thread(self.backend.get, key)
+                if value is not None:
+                    self.stats["hits"] += 1
+                    metrics.CACHE_LOOKUPS.inc(cache="shared", result="hit")
+                    return decode(value)
+                if await asyncio.to_thread(self.backend.acquire, f"lease:{key}", self.owner, self.lease_seconds):
+                    break
+                if not waited:
+                    waited = True
+                    self.stats["waited"] += 1
+                await asyncio.sleep(self.poll_interval)
+        except Exception as e:
+            self._record_error(e)
+            return await build()
+
+        metrics.CACHE_LOOKUPS.inc(cache="shared", result="miss")
+        self.stats["built"] += 1
+        try:
+            result = await build()
+            if keep is None or keep(result):
+                try:
+                    await asyncio.to_thread(self.backend.set, key, encode(result), ttl)
+                except Exception as e:
+                    self._record_error(e)
+            return result
+        finally:
+            try:
+                await asyncio.to_thread(self.backend.release, f"lease:{key}", self.owner)
+            except Exception as e:
+                self._record_error(e)
+
+    def _record_error(self, error):
+        self.stats["errors"] += 1
+        metrics.record_error("shared_cache", error)
+        print(f"Error en la caché compartida: {error}")
+
+
+def open_shared_cache(url=SHARED_CACHE_URL):
+    """SharedCache para la URL dada, o None si está vacía o no es válida."""
+    if not url:
+        return None
+    try:
+        return SharedCache(open_backend(url))
+    except ValueError as e:
+        print(f"Advertencia: {e}. La caché compartida queda desactivada.")
+        return None
+
+
+SHARED = open_shared_cache()
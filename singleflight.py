@@ -0,0 +1,53 @@
+# singleflight.py
+
+import asyncio
+
+# Todos los grupos creados, por nombre, para poder mostrar sus métricas juntas.
+GROUPS = {}
+
+
+class SingleFlight:
+    """
+    Junta llamadas concurrentes con la misma clave en una sola tarea: la primera la ejecuta
+    y las demás esperan ese mismo resultado (o esa misma excepción).
+    Cuando la tarea termina, la clave se libera y la siguiente llamada vuelve a ejecutar.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.stats = {"calls": 0, "executions": 0, "deduplicated": 0}
+        self._in_flight = {}   # clave -> asyncio.Task
+        GROUPS[name] = self
+
+    def in_flight(self):
+        return len(self._in_flight)
+
+    async def do(self, key, coro_fn):
+        """Ejecuta `coro_fn()` una sola vez por clave mientras haya una llamada en curso."""
+        self.stats["calls"] += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.stats["executions"] += 1
+            task = asyncio.ensure_future(coro_fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        else:
+            self.stats["deduplicated"] += 1
+        # shield: si un comando se cancela, la tarea compartida sigue para los demás.
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Marca la excepción como leída aunque todos los que esperaban se hayan cancelado.
+        if not task.cancelled():
+            task.exception()
+
+
+def stats():
+    """Métricas de todos los grupos: {nombre: {calls, executions, deduplicated}}."""
+    return {name: dict(group.stats) for name, group in GROUPS.items()}
+
+
+def stats_summary():
+    return ", ".join(f"{name}: {s['deduplicated']}/{s['calls']} deduplicadas" for name, s in stats().items())
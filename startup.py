@@ -0,0 +1,54 @@
+# startup.py
+# Tiempos del arranque por fase (imports, configuración, login, gateway, subsistemas opcionales),
+# para seguir el tiempo hasta estar listo entre versiones. Se imprimen una vez que el bot está
+# listo y se exponen en /metrics.
+
+import time
+from contextlib import contextmanager
+
+
+class StartupTimeline:
+    """Fases del arranque con su inicio y duración (algunas corren en paralelo)."""
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.phases = {}          # nombre -> [inicio, fin] en segundos desde self.start
+        self.ready_at = None      # segundos hasta estar conectado al gateway
+        self.reported = False
+
+    def record(self, name, begin, end):
+        """Registra una fase ya medida con time.perf_counter() (ej. los imports)."""
+        self.phases[name] = [begin - self.start, end - self.start]
+
+    def begin(self, name):
+        self.phases[name] = [time.perf_counter() - self.start, None]
+
+    def end(self, name):
+        phase = self.phases.get(name)
+        if phase is not None and phase[1] is None:
+            phase[1] = time.perf_counter() - self.start
+
+    @contextmanager
+    def phase(self, name):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def mark_ready(self):
+        if self.ready_at is None:
+            self.ready_at = time.perf_counter() - self.start
+
+    def durations(self):
+        """{fase: segundos} de las fases que ya terminaron."""
+        return {name: end - begin for name, (begin, end) in self.phases.items() if end is not None}
+
+    def report(self):
+        """Tabla de fases en el orden en que empezaron."""
+        ready = f"{self.ready_at:.2f} s" if self.ready_at is not None else "-"
+        lines = [f"Arranque: listo para responder en {ready}"]
+        for name, (begin, end) in sorted(self.phases.items(), key=lambda item: item[1][0]):
+            duration = f"{(end - begin) * 1000:8.0f} ms" if end is not None else "  en curso"
+            lines.append(f"  {name:28} desde {begin:6.2f} s  {duration}")
+        return "\n".join(lines)
@@ -0,0 +1,123 @@
+# subscriptions.py
+# Registro de suscripciones a los anuncios automáticos: por servidor, el canal donde se publican,
+# qué tipos de anuncio quiere y en qué zona horaria se muestran las horas.
+# Se guarda en subscriptions.json:
+#   {"subscriptions": [{"guild_id": 123, "channel_id": 456,
+#                       "types": ["prepatch", "notes", "new_patch", "clash"],
+#                       "timezone": "America/Mexico_City"}]}
+
+import json
+import os
+from dataclasses import dataclass
+import config_watcher
+import pytz
+
+SUBSCRIPTIONS_PATH = os.getenv('SUBSCRIPTIONS_PATH', "subscriptions.json")
+DEFAULT_TIMEZONE = "America/Mexico_City"
+
+# --- Tipos de Anuncio ---
+PREPATCH = "prepatch"      # recordatorio del día antes del parche
+NOTES = "notes"            # las notas ya están publicadas (día del parche)
+NEW_PATCH = "new_patch"    # parche detectado en la página (aunque no estuviera en el calendario)
+CLASH = "clash"            # formación de equipos, día de torneo y última llamada
+ANNOUNCEMENT_TYPES = (PREPATCH, NOTES, NEW_PATCH, CLASH)
+
+# Tipo de suscripción que corresponde a cada tipo de recordatorio del planificador.
+REMINDER_TYPES = {"prepatch": PREPATCH, "notes": NOTES, "formation": CLASH, "morning": CLASH, "final": CLASH}
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """Suscripción de un servidor. guild_id es None para la suscripción por defecto (DISCORD_CHANNEL_ID)."""
+    guild_id: int
+    channel_id: int
+    types: frozenset = frozenset(ANNOUNCEMENT_TYPES)
+    timezone: str = DEFAULT_TIMEZONE
+
+    def wants(self, announcement_type):
+        return announcement_type in self.types
+
+    def to_dict(self):
+        return {
+            "guild_id": self.guild_id,
+            "channel_id": self.channel_id,
+            "types": [kind for kind in ANNOUNCEMENT_TYPES if kind in self.types],
+            "timezone": self.timezone,
+        }
+
+
+def parse_types(names):
+    """Valida una lista de tipos de anuncio. Lanza ValueError si alguno no existe."""
+    types = frozenset(names)
+    unknown = types - set(ANNOUNCEMENT_TYPES)
+    if unknown:
+        raise ValueError(f"tipos de anuncio desconocidos: {', '.join(sorted(unknown))}")
+    return types
+
+
+def parse_timezone(name):
+    """Valida el nombre de una zona horaria (ej. "America/Bogota"). Lanza ValueError si no existe."""
+    try:
+        return pytz.timezone(name).zone
+    except pytz.exceptions.UnknownTimeZoneError:
+        raise ValueError(f"zona horaria desconocida: {name}") from None
+
+
+def parse_subscription(data):
+    try:
+        return Subscription(
+            guild_id=int(data['guild_id']),
+            channel_id=int(data['channel_id']),
+            types=parse_types(data.get('types', ANNOUNCEMENT_TYPES)),
+            timezone=parse_timezone(data.get('timezone', DEFAULT_TIMEZONE)),
+        )
+    except KeyError as e:
+        raise ValueError(f"suscripción sin {e.args[0]}: {data}") from None
+
+
+def load_subscriptions(path):
+    """Lee y valida subscriptions.json sin tocar el registro en memoria."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    subscriptions = [parse_subscription(entry) for entry in data.get("subscriptions", [])]
+    guild_ids = [subscription.guild_id for subscription in subscriptions]
+    if len(guild_ids) != len(set(guild_ids)):
+        raise ValueError("hay servidores con más de una suscripción")
+    return subscriptions
+
+
+class SubscriptionRegistry:
+    """
+    Suscripciones en memoria, una por servidor. Si hay un canal por defecto (DISCORD_CHANNEL_ID),
+    se trata como una suscripción más a todos los anuncios, salvo que su servidor ya tenga la suya.
+    """
+
+    def __init__(self, default_channel_id=None):
+        self.default = Subscription(None, default_channel_id) if default_channel_id else None
+        self._by_guild = {}
+
+    def __len__(self):
+        return len(self._by_guild)
+
+    def replace(self, subscriptions):
+        self._by_guild = {subscription.guild_id: subscription for subscription in subscriptions}
+
+    def get(self, guild_id):
+        return self._by_guild.get(guild_id)
+
+    def set(self, subscription):
+        self._by_guild[subscription.guild_id] = subscription
+
+    def remove(self, guild_id):
+        return self._by_guild.pop(guild_id, None)
+
+    def targets(self, announcement_type):
+        """Suscripciones que quieren este tipo de anuncio (la por defecto va al final)."""
+        targets = [subscription for subscription in self._by_guild.values() if subscription.wants(announcement_type)]
+        if self.default and all(subscription.channel_id != self.default.channel_id for subscription in self._by_guild.values()):
+            targets.append(self.default)
+        return targets
+
+    def save(self, path=SUBSCRIPTIONS_PATH):
+        data = {"subscriptions": [subscription.to_dict() for _, subscription in sorted(self._by_guild.items())]}
+        config_watcher.write_json_atomic(path, data)